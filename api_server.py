@@ -1,21 +1,37 @@
 import os
-import sys
 import shutil
 import tempfile
 import asyncio
-import subprocess
+import uuid
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from starlette.background import BackgroundTask
 
+from facefusion.metrics import render_metrics
+from facefusion.worker import cancel_job, clear_job, get_job, start_workers, stop_workers, submit_job, wait_job
+
+# Jumlah worker per device: job yang datang bersamaan akan antre, bukan ditolak
+WORKER_DEVICE_IDS = os.getenv('WORKER_DEVICE_IDS', '0').split(',')
+WORKER_COUNT = int(os.getenv('WORKER_COUNT', '1'))
+
 app = FastAPI()
 
+@app.on_event("startup")
+def startup_worker():
+    # Worker persisten: model ONNX tetap hangat di memori antar request
+    start_workers(WORKER_DEVICE_IDS, WORKER_COUNT)
+
+@app.on_event("shutdown")
+def shutdown_worker():
+    stop_workers()
+
 from worker_router import router as worker_router
 app.include_router(worker_router)
 
-is_processing = False
+# job_id -> file temporary milik job tersebut
+api_jobs: dict[str, dict] = {}
 
-def run_facefusion_process(
+def create_facefusion_command(
     source_paths: list[str],
     target_path: str, 
     output_path: str,
@@ -66,111 +82,101 @@ def run_facefusion_process(
     face_selector_age_start: int | None = None,
     face_selector_age_end: int | None = None,
     output_video_preset: str | None = None
-):
-    global is_processing
-    try:
-        project_root = os.path.dirname(os.path.abspath(__file__))
-        run_py_path = os.path.join(project_root, 'facefusion.py')
+) -> list[str]:
+    command = [
+        'headless-run',
+        '--source', *source_paths,
+        '--target', target_path,
+        '--output-path', output_path,
+        '--execution-providers', 'cuda', # Ganti ke 'cpu' jika perlu
+        '--video-memory-strategy', 'tolerant'
+    ]
 
-        command = [
-            sys.executable,
-            run_py_path,
-            'headless-run',
-            '--source', *source_paths,
-            '--target', target_path,
-            '--output-path', output_path,
-            '--execution-providers', 'cuda' # Ganti ke 'cpu' jika perlu
-        ]
-
-        processor_list = [p.strip() for p in processors.split(',')]
-        command.extend(['--processors', *processor_list])
-        
-        if 'face_enhancer' in processor_list and face_enhancer_model:
-            command.extend(['--face-enhancer-model', face_enhancer_model, '--face-enhancer-blend', str(face_enhancer_blend)])
-        if 'frame_enhancer' in processor_list and frame_enhancer_model:
-            command.extend(['--frame-enhancer-model', frame_enhancer_model, '--frame-enhancer-blend', str(frame_enhancer_blend)])
-        if 'age_modifier' in processor_list and age_modifier_direction is not None:
-            command.extend(['--age-modifier-model', 'styleganex_age', '--age-modifier-direction', str(age_modifier_direction)])
-        
-        if 'expression_restorer' in processor_list and expression_restorer_model:
-            command.extend(['--expression-restorer-model', expression_restorer_model])
-            if expression_restorer_factor is not None:
-                command.extend(['--expression-restorer-factor', str(expression_restorer_factor)])
+    processor_list = [p.strip() for p in processors.split(',')]
+    command.extend(['--processors', *processor_list])
+    
+    if 'face_enhancer' in processor_list and face_enhancer_model:
+        command.extend(['--face-enhancer-model', face_enhancer_model, '--face-enhancer-blend', str(face_enhancer_blend)])
+    if 'frame_enhancer' in processor_list and frame_enhancer_model:
+        command.extend(['--frame-enhancer-model', frame_enhancer_model, '--frame-enhancer-blend', str(frame_enhancer_blend)])
+    if 'age_modifier' in processor_list and age_modifier_direction is not None:
+        command.extend(['--age-modifier-model', 'styleganex_age', '--age-modifier-direction', str(age_modifier_direction)])
+    
+    if 'expression_restorer' in processor_list and expression_restorer_model:
+        command.extend(['--expression-restorer-model', expression_restorer_model])
+        if expression_restorer_factor is not None:
+            command.extend(['--expression-restorer-factor', str(expression_restorer_factor)])
 
-        if 'face_debugger' in processor_list and face_debugger_items:
-            command.extend(['--face-debugger-items', *[item.strip() for item in face_debugger_items.split(',')]])
-        if 'face_editor' in processor_list and face_editor_model:
-            command.extend(['--face-editor-model', face_editor_model])
-            editor_params = {
-                '--face-editor-eyebrow-direction': face_editor_eyebrow_direction, '--face-editor-eye-gaze-horizontal': face_editor_eye_gaze_horizontal,
-                '--face-editor-eye-gaze-vertical': face_editor_eye_gaze_vertical, '--face-editor-eye-open-ratio': face_editor_eye_open_ratio,
-                '--face-editor-lip-open-ratio': face_editor_lip_open_ratio, '--face-editor-mouth-grim': face_editor_mouth_grim,
-                '--face-editor-mouth-pout': face_editor_mouth_pout, '--face-editor-mouth-smile': face_editor_mouth_smile,
-                '--face-editor-mouth-position-horizontal': face_editor_mouth_position_horizontal, '--face-editor-mouth-position-vertical': face_editor_mouth_position_vertical,
-                '--face-editor-head-pitch': face_editor_head_pitch, '--face-editor-head-yaw': face_editor_head_yaw, '--face-editor-head-roll': face_editor_head_roll
-            }
-            for key, value in editor_params.items():
-                if value is not None: command.extend([key, str(value)])
-        if 'frame_colorizer' in processor_list and frame_colorizer_model:
-            command.extend(['--frame-colorizer-model', frame_colorizer_model, '--frame-colorizer-blend', str(frame_colorizer_blend)])
-        if 'lip_syncer' in processor_list and lip_syncer_model:
-            command.extend(['--lip-syncer-model', lip_syncer_model, '--lip-syncer-weight', str(lip_syncer_weight)])
-        if 'deep_swapper' in processor_list and deep_swapper_model:
-            command.extend(['--deep-swapper-model', deep_swapper_model, '--deep-swapper-morph', str(deep_swapper_morph)])
-        if face_selector_mode:
-            command.extend(['--face-selector-mode', face_selector_mode])
-            if face_selector_mode == 'reference':
-                command.extend(['--reference-face-distance', str(reference_face_distance)])
-        if face_mask_types:
-            command.extend(['--face-parser-model', 'bisenet_resnet_18'])
-            mask_types_list = [item.strip() for item in face_mask_types.split(',')]
-            command.extend(['--face-mask-types', *mask_types_list])
-            if face_mask_blur is not None:
-                command.extend(['--face-mask-blur', str(face_mask_blur)])
-            if face_mask_padding is not None:
-                padding_list = [item.strip() for item in face_mask_padding.split(',')]
-                command.extend(['--face-mask-padding', *padding_list])
-        if output_video_encoder:
-            command.extend(['--output-video-encoder', output_video_encoder])
-        if output_video_quality is not None:
-            command.extend(['--output-video-quality', str(output_video_quality)])
-        if output_video_resolution:
-            command.extend(['--output-video-resolution', output_video_resolution])
-        if output_video_fps is not None:
-            command.extend(['--output-video-fps', str(output_video_fps)])
-        if 'face_swapper' in processor_list:
-            if face_swapper_model:
-                command.extend(['--face-swapper-model', face_swapper_model])
-            if face_swapper_pixel_boost is not None:
-                command.extend(['--face-swapper-pixel-boost', str(face_swapper_pixel_boost)])
-        if face_detector_model:
-            command.extend(['--face-detector-model', face_detector_model])
-        if face_detector_score is not None:
-            command.extend(['--face-detector-score', str(face_detector_score)])
-        if face_selector_order:
-            command.extend(['--face-selector-order', face_selector_order])
-        if face_selector_gender:
-            command.extend(['--face-selector-gender', face_selector_gender])
-        if face_selector_age_start is not None:
-            command.extend(['--face-selector-age-start', str(face_selector_age_start)])
-        if face_selector_age_end is not None:
-            command.extend(['--face-selector-age-end', str(face_selector_age_end)])
-        if output_video_preset:
-            command.extend(['--output-video-preset', output_video_preset])
+    if 'face_debugger' in processor_list and face_debugger_items:
+        command.extend(['--face-debugger-items', *[item.strip() for item in face_debugger_items.split(',')]])
+    if 'face_editor' in processor_list and face_editor_model:
+        command.extend(['--face-editor-model', face_editor_model])
+        editor_params = {
+            '--face-editor-eyebrow-direction': face_editor_eyebrow_direction, '--face-editor-eye-gaze-horizontal': face_editor_eye_gaze_horizontal,
+            '--face-editor-eye-gaze-vertical': face_editor_eye_gaze_vertical, '--face-editor-eye-open-ratio': face_editor_eye_open_ratio,
+            '--face-editor-lip-open-ratio': face_editor_lip_open_ratio, '--face-editor-mouth-grim': face_editor_mouth_grim,
+            '--face-editor-mouth-pout': face_editor_mouth_pout, '--face-editor-mouth-smile': face_editor_mouth_smile,
+            '--face-editor-mouth-position-horizontal': face_editor_mouth_position_horizontal, '--face-editor-mouth-position-vertical': face_editor_mouth_position_vertical,
+            '--face-editor-head-pitch': face_editor_head_pitch, '--face-editor-head-yaw': face_editor_head_yaw, '--face-editor-head-roll': face_editor_head_roll
+        }
+        for key, value in editor_params.items():
+            if value is not None: command.extend([key, str(value)])
+    if 'frame_colorizer' in processor_list and frame_colorizer_model:
+        command.extend(['--frame-colorizer-model', frame_colorizer_model, '--frame-colorizer-blend', str(frame_colorizer_blend)])
+    if 'lip_syncer' in processor_list and lip_syncer_model:
+        command.extend(['--lip-syncer-model', lip_syncer_model, '--lip-syncer-weight', str(lip_syncer_weight)])
+    if 'deep_swapper' in processor_list and deep_swapper_model:
+        command.extend(['--deep-swapper-model', deep_swapper_model, '--deep-swapper-morph', str(deep_swapper_morph)])
+    if face_selector_mode:
+        command.extend(['--face-selector-mode', face_selector_mode])
+        if face_selector_mode == 'reference':
+            command.extend(['--reference-face-distance', str(reference_face_distance)])
+    if face_mask_types:
+        command.extend(['--face-parser-model', 'bisenet_resnet_18'])
+        mask_types_list = [item.strip() for item in face_mask_types.split(',')]
+        command.extend(['--face-mask-types', *mask_types_list])
+        if face_mask_blur is not None:
+            command.extend(['--face-mask-blur', str(face_mask_blur)])
+        if face_mask_padding is not None:
+            padding_list = [item.strip() for item in face_mask_padding.split(',')]
+            command.extend(['--face-mask-padding', *padding_list])
+    if output_video_encoder:
+        command.extend(['--output-video-encoder', output_video_encoder])
+    if output_video_quality is not None:
+        command.extend(['--output-video-quality', str(output_video_quality)])
+    if output_video_resolution:
+        command.extend(['--output-video-resolution', output_video_resolution])
+    if output_video_fps is not None:
+        command.extend(['--output-video-fps', str(output_video_fps)])
+    if 'face_swapper' in processor_list:
+        if face_swapper_model:
+            command.extend(['--face-swapper-model', face_swapper_model])
+        if face_swapper_pixel_boost is not None:
+            command.extend(['--face-swapper-pixel-boost', str(face_swapper_pixel_boost)])
+    if face_detector_model:
+        command.extend(['--face-detector-model', face_detector_model])
+    if face_detector_score is not None:
+        command.extend(['--face-detector-score', str(face_detector_score)])
+    if face_selector_order:
+        command.extend(['--face-selector-order', face_selector_order])
+    if face_selector_gender:
+        command.extend(['--face-selector-gender', face_selector_gender])
+    if face_selector_age_start is not None:
+        command.extend(['--face-selector-age-start', str(face_selector_age_start)])
+    if face_selector_age_end is not None:
+        command.extend(['--face-selector-age-end', str(face_selector_age_end)])
+    if output_video_preset:
+        command.extend(['--output-video-preset', output_video_preset])
 
-        print(f"Menjalankan perintah: {' '.join(command)}")
-        
-        result = subprocess.run(command, capture_output=True, text=True, check=True, cwd=project_root)
-        print("--- PROSES BERHASIL ---", result.stdout)
+    print(f"Menjalankan perintah: {' '.join(command)}")
+    return command
 
-    except subprocess.CalledProcessError as e:
-        print("--- PROSES GAGAL ---")
-        print("Return Code:", e.returncode)
-        print("STDOUT:", e.stdout)
-        print("STDERR:", e.stderr)
-        raise e
-    finally:
-        is_processing = False
+def cleanup_job(job_id: str):
+    api_job = api_jobs.pop(job_id, None)
+    clear_job(job_id)
+    if api_job:
+        shutil.rmtree(api_job['temp_dir'], ignore_errors=True)
+        print(f"Direktori temporary {api_job['temp_dir']} telah dihapus.")
 
 @app.post("/swap/")
 def create_swap(
@@ -227,20 +233,13 @@ def create_swap(
     face_selector_gender: str = Form(None),
     face_selector_age_start: int = Form(None),
     face_selector_age_end: int = Form(None),
-    output_video_preset: str = Form('medium')
+    output_video_preset: str = Form('medium'),
+    # False: langsung balas job_id, hasil diambil lewat /jobs/{job_id}
+    wait: bool = Form(True)
 ):
-    
-    global is_processing
-    if is_processing:
-        raise HTTPException(status_code=429, detail="Server sedang memproses permintaan lain.")
-    
-    is_processing = True
+    job_id = uuid.uuid4().hex
     temp_dir = tempfile.mkdtemp()
 
-    def cleanup():
-        shutil.rmtree(temp_dir)
-        print(f"Direktori temporary {temp_dir} telah dihapus.")
-
     try:
         source_extension = os.path.splitext(source_file.filename)[1]
         source_path = os.path.join(temp_dir, f"source{source_extension}")
@@ -263,9 +262,9 @@ def create_swap(
                 shutil.copyfileobj(audio_file.file, f)
             source_paths.append(audio_path)
 
-        print("File berhasil di-upload. Memulai proses FaceFusion (mode blocking)...")
+        print("File berhasil di-upload. Memasukkan job FaceFusion ke antrean...")
 
-        run_facefusion_process(
+        command = create_facefusion_command(
             source_paths, target_path, output_path,
             processors, face_enhancer_model, face_enhancer_blend,
             frame_enhancer_model, frame_enhancer_blend,
@@ -289,27 +288,77 @@ def create_swap(
             face_selector_order, face_selector_gender, face_selector_age_start, face_selector_age_end,
             output_video_preset
         )
+        api_jobs[job_id] = {
+            'temp_dir': temp_dir,
+            'output_path': output_path,
+            'output_filename': output_filename
+        }
 
-        if not os.path.exists(output_path):
-            is_processing = False
-            raise HTTPException(status_code=500, detail="Pemrosesan gagal. File output tidak ditemukan.")
-            
-        print(f"Proses selesai. Mengirim file hasil: {output_path}")
+        if not submit_job(job_id, command):
+            raise RuntimeError("Worker FaceFusion belum berjalan.")
+        if not wait:
+            return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued"})
 
-        return FileResponse(
-            path=output_path,
-            media_type='video/mp4',
-            filename=output_filename,
-            background=BackgroundTask(cleanup)
-        )
+        return get_job_output(job_id, wait_job(job_id))
+    except HTTPException:
+        raise
     except Exception as e:
-        cleanup()
-        is_processing = False
+        cancel_job(job_id)
+        api_jobs.setdefault(job_id, {'temp_dir': temp_dir})
+        cleanup_job(job_id)
         error_detail = f"Terjadi error internal: {str(e)}"
-        if isinstance(e, subprocess.CalledProcessError):
-            error_detail = f"Proses FaceFusion gagal. STDERR: {e.stderr}"
+        if isinstance(e, RuntimeError):
+            error_detail = str(e)
         raise HTTPException(status_code=500, detail=error_detail)
 
+def get_job_output(job_id: str, job: dict | None):
+    api_job = api_jobs.get(job_id)
+    if not api_job or not job:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan.")
+    if job['status'] in ('queued', 'processing'):
+        raise HTTPException(status_code=409, detail="Job masih diproses.")
+    if job['status'] != 'completed' or not os.path.exists(api_job['output_path']):
+        cleanup_job(job_id)
+        raise HTTPException(status_code=500, detail=f"Proses FaceFusion gagal dengan kode {job['error_code']}")
+
+    print(f"Proses selesai. Mengirim file hasil: {api_job['output_path']}")
+
+    return FileResponse(
+        path=api_job['output_path'],
+        media_type='video/mp4',
+        filename=api_job['output_filename'],
+        background=BackgroundTask(cleanup_job, job_id)
+    )
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan.")
+    return {
+        "job_id": job_id,
+        "status": job['status'],
+        "progress": round(job['progress'] * 100, 2),
+        "error_code": job['error_code']
+    }
+
+@app.get("/jobs/{job_id}/output")
+def download_job_output(job_id: str):
+    return get_job_output(job_id, get_job(job_id))
+
+@app.get("/metrics")
+def get_metrics():
+    # Histogram latensi per tahap dalam format Prometheus, digabung dari semua worker
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.delete("/jobs/{job_id}")
+def delete_job(job_id: str):
+    if not get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan.")
+    cancelled = cancel_job(job_id)
+    cleanup_job(job_id)
+    return {"job_id": job_id, "cancelled": cancelled}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("api_server:app", host="127.0.0.1", port=8081)
\ No newline at end of file
@@ -44,6 +44,7 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('command', args.get('command'))
 	# paths
 	apply_state_item('temp_path', args.get('temp_path'))
+	apply_state_item('cache_path', args.get('cache_path'))
 	apply_state_item('jobs_path', args.get('jobs_path'))
 	apply_state_item('source_paths', args.get('source_paths'))
 	apply_state_item('target_path', args.get('target_path'))
@@ -57,6 +58,7 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('face_detector_size', args.get('face_detector_size'))
 	apply_state_item('face_detector_angles', args.get('face_detector_angles'))
 	apply_state_item('face_detector_score', args.get('face_detector_score'))
+	apply_state_item('face_tracker_interval', args.get('face_tracker_interval'))
 	# face landmarker
 	apply_state_item('face_landmarker_model', args.get('face_landmarker_model'))
 	apply_state_item('face_landmarker_score', args.get('face_landmarker_score'))
@@ -82,6 +84,7 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('trim_frame_start', args.get('trim_frame_start'))
 	apply_state_item('trim_frame_end', args.get('trim_frame_end'))
 	apply_state_item('temp_frame_format', args.get('temp_frame_format'))
+	apply_state_item('video_process_mode', args.get('video_process_mode'))
 	apply_state_item('keep_temp', args.get('keep_temp'))
 	# output creation
 	apply_state_item('output_image_quality', args.get('output_image_quality'))
@@ -122,18 +125,31 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('execution_providers', args.get('execution_providers'))
 	apply_state_item('execution_thread_count', args.get('execution_thread_count'))
 	apply_state_item('execution_queue_count', args.get('execution_queue_count'))
+	apply_state_item('execution_autotune', args.get('execution_autotune'))
+	apply_state_item('execution_process_count', args.get('execution_process_count'))
+	apply_state_item('execution_process_device_ids', args.get('execution_process_device_ids'))
+	# session
+	apply_state_item('session_profile', args.get('session_profile'))
+	apply_state_item('session_model_profiles', args.get('session_model_profiles'))
+	apply_state_item('session_cache', args.get('session_cache'))
 	# download
 	apply_state_item('download_providers', args.get('download_providers'))
 	apply_state_item('download_scope', args.get('download_scope'))
 	# benchmark
 	apply_state_item('benchmark_resolutions', args.get('benchmark_resolutions'))
 	apply_state_item('benchmark_cycle_count', args.get('benchmark_cycle_count'))
+	apply_state_item('benchmark_mode', args.get('benchmark_mode'))
+	apply_state_item('benchmark_synthetic', args.get('benchmark_synthetic'))
+	apply_state_item('benchmark_report_path', args.get('benchmark_report_path'))
+	apply_state_item('benchmark_baseline_path', args.get('benchmark_baseline_path'))
 	# memory
 	apply_state_item('video_memory_strategy', args.get('video_memory_strategy'))
+	apply_state_item('video_memory_limit', args.get('video_memory_limit'))
 	apply_state_item('system_memory_limit', args.get('system_memory_limit'))
 	# misc
 	apply_state_item('log_level', args.get('log_level'))
 	apply_state_item('halt_on_error', args.get('halt_on_error'))
+	apply_state_item('metrics_profile', args.get('metrics_profile'))
 	# jobs
 	apply_state_item('job_id', args.get('job_id'))
 	apply_state_item('job_status', args.get('job_status'))
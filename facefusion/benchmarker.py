@@ -3,18 +3,39 @@ import os
 import statistics
 import tempfile
 from time import perf_counter
-from typing import Generator, List
+from typing import Any, Dict, Generator, List, Optional
+
+import cv2
+import numpy
 
 import facefusion.choices
-from facefusion import core, state_manager
+from facefusion import core, logger, metrics, process_manager, state_manager, wording
 from facefusion.cli_helper import render_table
+from facefusion.common_helper import get_first
 from facefusion.download import conditional_download, resolve_download_url
-from facefusion.filesystem import get_file_extension
-from facefusion.types import BenchmarkCycleSet
-from facefusion.vision import count_video_frame_total, detect_video_fps, detect_video_resolution, pack_resolution
+from facefusion.face_detector import detect_faces
+from facefusion.face_helper import WARP_TEMPLATE_SET, paste_back, warp_face_by_face_landmark_5
+from facefusion.face_landmarker import detect_face_landmark, estimate_face_landmark_68_5
+from facefusion.face_masker import create_box_mask, create_occlusion_mask, create_region_mask
+from facefusion.face_recognizer import calc_embedding
+from facefusion.face_store import set_static_faces
+from facefusion.ffmpeg import create_test_audio, create_test_video, extract_frames, merge_video
+from facefusion.filesystem import create_directory, filter_audio_paths, filter_image_paths, get_file_extension, get_file_name, is_file
+from facefusion.json import read_json, write_json
+from facefusion.processors.core import get_processors_modules, get_source_audio_frame, process_vision_frame
+from facefusion.temp_helper import clear_temp_directory, create_temp_directory, resolve_temp_frame_paths
+from facefusion.types import AudioFrame, BenchmarkComponentSet, BenchmarkCycleSet, BenchmarkResolution, Content, ErrorCode, Face, VisionFrame
+from facefusion.vision import count_video_frame_total, detect_video_fps, detect_video_resolution, pack_resolution, read_image, read_static_image, read_video_frame, write_image
+
+BENCHMARK_REGRESSION_TOLERANCE : float = 0.1
+BENCHMARK_SYNTHETIC_FPS : int = 25
+BENCHMARK_SYNTHETIC_DURATION : int = 10
 
 
 def pre_check() -> bool:
+	if state_manager.get_item('benchmark_synthetic'):
+		return create_synthetic_examples()
+
 	conditional_download('.assets/examples',
 	[
 		resolve_download_url('examples-3.0.0', 'source.jpg'),
@@ -30,11 +51,90 @@ def pre_check() -> bool:
 	return True
 
 
-def run() -> Generator[List[BenchmarkCycleSet], None, None]:
+def create_synthetic_examples() -> bool:
+	source_image_path, source_audio_path = resolve_source_paths()
+	process_manager.start()
+
+	if create_directory(os.path.dirname(source_image_path)) and not is_file(source_image_path):
+		write_image(source_image_path, render_synthetic_face(512))
+	if not is_file(source_audio_path):
+		create_test_audio(source_audio_path, BENCHMARK_SYNTHETIC_DURATION)
+
+	for benchmark_resolution in state_manager.get_item('benchmark_resolutions'):
+		target_path = resolve_target_path(benchmark_resolution)
+
+		if not is_file(target_path):
+			video_height = int(benchmark_resolution.rstrip('p'))
+			video_width = round(video_height * 16 / 9 / 2) * 2
+			overlay_path = os.path.join(tempfile.gettempdir(), get_file_name(target_path) + '.png')
+			write_image(overlay_path, render_synthetic_face(video_height // 2))
+			create_test_video(overlay_path, target_path, pack_resolution((video_width, video_height)), BENCHMARK_SYNTHETIC_FPS, BENCHMARK_SYNTHETIC_DURATION)
+
+	process_manager.end()
+	return all(is_file(file_path) for file_path in [ source_image_path, source_audio_path ] + [ resolve_target_path(benchmark_resolution) for benchmark_resolution in state_manager.get_item('benchmark_resolutions') ])
+
+
+def render_synthetic_face(face_size : int) -> VisionFrame:
+	vision_frame = numpy.full((face_size, face_size, 3), 96, dtype = numpy.uint8)
+	face_landmark_5 = (WARP_TEMPLATE_SET.get('arcface_112_v2') * face_size).astype(numpy.int32)
+	line_size = max(face_size // 48, 1)
+
+	cv2.ellipse(vision_frame, (face_size // 2, int(face_size * 0.56)), (int(face_size * 0.34), int(face_size * 0.44)), 0, 0, 360, (150, 180, 225), -1)
+	for face_landmark in face_landmark_5[:2]:
+		cv2.circle(vision_frame, tuple(face_landmark), line_size * 3, (255, 255, 255), -1)
+		cv2.circle(vision_frame, tuple(face_landmark), line_size * 2, (40, 30, 30), -1)
+	cv2.circle(vision_frame, tuple(face_landmark_5[2]), line_size * 2, (120, 150, 200), -1)
+	cv2.line(vision_frame, tuple(face_landmark_5[3]), tuple(face_landmark_5[4]), (70, 60, 170), line_size * 2)
+	return vision_frame
+
+
+def create_synthetic_face(vision_frame : VisionFrame, face_size : int) -> Face:
+	vision_height, vision_width = vision_frame.shape[:2]
+	face_offset = numpy.array([ (vision_width - face_size) // 2, (vision_height - face_size) // 2 ])
+	face_landmark_5 = WARP_TEMPLATE_SET.get('arcface_112_v2') * face_size + face_offset
+	face_landmark_68 = estimate_face_landmark_68_5(face_landmark_5)
+	embedding, normed_embedding = calc_embedding(vision_frame, face_landmark_5)
+
+	return Face(
+		bounding_box = numpy.concatenate([ face_offset, face_offset + face_size ]).astype(numpy.float32),
+		score_set = { 'detector': 1.0, 'landmarker': 1.0 },
+		landmark_set =
+		{
+			'5': face_landmark_5,
+			'5/68': face_landmark_5,
+			'68': face_landmark_68,
+			'68/5': face_landmark_68
+		},
+		angle = 0,
+		embedding = embedding,
+		normed_embedding = normed_embedding,
+		gender = 'female',
+		age = range(20, 29),
+		race = 'white'
+	)
+
+
+def resolve_source_paths() -> List[str]:
+	if state_manager.get_item('benchmark_synthetic'):
+		return [ '.assets/examples/synthetic-source.png', '.assets/examples/synthetic-source.mp3' ]
+	return [ '.assets/examples/source.jpg', '.assets/examples/source.mp3' ]
+
+
+def resolve_target_path(benchmark_resolution : BenchmarkResolution) -> str:
+	if state_manager.get_item('benchmark_synthetic'):
+		return '.assets/examples/synthetic-target-' + benchmark_resolution + '.mp4'
+	return facefusion.choices.benchmark_set.get(benchmark_resolution)
+
+
+def resolve_target_paths() -> List[str]:
 	benchmark_resolutions = state_manager.get_item('benchmark_resolutions')
+	return [ resolve_target_path(benchmark_resolution) for benchmark_resolution in benchmark_resolutions if benchmark_resolution in facefusion.choices.benchmark_set ]
+
+
+def run() -> Generator[List[BenchmarkCycleSet], None, None]:
 	benchmark_cycle_count = state_manager.get_item('benchmark_cycle_count')
 
-	state_manager.init_item('source_paths', [ '.assets/examples/source.jpg', '.assets/examples/source.mp3' ])
+	state_manager.init_item('source_paths', resolve_source_paths())
 	state_manager.init_item('face_landmarker_score', 0)
 	state_manager.init_item('temp_frame_format', 'bmp')
 	state_manager.init_item('output_audio_volume', 0)
@@ -42,28 +142,36 @@ def run() -> Generator[List[BenchmarkCycleSet], None, None]:
 	state_manager.init_item('video_memory_strategy', 'tolerant')
 
 	benchmarks = []
-	target_paths = [facefusion.choices.benchmark_set.get(benchmark_resolution) for benchmark_resolution in benchmark_resolutions if benchmark_resolution in facefusion.choices.benchmark_set]
 
-	for target_path in target_paths:
+	for target_path in resolve_target_paths():
 		state_manager.set_item('target_path', target_path)
 		state_manager.set_item('output_path', suggest_output_path(state_manager.get_item('target_path')))
-		benchmarks.append(cycle(benchmark_cycle_count))
+		benchmark_set = cycle(benchmark_cycle_count)
+
+		if not benchmark_set:
+			logger.error(wording.get('benchmark_failed').format(target_path = target_path), __name__)
+			return
+		benchmarks.append(benchmark_set)
 		yield benchmarks
 
 
-def cycle(cycle_count : int) -> BenchmarkCycleSet:
+def cycle(cycle_count : int) -> Optional[BenchmarkCycleSet]:
 	process_times = []
 	video_frame_total = count_video_frame_total(state_manager.get_item('target_path'))
 	output_video_resolution = detect_video_resolution(state_manager.get_item('target_path'))
 	state_manager.set_item('output_video_resolution', pack_resolution(output_video_resolution))
 	state_manager.set_item('output_video_fps', detect_video_fps(state_manager.get_item('target_path')))
 
-	core.conditional_process()
+	if core.conditional_process():
+		return None
 
 	for index in range(cycle_count):
 		start_time = perf_counter()
-		core.conditional_process()
+		error_code = core.conditional_process()
 		end_time = perf_counter()
+
+		if error_code:
+			return None
 		process_times.append(end_time - start_time)
 
 	average_run = round(statistics.mean(process_times), 2)
@@ -82,13 +190,140 @@ def cycle(cycle_count : int) -> BenchmarkCycleSet:
 	}
 
 
+def run_components() -> Generator[List[BenchmarkComponentSet], None, None]:
+	benchmark_cycle_count = state_manager.get_item('benchmark_cycle_count')
+
+	state_manager.init_item('source_paths', resolve_source_paths())
+	state_manager.init_item('face_selector_mode', 'many')
+	state_manager.init_item('temp_frame_format', 'bmp')
+	state_manager.init_item('output_video_preset', 'ultrafast')
+	state_manager.init_item('video_memory_strategy', 'tolerant')
+
+	benchmarks = []
+
+	for target_path in resolve_target_paths():
+		state_manager.set_item('target_path', target_path)
+		benchmarks.append(cycle_components(benchmark_cycle_count))
+		yield benchmarks
+
+
+def cycle_components(cycle_count : int) -> BenchmarkComponentSet:
+	source_vision_frame = read_static_image(get_first(filter_image_paths(state_manager.get_item('source_paths'))))
+	source_audio_path = get_first(filter_audio_paths(state_manager.get_item('source_paths')))
+	target_vision_frame = read_video_frame(state_manager.get_item('target_path'))
+	source_audio_frame = get_source_audio_frame(source_audio_path, detect_video_fps(state_manager.get_item('target_path')), 0)
+	source_face = create_synthetic_face(source_vision_frame, min(source_vision_frame.shape[:2]))
+	target_face = create_synthetic_face(target_vision_frame, target_vision_frame.shape[0] // 2)
+	process_manager.start()
+
+	cycle_component(source_face, source_audio_frame, target_face, target_vision_frame)
+	metrics.clear_metrics()
+
+	for index in range(cycle_count):
+		cycle_component(source_face, source_audio_frame, target_face, target_vision_frame)
+
+	process_manager.end()
+	return\
+	{
+		'target_path': state_manager.get_item('target_path'),
+		'cycle_count': cycle_count,
+		'components': metrics.create_metric_profile()
+	}
+
+
+def cycle_component(source_face : Face, source_audio_frame : AudioFrame, target_face : Face, target_vision_frame : VisionFrame) -> None:
+	target_path = state_manager.get_item('target_path')
+	temp_video_resolution = pack_resolution(detect_video_resolution(target_path))
+	temp_video_fps = detect_video_fps(target_path)
+	video_frame_total = count_video_frame_total(target_path)
+	face_landmark_5 = target_face.landmark_set.get('5')
+
+	detect_faces(target_vision_frame)
+	detect_face_landmark(target_vision_frame, target_face.bounding_box, target_face.angle)
+	calc_embedding(target_vision_frame, face_landmark_5)
+	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(target_vision_frame, face_landmark_5, 'arcface_128', (512, 512))
+	crop_mask = create_box_mask(crop_vision_frame, state_manager.get_item('face_mask_blur'), state_manager.get_item('face_mask_padding'))
+	create_occlusion_mask(crop_vision_frame)
+	create_region_mask(crop_vision_frame, state_manager.get_item('face_mask_regions'))
+	paste_back(target_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
+
+	set_static_faces(target_vision_frame, [ target_face ])
+	process_vision_frame(get_processors_modules(state_manager.get_item('processors')), {}, source_face, source_audio_frame, target_vision_frame, None)
+
+	if create_temp_directory(target_path) and extract_frames(target_path, temp_video_resolution, temp_video_fps, 0, video_frame_total):
+		for temp_frame_path in resolve_temp_frame_paths(target_path):
+			write_image(temp_frame_path, read_image(temp_frame_path))
+		merge_video(target_path, temp_video_fps, temp_video_resolution, temp_video_fps, 0, video_frame_total)
+	clear_temp_directory(target_path)
+
+
+def collect_benchmark_values(benchmark_report : Content) -> Dict[str, float]:
+	benchmark_values = {}
+
+	for benchmark_set in benchmark_report.get('benchmarks'):
+		benchmark_name = get_file_name(benchmark_set.get('target_path'))
+
+		if 'components' in benchmark_set:
+			for component_name, component_summary in benchmark_set.get('components').items():
+				benchmark_values[benchmark_name + '/' + component_name] = component_summary.get('mean')
+		else:
+			benchmark_values[benchmark_name] = benchmark_set.get('average_run')
+	return benchmark_values
+
+
+def compare_benchmark_values(benchmark_values : Dict[str, float], baseline_values : Dict[str, float]) -> List[List[Any]]:
+	benchmark_comparisons = []
+
+	for benchmark_name, benchmark_value in benchmark_values.items():
+		baseline_value = baseline_values.get(benchmark_name)
+
+		if baseline_value:
+			benchmark_change = (benchmark_value - baseline_value) / baseline_value
+			benchmark_comparisons.append([ benchmark_name, baseline_value, benchmark_value, round(benchmark_change * 100, 2), benchmark_change > BENCHMARK_REGRESSION_TOLERANCE ])
+	return benchmark_comparisons
+
+
 def suggest_output_path(target_path : str) -> str:
 	target_file_extension = get_file_extension(target_path)
 	return os.path.join(tempfile.gettempdir(), hashlib.sha1().hexdigest()[:8] + target_file_extension)
 
 
-def render() -> None:
-	benchmarks = []
+def render() -> ErrorCode:
+	benchmark_report : Content =\
+	{
+		'benchmark_mode': state_manager.get_item('benchmark_mode') or 'cycle',
+		'benchmarks': []
+	}
+
+	if benchmark_report.get('benchmark_mode') == 'component':
+		for benchmark_components in run_components():
+			benchmark_report['benchmarks'] = benchmark_components
+		render_component_table(benchmark_report.get('benchmarks'))
+	else:
+		for benchmark_cycles in run():
+			benchmark_report['benchmarks'] = benchmark_cycles
+		render_cycle_table(benchmark_report.get('benchmarks'))
+
+	if len(benchmark_report.get('benchmarks')) < len(resolve_target_paths()):
+		return 1
+
+	if state_manager.get_item('benchmark_report_path'):
+		write_json(state_manager.get_item('benchmark_report_path'), benchmark_report)
+
+	if state_manager.get_item('benchmark_baseline_path'):
+		baseline_report = read_json(state_manager.get_item('benchmark_baseline_path'))
+
+		if not baseline_report:
+			return 1
+		benchmark_comparisons = compare_benchmark_values(collect_benchmark_values(benchmark_report), collect_benchmark_values(baseline_report))
+		render_table([ 'benchmark', 'baseline', 'current', 'change', 'regression' ], benchmark_comparisons)
+
+		if any(benchmark_comparison[-1] for benchmark_comparison in benchmark_comparisons):
+			return 1
+	return 0
+
+
+def render_cycle_table(benchmarks : List[BenchmarkCycleSet]) -> None:
 	headers =\
 	[
 		'target_path',
@@ -98,9 +333,23 @@ def render() -> None:
 		'slowest_run',
 		'relative_fps'
 	]
+	contents = [ list(benchmark_set.values()) for benchmark_set in benchmarks ]
+	render_table(headers, contents)
 
-	for benchmark in run():
-		benchmarks = benchmark
 
-	contents = [ list(benchmark_set.values()) for benchmark_set in benchmarks ]
+def render_component_table(benchmarks : List[BenchmarkComponentSet]) -> None:
+	headers =\
+	[
+		'target_path',
+		'component',
+		'count',
+		'mean',
+		'p50',
+		'p95'
+	]
+	contents = []
+
+	for benchmark_set in benchmarks:
+		for component_name, component_summary in benchmark_set.get('components').items():
+			contents.append([ benchmark_set.get('target_path'), component_name, component_summary.get('count'), component_summary.get('mean'), component_summary.get('p50'), component_summary.get('p95') ])
 	render_table(headers, contents)
@@ -2,7 +2,7 @@ import logging
 from typing import List, Sequence
 
 from facefusion.common_helper import create_float_range, create_int_range
-from facefusion.types import Angle, AudioEncoder, AudioFormat, AudioTypeSet, BenchmarkResolution, BenchmarkSet, DownloadProvider, DownloadProviderSet, DownloadScope, EncoderSet, ExecutionProvider, ExecutionProviderSet, FaceDetectorModel, FaceDetectorSet, FaceLandmarkerModel, FaceMaskArea, FaceMaskAreaSet, FaceMaskRegion, FaceMaskRegionSet, FaceMaskType, FaceOccluderModel, FaceParserModel, FaceSelectorMode, FaceSelectorOrder, Gender, ImageFormat, ImageTypeSet, JobStatus, LogLevel, LogLevelSet, Race, Score, TempFrameFormat, UiWorkflow, VideoEncoder, VideoFormat, VideoMemoryStrategy, VideoPreset, VideoTypeSet, WebcamMode
+from facefusion.types import Angle, AudioEncoder, AudioFormat, AudioTypeSet, BenchmarkMode, BenchmarkResolution, BenchmarkSet, DownloadProvider, DownloadProviderSet, DownloadScope, EncoderSet, ExecutionProvider, ExecutionProviderSet, FaceDetectorModel, FaceDetectorSet, FaceLandmarkerModel, FaceMaskArea, FaceMaskAreaSet, FaceMaskRegion, FaceMaskRegionSet, FaceMaskType, FaceOccluderModel, FaceParserModel, FaceSelectorMode, FaceSelectorOrder, Gender, ImageFormat, ImageTypeSet, JobStatus, LogLevel, LogLevelSet, Race, Score, SessionProfile, SessionProfileSet, TempFrameFormat, UiWorkflow, VideoEncoder, VideoFormat, VideoMemoryStrategy, VideoPreset, VideoProcessMode, VideoTypeSet, WebcamMode
 
 face_detector_set : FaceDetectorSet =\
 {
@@ -72,6 +72,7 @@ audio_formats : List[AudioFormat] = list(audio_type_set.keys())
 image_formats : List[ImageFormat] = list(image_type_set.keys())
 video_formats : List[VideoFormat] = list(video_type_set.keys())
 temp_frame_formats : List[TempFrameFormat] = [ 'bmp', 'jpeg', 'png', 'tiff' ]
+video_process_modes : List[VideoProcessMode] = [ 'sequential', 'fused', 'stream' ]
 
 output_encoder_set : EncoderSet =\
 {
@@ -96,6 +97,7 @@ benchmark_set : BenchmarkSet =\
 	'2160p': '.assets/examples/target-2160p.mp4'
 }
 benchmark_resolutions : List[BenchmarkResolution] = list(benchmark_set.keys())
+benchmark_modes : List[BenchmarkMode] = [ 'cycle', 'component' ]
 
 webcam_modes : List[WebcamMode] = [ 'inline', 'udp', 'v4l2' ]
 webcam_resolutions : List[str] = [ '320x240', '640x480', '800x600', '1024x768', '1280x720', '1280x960', '1920x1080', '2560x1440', '3840x2160' ]
@@ -111,6 +113,42 @@ execution_provider_set : ExecutionProviderSet =\
 	'cpu': 'CPUExecutionProvider'
 }
 execution_providers : List[ExecutionProvider] = list(execution_provider_set.keys())
+session_profile_set : SessionProfileSet =\
+{
+	'balanced':
+	{
+		'intra_op_thread_count': 0,
+		'inter_op_thread_count': 1,
+		'execution_mode': 'sequential',
+		'graph_optimization': 'all',
+		'memory_arena': True
+	},
+	'throughput':
+	{
+		'intra_op_thread_count': 1,
+		'inter_op_thread_count': 1,
+		'execution_mode': 'sequential',
+		'graph_optimization': 'all',
+		'memory_arena': True
+	},
+	'latency':
+	{
+		'intra_op_thread_count': 0,
+		'inter_op_thread_count': 0,
+		'execution_mode': 'parallel',
+		'graph_optimization': 'all',
+		'memory_arena': True
+	},
+	'memory':
+	{
+		'intra_op_thread_count': 0,
+		'inter_op_thread_count': 1,
+		'execution_mode': 'sequential',
+		'graph_optimization': 'basic',
+		'memory_arena': False
+	}
+}
+session_profiles : List[SessionProfile] = list(session_profile_set.keys())
 download_provider_set : DownloadProviderSet =\
 {
 	'github':
@@ -151,9 +189,12 @@ job_statuses : List[JobStatus] = [ 'drafted', 'queued', 'completed', 'failed' ]
 benchmark_cycle_count_range : Sequence[int] = create_int_range(1, 10, 1)
 execution_thread_count_range : Sequence[int] = create_int_range(1, 32, 1)
 execution_queue_count_range : Sequence[int] = create_int_range(1, 4, 1)
+execution_process_count_range : Sequence[int] = create_int_range(1, 32, 1)
+video_memory_limit_range : Sequence[int] = create_int_range(0, 65536, 256)
 system_memory_limit_range : Sequence[int] = create_int_range(0, 128, 4)
 face_detector_angles : Sequence[Angle] = create_int_range(0, 270, 90)
 face_detector_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
+face_tracker_interval_range : Sequence[int] = create_int_range(1, 30, 1)
 face_landmarker_score_range : Sequence[Score] = create_float_range(0.0, 1.0, 0.05)
 face_mask_blur_range : Sequence[float] = create_float_range(0.0, 1.0, 0.05)
 face_mask_padding_range : Sequence[int] = create_int_range(0, 100, 1)
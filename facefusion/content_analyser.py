@@ -1,18 +1,26 @@
+import hashlib
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from functools import lru_cache
-from typing import List, Tuple
+from typing import Dict, Generator, List, Optional, Set, Tuple
 
 import numpy
+from onnxruntime import InferenceSession
 from tqdm import tqdm
 
 from facefusion import inference_manager, state_manager, wording
+from facefusion.common_helper import get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
 from facefusion.filesystem import resolve_relative_path
+from facefusion.metrics import measure
 from facefusion.thread_helper import conditional_thread_semaphore
 from facefusion.types import Detection, DownloadScope, DownloadSet, ExecutionProvider, Fps, InferencePool, ModelSet, VisionFrame
-from facefusion.vision import detect_video_fps, fit_frame, read_image, read_video_frame
+from facefusion.vision import detect_video_fps, fit_frame, read_image, read_video_frames
 
 STREAM_COUNTER = 0
+ANALYSE_CONTENT_SET : Dict[str, bool] = {}
+ANALYSE_BATCH_SIZE : int = 8
 
 
 @lru_cache(maxsize = None)
@@ -95,6 +103,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ 'nsfw_1', 'nsfw_2', 'nsfw_3' ]
+	_, model_source_set = collect_model_downloads()
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ 'nsfw_1', 'nsfw_2', 'nsfw_3' ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -137,89 +152,159 @@ def analyse_frame(vision_frame : VisionFrame) -> bool:
 	return detect_nsfw(vision_frame)
 
 
-@lru_cache(maxsize = None)
 def analyse_image(image_path : str) -> bool:
-	vision_frame = read_image(image_path)
-	return analyse_frame(vision_frame)
+	analyse_key = create_analyse_key(image_path)
+
+	if analyse_key not in ANALYSE_CONTENT_SET:
+		vision_frame = read_image(image_path)
+		ANALYSE_CONTENT_SET[analyse_key] = analyse_frame(vision_frame)
+	return ANALYSE_CONTENT_SET.get(analyse_key)
 
 
-@lru_cache(maxsize = None)
 def analyse_video(video_path : str, trim_frame_start : int, trim_frame_end : int) -> bool:
+	analyse_key = create_analyse_key(video_path, trim_frame_start, trim_frame_end)
+
+	if analyse_key in ANALYSE_CONTENT_SET:
+		return ANALYSE_CONTENT_SET.get(analyse_key)
+
 	video_fps = detect_video_fps(video_path)
-	frame_range = range(trim_frame_start, trim_frame_end)
-	rate = 0.0
-	total = 0
-	counter = 0
+	frame_numbers = [ frame_number for frame_number in range(trim_frame_start, trim_frame_end) if frame_number % int(video_fps) == 0 ]
+	execution_thread_count = state_manager.get_item('execution_thread_count')
+	analyse_futures : Set[Future[List[bool]]] = set()
+	nsfw_votes : List[bool] = []
+
+	with tqdm(total = len(frame_numbers), desc = wording.get('analysing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		with ThreadPoolExecutor(max_workers = execution_thread_count) as executor:
+			for vision_frames in batch_video_frames(video_path, frame_numbers):
+				analyse_futures.add(executor.submit(detect_nsfw_batch, vision_frames))
+				analyse_futures = collect_nsfw_votes(analyse_futures, execution_thread_count, nsfw_votes, progress)
+
+			collect_nsfw_votes(analyse_futures, 0, nsfw_votes, progress)
+
+	ANALYSE_CONTENT_SET[analyse_key] = bool(calc_nsfw_rate(nsfw_votes) > 10.0)
+	return ANALYSE_CONTENT_SET.get(analyse_key)
+
+
+def batch_video_frames(video_path : str, frame_numbers : List[int]) -> Generator[List[VisionFrame], None, None]:
+	vision_frames = []
+
+	for vision_frame in read_video_frames(video_path, frame_numbers):
+		vision_frames.append(vision_frame)
+
+		if len(vision_frames) == ANALYSE_BATCH_SIZE:
+			yield vision_frames
+			vision_frames = []
+
+	if vision_frames:
+		yield vision_frames
 
-	with tqdm(total = len(frame_range), desc = wording.get('analysing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
 
-		for frame_number in frame_range:
-			if frame_number % int(video_fps) == 0:
-				vision_frame = read_video_frame(video_path, frame_number)
-				total += 1
-				if analyse_frame(vision_frame):
-					counter += 1
-			if counter > 0 and total > 0:
-				rate = counter / total * 100
-			progress.set_postfix(rate = rate)
-			progress.update()
+def collect_nsfw_votes(analyse_futures : Set[Future[List[bool]]], future_limit : int, nsfw_votes : List[bool], progress : tqdm) -> Set[Future[List[bool]]]:
+	while len(analyse_futures) > future_limit:
+		done_futures, analyse_futures = wait(analyse_futures, return_when = FIRST_COMPLETED)
 
-	return bool(rate > 10.0)
+		for done_future in done_futures:
+			nsfw_votes.extend(done_future.result())
+			progress.update(len(done_future.result()))
+		progress.set_postfix(rate = calc_nsfw_rate(nsfw_votes))
+	return analyse_futures
+
+
+def calc_nsfw_rate(nsfw_votes : List[bool]) -> float:
+	if nsfw_votes:
+		return sum(nsfw_votes) / len(nsfw_votes) * 100
+	return 0.0
+
+
+def create_analyse_key(file_path : str, trim_frame_start : int = 0, trim_frame_end : int = 0) -> str:
+	file_digest = create_static_file_digest(file_path, os.path.getsize(file_path), os.path.getmtime(file_path))
+	return file_digest + '.' + str(trim_frame_start) + '.' + str(trim_frame_end)
+
+
+@lru_cache(maxsize = None)
+def create_static_file_digest(file_path : str, file_size : int, file_modified_time : float) -> str:
+	file_hash = hashlib.sha256()
+
+	with open(file_path, 'rb') as file:
+		for file_chunk in iter(lambda: file.read(1024 * 1024), b''):
+			file_hash.update(file_chunk)
+	return file_hash.hexdigest()
 
 
 def detect_nsfw(vision_frame : VisionFrame) -> bool:
-	is_nsfw_1 = detect_with_nsfw_1(vision_frame)
-	is_nsfw_2 = detect_with_nsfw_2(vision_frame)
-	is_nsfw_3 = detect_with_nsfw_3(vision_frame)
+	return get_first(detect_nsfw_batch([ vision_frame ]))
 
-	return is_nsfw_1 and is_nsfw_2 or is_nsfw_1 and is_nsfw_3 or is_nsfw_2 and is_nsfw_3
 
+def detect_nsfw_batch(vision_frames : List[VisionFrame]) -> List[bool]:
+	is_nsfw_1 = detect_with_nsfw_1(vision_frames)
+	is_nsfw_2 = detect_with_nsfw_2(vision_frames)
+	nsfw_votes = [ is_nsfw_1[index] if is_nsfw_1[index] == is_nsfw_2[index] else None for index in range(len(vision_frames)) ]
+	vote_indices = [ index for index, nsfw_vote in enumerate(nsfw_votes) if nsfw_vote is None ]
 
-def detect_with_nsfw_1(vision_frame : VisionFrame) -> bool:
-	detect_vision_frame = prepare_detect_frame(vision_frame, 'nsfw_1')
-	detection = forward_nsfw(detect_vision_frame, 'nsfw_1')
-	detection_score = numpy.max(numpy.amax(detection[:, 4:], axis = 1))
-	return bool(detection_score > 0.2)
+	if vote_indices:
+		is_nsfw_3 = detect_with_nsfw_3([ vision_frames[index] for index in vote_indices ])
 
+		for vote_index, index in enumerate(vote_indices):
+			nsfw_votes[index] = is_nsfw_3[vote_index]
 
-def detect_with_nsfw_2(vision_frame : VisionFrame) -> bool:
-	detect_vision_frame = prepare_detect_frame(vision_frame, 'nsfw_2')
-	detection = forward_nsfw(detect_vision_frame, 'nsfw_2')
-	detection_score = detection[0] - detection[1]
-	return bool(detection_score > 0.25)
+	return [ bool(nsfw_vote) for nsfw_vote in nsfw_votes ]
 
 
-def detect_with_nsfw_3(vision_frame : VisionFrame) -> bool:
-	detect_vision_frame = prepare_detect_frame(vision_frame, 'nsfw_3')
-	detection = forward_nsfw(detect_vision_frame, 'nsfw_3')
-	detection_score = (detection[2] + detection[3]) - (detection[0] + detection[1])
-	return bool(detection_score > 10.5)
+def detect_with_nsfw_1(vision_frames : List[VisionFrame]) -> List[bool]:
+	detect_vision_frames = prepare_detect_frames(vision_frames, 'nsfw_1')
+	detections = forward_nsfw(detect_vision_frames, 'nsfw_1')
+	return [ bool(numpy.max(numpy.amax(detection[4:], axis = 0)) > 0.2) for detection in detections ]
 
 
-def forward_nsfw(vision_frame : VisionFrame, nsfw_model : str) -> Detection:
-	content_analyser = get_inference_pool().get(nsfw_model)
+def detect_with_nsfw_2(vision_frames : List[VisionFrame]) -> List[bool]:
+	detect_vision_frames = prepare_detect_frames(vision_frames, 'nsfw_2')
+	detections = forward_nsfw(detect_vision_frames, 'nsfw_2')
+	return [ bool(detection[0] - detection[1] > 0.25) for detection in detections ]
 
-	with conditional_thread_semaphore():
-		detection = content_analyser.run(None,
-		{
-			'input': vision_frame
-		})[0]
 
-	if nsfw_model in [ 'nsfw_2', 'nsfw_3' ]:
-		return detection[0]
+def detect_with_nsfw_3(vision_frames : List[VisionFrame]) -> List[bool]:
+	detect_vision_frames = prepare_detect_frames(vision_frames, 'nsfw_3')
+	detections = forward_nsfw(detect_vision_frames, 'nsfw_3')
+	return [ bool((detection[2] + detection[3]) - (detection[0] + detection[1]) > 10.5) for detection in detections ]
 
-	return detection
 
+@measure
+def forward_nsfw(detect_vision_frames : VisionFrame, nsfw_model : str) -> List[Detection]:
+	content_analyser = get_inference_session(nsfw_model)
+	detections : List[Detection] = []
+	batch_size = resolve_batch_size(content_analyser, len(detect_vision_frames))
 
-def prepare_detect_frame(temp_vision_frame : VisionFrame, model_name : str) -> VisionFrame:
+	for index in range(0, len(detect_vision_frames), batch_size):
+		with conditional_thread_semaphore():
+			detection = content_analyser.run(None,
+			{
+				'input': detect_vision_frames[index:index + batch_size]
+			})[0]
+
+		detections.extend(detection)
+
+	return detections
+
+
+def resolve_batch_size(content_analyser : InferenceSession, frame_total : int) -> int:
+	batch_size = get_first(content_analyser.get_inputs()[0].shape)
+
+	if isinstance(batch_size, int) and batch_size > 0:
+		return batch_size
+	return max(frame_total, 1)
+
+
+def prepare_detect_frames(temp_vision_frames : List[VisionFrame], model_name : str) -> VisionFrame:
 	model_set = create_static_model_set('full').get(model_name)
 	model_size = model_set.get('size')
 	model_mean = model_set.get('mean')
 	model_standard_deviation = model_set.get('standard_deviation')
-
-	detect_vision_frame = fit_frame(temp_vision_frame, model_size)
-	detect_vision_frame = detect_vision_frame[:, :, ::-1] / 255.0
-	detect_vision_frame -= model_mean
-	detect_vision_frame /= model_standard_deviation
-	detect_vision_frame = numpy.expand_dims(detect_vision_frame.transpose(2, 0, 1), axis = 0).astype(numpy.float32)
-	return detect_vision_frame
+	detect_vision_frames = numpy.zeros((len(temp_vision_frames), 3, model_size[1], model_size[0]), dtype = numpy.float32)
+
+	for index, temp_vision_frame in enumerate(temp_vision_frames):
+		detect_vision_frame = fit_frame(temp_vision_frame, model_size)
+		detect_vision_frame = detect_vision_frame[:, :, ::-1] / 255.0
+		detect_vision_frame -= model_mean
+		detect_vision_frame /= model_standard_deviation
+		detect_vision_frames[index] = detect_vision_frame.transpose(2, 0, 1)
+	return detect_vision_frames
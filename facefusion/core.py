@@ -7,26 +7,27 @@ from time import time
 
 import numpy
 
-from facefusion import benchmarker, cli_helper, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, hash_helper, logger, process_manager, state_manager, video_manager, voice_extractor, wording
+from facefusion import benchmarker, cli_helper, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, hash_helper, logger, metrics, process_manager, segment_runner, state_manager, video_manager, voice_extractor, wording
 from facefusion.args import apply_args, collect_job_args, reduce_job_args, reduce_step_args
 from facefusion.common_helper import get_first
 from facefusion.content_analyser import analyse_image, analyse_video
 from facefusion.download import conditional_download_hashes, conditional_download_sources
 from facefusion.exit_helper import hard_exit, signal_exit
-from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
+from facefusion.face_analyser import get_average_face, get_many_faces, get_many_image_faces, get_one_face
 from facefusion.face_selector import sort_and_filter_faces
-from facefusion.face_store import append_reference_face, clear_reference_faces, get_reference_faces
-from facefusion.ffmpeg import copy_image, extract_frames, finalize_image, merge_video, replace_audio, restore_audio
-from facefusion.filesystem import filter_audio_paths, get_file_name, is_image, is_video, resolve_file_paths, resolve_file_pattern
+from facefusion.face_store import append_reference_face, clear_reference_faces, clear_static_faces, get_reference_faces
+from facefusion.face_tracker import clear_face_tracks
+from facefusion.ffmpeg import close_stream, copy_image, extract_frames, finalize_image, merge_video, open_extract_stream, open_merge_stream, replace_audio, restore_audio
+from facefusion.filesystem import filter_audio_paths, filter_image_paths, get_file_name, is_image, is_video, resolve_file_paths, resolve_file_pattern
 from facefusion.jobs import job_helper, job_manager, job_runner
 from facefusion.jobs.job_list import compose_job_list
 from facefusion.memory import limit_system_memory
-from facefusion.processors.core import get_processors_modules
+from facefusion.processors.core import get_processors_modules, multi_process_frames, multi_process_stream, process_fused_frames
 from facefusion.program import create_program
 from facefusion.program_helper import validate_args
 from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, move_temp_file, resolve_temp_frame_paths
-from facefusion.types import Args, ErrorCode
-from facefusion.vision import pack_resolution, read_image, read_static_images, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
+from facefusion.types import Args, ErrorCode, Fps
+from facefusion.vision import pack_resolution, predict_video_frame_total, read_image, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
 
 
 def cli() -> None:
@@ -62,7 +63,8 @@ def route(args : Args) -> None:
 	if state_manager.get_item('command') == 'benchmark':
 		if not common_pre_check() or not processors_pre_check() or not benchmarker.pre_check():
 			return hard_exit(2)
-		benchmarker.render()
+		error_code = benchmarker.render()
+		return hard_exit(error_code)
 
 	if state_manager.get_item('command') in [ 'job-list', 'job-create', 'job-submit', 'job-submit-all', 'job-delete', 'job-delete-all', 'job-add-step', 'job-remix-step', 'job-insert-step', 'job-remove-step' ]:
 		if not job_manager.init_jobs(state_manager.get_item('jobs_path')):
@@ -128,7 +130,7 @@ def common_pre_check() -> bool:
 	]
 
 	content_analyser_content = inspect.getsource(content_analyser).encode()
-	is_valid = hash_helper.create_hash(content_analyser_content) == 'b159fd9d'
+	is_valid = hash_helper.create_hash(content_analyser_content) == 'f1a31d8e'
 
 	return all(module.pre_check() for module in common_modules) and is_valid
 
@@ -322,6 +324,7 @@ def process_batch(args : Args) -> ErrorCode:
 
 def process_step(job_id : str, step_index : int, step_args : Args) -> bool:
 	clear_reference_faces()
+	clear_face_tracks()
 	step_total = job_manager.count_step_total(job_id)
 	step_args.update(collect_job_args())
 	apply_args(step_args, state_manager.set_item)
@@ -335,6 +338,8 @@ def process_step(job_id : str, step_index : int, step_args : Args) -> bool:
 
 def conditional_process() -> ErrorCode:
 	start_time = time()
+	error_code : ErrorCode = 0
+	metrics.clear_metrics()
 
 	for processor_module in get_processors_modules(state_manager.get_item('processors')):
 		if not processor_module.pre_process('output'):
@@ -343,17 +348,18 @@ def conditional_process() -> ErrorCode:
 	conditional_append_reference_faces()
 
 	if is_image(state_manager.get_item('target_path')):
-		return process_image(start_time)
+		error_code = process_image(start_time)
 	if is_video(state_manager.get_item('target_path')):
-		return process_video(start_time)
+		error_code = process_video(start_time)
 
-	return 0
+	if state_manager.get_item('metrics_profile') and error_code == 0:
+		metrics.write_metric_profile(state_manager.get_item('output_path'))
+	return error_code
 
 
 def conditional_append_reference_faces() -> None:
 	if 'reference' in state_manager.get_item('face_selector_mode') and not get_reference_faces():
-		source_frames = read_static_images(state_manager.get_item('source_paths'))
-		source_faces = get_many_faces(source_frames)
+		source_faces = get_many_image_faces(filter_image_paths(state_manager.get_item('source_paths')))
 		source_face = get_average_face(source_faces)
 		if is_video(state_manager.get_item('target_path')):
 			reference_frame = read_video_frame(state_manager.get_item('target_path'), state_manager.get_item('reference_frame_number'))
@@ -429,44 +435,73 @@ def process_video(start_time : float) -> ErrorCode:
 	clear_temp_directory(state_manager.get_item('target_path'))
 	logger.debug(wording.get('creating_temp'), __name__)
 	create_temp_directory(state_manager.get_item('target_path'))
+	clear_static_faces()
 
 	process_manager.start()
 	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
 	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
-	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
-	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
-		logger.debug(wording.get('extracting_frames_succeed'), __name__)
-	else:
-		if is_process_stopping():
+	if state_manager.get_item('video_process_mode') == 'stream':
+		logger.info(wording.get('streaming_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+		if stream_video(temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
+			logger.debug(wording.get('streaming_frames_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('streaming_frames_failed'), __name__)
 			process_manager.end()
-			return 4
-		logger.error(wording.get('extracting_frames_failed'), __name__)
-		process_manager.end()
-		return 1
-
-	temp_frame_paths = resolve_temp_frame_paths(state_manager.get_item('target_path'))
-	if temp_frame_paths:
-		for processor_module in get_processors_modules(state_manager.get_item('processors')):
-			logger.info(wording.get('processing'), processor_module.__name__)
-			processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
-			processor_module.post_process()
-		if is_process_stopping():
-			return 4
+			return 1
 	else:
-		logger.error(wording.get('temp_frames_not_found'), __name__)
-		process_manager.end()
-		return 1
+		logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+		if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
+			logger.debug(wording.get('extracting_frames_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('extracting_frames_failed'), __name__)
+			process_manager.end()
+			return 1
 
-	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
-	if merge_video(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end):
-		logger.debug(wording.get('merging_video_succeed'), __name__)
-	else:
-		if is_process_stopping():
+		temp_frame_paths = resolve_temp_frame_paths(state_manager.get_item('target_path'))
+		if temp_frame_paths and state_manager.get_item('execution_process_count') > 1:
+			logger.info(wording.get('processing'), __name__)
+			if segment_runner.run_segments(temp_video_fps, temp_frame_paths):
+				logger.debug(wording.get('merging_video_succeed'), __name__)
+			else:
+				if is_process_stopping():
+					return 4
+				logger.error(wording.get('merging_video_failed'), __name__)
+				process_manager.end()
+				return 1
+		elif temp_frame_paths:
+			if state_manager.get_item('video_process_mode') == 'fused':
+				logger.info(wording.get('processing'), __name__)
+				multi_process_frames(state_manager.get_item('source_paths'), temp_frame_paths, process_fused_frames)
+				for processor_module in get_processors_modules(state_manager.get_item('processors')):
+					processor_module.post_process()
+			else:
+				for processor_module in get_processors_modules(state_manager.get_item('processors')):
+					logger.info(wording.get('processing'), processor_module.__name__)
+					processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
+					processor_module.post_process()
+			if is_process_stopping():
+				return 4
+
+			logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
+			if merge_video(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end):
+				logger.debug(wording.get('merging_video_succeed'), __name__)
+			else:
+				if is_process_stopping():
+					process_manager.end()
+					return 4
+				logger.error(wording.get('merging_video_failed'), __name__)
+				process_manager.end()
+				return 1
+		else:
+			logger.error(wording.get('temp_frames_not_found'), __name__)
 			process_manager.end()
-			return 4
-		logger.error(wording.get('merging_video_failed'), __name__)
-		process_manager.end()
-		return 1
+			return 1
 
 	if state_manager.get_item('output_audio_volume') == 0:
 		logger.info(wording.get('skipping_audio'), __name__)
@@ -510,6 +545,22 @@ def process_video(start_time : float) -> ErrorCode:
 	return 0
 
 
+def stream_video(temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
+	frame_total = predict_video_frame_total(state_manager.get_item('target_path'), temp_video_fps, trim_frame_start, trim_frame_end)
+	extract_process = open_extract_stream(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	merge_process = open_merge_stream(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'))
+
+	try:
+		is_streamed = multi_process_stream(state_manager.get_item('source_paths'), extract_process, merge_process, temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), frame_total)
+
+		for processor_module in get_processors_modules(state_manager.get_item('processors')):
+			processor_module.post_process()
+	finally:
+		is_extract_closed = close_stream(extract_process)
+		is_merge_closed = close_stream(merge_process)
+	return is_streamed and is_extract_closed and is_merge_closed
+
+
 def is_process_stopping() -> bool:
 	if process_manager.is_stopping():
 		process_manager.end()
@@ -1,13 +1,14 @@
+import os
 import shutil
 import subprocess
 import xml.etree.ElementTree as ElementTree
 from functools import lru_cache
 from typing import List, Optional
 
-from onnxruntime import get_available_providers, set_default_logger_severity
+from onnxruntime import ExecutionMode, GraphOptimizationLevel, SessionOptions, get_available_providers, set_default_logger_severity
 
 import facefusion.choices
-from facefusion.types import ExecutionDevice, ExecutionProvider, InferenceSessionProvider, ValueAndUnit
+from facefusion.types import ExecutionDevice, ExecutionProvider, InferenceSessionProvider, SessionExecutionMode, SessionGraphOptimization, SessionProfile, ValueAndUnit
 
 set_default_logger_severity(3)
 
@@ -72,6 +73,40 @@ def create_inference_session_providers(execution_device_id : str, execution_prov
 	return inference_session_providers
 
 
+def create_inference_session_options(session_profile : SessionProfile, execution_thread_total : int) -> SessionOptions:
+	session_profile_options = facefusion.choices.session_profile_set.get(session_profile)
+	session_options = SessionOptions()
+	session_options.intra_op_num_threads = resolve_intra_op_thread_count(session_profile_options.get('intra_op_thread_count'), execution_thread_total)
+	session_options.inter_op_num_threads = session_profile_options.get('inter_op_thread_count')
+	session_options.execution_mode = resolve_execution_mode(session_profile_options.get('execution_mode'))
+	session_options.graph_optimization_level = resolve_graph_optimization_level(session_profile_options.get('graph_optimization'))
+	session_options.enable_cpu_mem_arena = session_profile_options.get('memory_arena')
+	session_options.enable_mem_pattern = session_profile_options.get('memory_arena')
+	return session_options
+
+
+def resolve_intra_op_thread_count(intra_op_thread_count : int, execution_thread_total : int) -> int:
+	if intra_op_thread_count == 0:
+		return max((os.cpu_count() or 1) // max(execution_thread_total, 1), 1)
+	return intra_op_thread_count
+
+
+def resolve_execution_mode(session_execution_mode : SessionExecutionMode) -> ExecutionMode:
+	if session_execution_mode == 'parallel':
+		return ExecutionMode.ORT_PARALLEL
+	return ExecutionMode.ORT_SEQUENTIAL
+
+
+def resolve_graph_optimization_level(session_graph_optimization : SessionGraphOptimization) -> GraphOptimizationLevel:
+	if session_graph_optimization == 'disabled':
+		return GraphOptimizationLevel.ORT_DISABLE_ALL
+	if session_graph_optimization == 'basic':
+		return GraphOptimizationLevel.ORT_ENABLE_BASIC
+	if session_graph_optimization == 'extended':
+		return GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+	return GraphOptimizationLevel.ORT_ENABLE_ALL
+
+
 def resolve_cudnn_conv_algo_search() -> str:
 	execution_devices = detect_static_execution_devices()
 	product_names = ('GeForce GTX 1630', 'GeForce GTX 1650', 'GeForce GTX 1660')
@@ -0,0 +1,89 @@
+from time import perf_counter
+from typing import List
+
+import facefusion.choices
+from facefusion.types import ExecutionTuner, ExecutionTunerPhase
+
+EXECUTION_TUNER_PHASES : List[ExecutionTunerPhase] = [ 'warmup', 'thread_up', 'thread_down', 'queue_up', 'queue_down', 'done' ]
+EXECUTION_TUNER_FRAME_LIMIT : int = 1024
+EXECUTION_TUNER_QUEUE_LIMIT : int = 64
+EXECUTION_TUNER_TOLERANCE : float = 0.05
+
+
+def create_execution_tuner(thread_count : int, queue_count : int, autotune : bool) -> ExecutionTuner:
+	return\
+	{
+		'phase': 'warmup' if autotune else 'done',
+		'thread_count': thread_count,
+		'queue_count': queue_count,
+		'best_thread_count': thread_count,
+		'best_queue_count': queue_count,
+		'best_fps': 0.0,
+		'frame_count': 0,
+		'frame_total': 0,
+		'window_time': perf_counter()
+	}
+
+
+def update_execution_tuner(execution_tuner : ExecutionTuner, frame_count : int) -> bool:
+	if execution_tuner.get('phase') == 'done':
+		return False
+
+	execution_tuner['frame_count'] += frame_count
+
+	if execution_tuner.get('frame_count') >= calc_window_size(execution_tuner):
+		window_duration = max(perf_counter() - execution_tuner.get('window_time'), 1e-6)
+		window_fps = execution_tuner.get('frame_count') / window_duration
+		execution_tuner['frame_total'] += execution_tuner.get('frame_count')
+		execution_tuner['frame_count'] = 0
+		tune_execution(execution_tuner, window_fps)
+		execution_tuner['window_time'] = perf_counter()
+		return True
+	return False
+
+
+def calc_window_size(execution_tuner : ExecutionTuner) -> int:
+	return max(execution_tuner.get('thread_count') * execution_tuner.get('queue_count') * 4, 64)
+
+
+def tune_execution(execution_tuner : ExecutionTuner, window_fps : float) -> None:
+	if execution_tuner.get('phase') == 'warmup':
+		execution_tuner['phase'] = 'thread_up'
+		return
+
+	if window_fps > execution_tuner.get('best_fps') * (1 + EXECUTION_TUNER_TOLERANCE):
+		execution_tuner['best_thread_count'] = execution_tuner.get('thread_count')
+		execution_tuner['best_queue_count'] = execution_tuner.get('queue_count')
+		execution_tuner['best_fps'] = window_fps
+	else:
+		advance_execution_tuner(execution_tuner)
+
+	while execution_tuner.get('phase') != 'done' and not step_execution_tuner(execution_tuner):
+		advance_execution_tuner(execution_tuner)
+
+	if execution_tuner.get('frame_total') >= EXECUTION_TUNER_FRAME_LIMIT:
+		execution_tuner['phase'] = 'done'
+		execution_tuner['thread_count'] = execution_tuner.get('best_thread_count')
+		execution_tuner['queue_count'] = execution_tuner.get('best_queue_count')
+
+
+def advance_execution_tuner(execution_tuner : ExecutionTuner) -> None:
+	phase_index = EXECUTION_TUNER_PHASES.index(execution_tuner.get('phase'))
+	execution_tuner['phase'] = EXECUTION_TUNER_PHASES[phase_index + 1]
+	execution_tuner['thread_count'] = execution_tuner.get('best_thread_count')
+	execution_tuner['queue_count'] = execution_tuner.get('best_queue_count')
+
+
+def step_execution_tuner(execution_tuner : ExecutionTuner) -> bool:
+	thread_count = execution_tuner.get('thread_count')
+	queue_count = execution_tuner.get('queue_count')
+
+	if execution_tuner.get('phase') == 'thread_up':
+		execution_tuner['thread_count'] = min(thread_count + 1, max(facefusion.choices.execution_thread_count_range))
+	if execution_tuner.get('phase') == 'thread_down':
+		execution_tuner['thread_count'] = max(thread_count - 1, 1)
+	if execution_tuner.get('phase') == 'queue_up':
+		execution_tuner['queue_count'] = min(queue_count * 2, EXECUTION_TUNER_QUEUE_LIMIT)
+	if execution_tuner.get('phase') == 'queue_down':
+		execution_tuner['queue_count'] = max(queue_count // 2, 1)
+	return execution_tuner.get('thread_count') != thread_count or execution_tuner.get('queue_count') != queue_count
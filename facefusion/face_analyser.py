@@ -1,19 +1,22 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import numpy
 
 from facefusion import state_manager
 from facefusion.common_helper import get_first
+from facefusion.face_cache import get_cached_faces, set_cached_faces
 from facefusion.face_classifier import classify_face
-from facefusion.face_detector import detect_faces, detect_rotated_faces
+from facefusion.face_detector import detect_faces_batch, detect_rotated_faces_batch
 from facefusion.face_helper import apply_nms, convert_to_face_landmark_5, estimate_face_angle, get_nms_threshold
 from facefusion.face_landmarker import detect_face_landmark, estimate_face_landmark_68_5
 from facefusion.face_recognizer import calc_embedding
 from facefusion.face_store import get_static_faces, set_static_faces
-from facefusion.types import BoundingBox, Face, FaceLandmark5, FaceLandmarkSet, FaceScoreSet, Score, VisionFrame
+from facefusion.face_tracker import has_face_track, is_track_frame, start_face_track, track_faces
+from facefusion.types import BoundingBoxes, Face, FaceLandmarkSet, FaceLandmarks5, FaceScoreSet, Scores, VisionFrame
+from facefusion.vision import read_static_image
 
 
-def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5]) -> List[Face]:
+def create_faces(vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_scores : Scores, face_landmarks_5 : FaceLandmarks5) -> List[Face]:
 	faces = []
 	nms_threshold = get_nms_threshold(state_manager.get_item('face_detector_model'), state_manager.get_item('face_detector_angles'))
 	keep_indices = apply_nms(bounding_boxes, face_scores, state_manager.get_item('face_detector_score'), nms_threshold)
@@ -93,32 +96,94 @@ def get_average_face(faces : List[Face]) -> Optional[Face]:
 	return None
 
 
-def get_many_faces(vision_frames : List[VisionFrame]) -> List[Face]:
+def detect_angled_faces(vision_frames : List[VisionFrame]) -> List[Tuple[BoundingBoxes, Scores, FaceLandmarks5]]:
+	all_bounding_boxes : List[List[BoundingBoxes]] = [ [] for _ in vision_frames ]
+	all_face_scores : List[List[Scores]] = [ [] for _ in vision_frames ]
+	all_face_landmarks_5 : List[List[FaceLandmarks5]] = [ [] for _ in vision_frames ]
+
+	for face_detector_angle in state_manager.get_item('face_detector_angles'):
+		if face_detector_angle == 0:
+			detect_results = detect_faces_batch(vision_frames)
+		else:
+			detect_results = detect_rotated_faces_batch(vision_frames, face_detector_angle)
+
+		for index, (bounding_boxes, face_scores, face_landmarks_5) in enumerate(detect_results):
+			all_bounding_boxes[index].append(bounding_boxes)
+			all_face_scores[index].append(face_scores)
+			all_face_landmarks_5[index].append(face_landmarks_5)
+
+	return [ (numpy.concatenate(bounding_boxes), numpy.concatenate(face_scores), numpy.concatenate(face_landmarks_5)) for bounding_boxes, face_scores, face_landmarks_5 in zip(all_bounding_boxes, all_face_scores, all_face_landmarks_5) ]
+
+
+def get_many_faces(vision_frames : List[VisionFrame], frame_numbers : Optional[List[Optional[int]]] = None) -> List[Face]:
 	many_faces : List[Face] = []
 
-	for vision_frame in vision_frames:
+	for faces in get_many_frame_faces(vision_frames, frame_numbers):
+		many_faces.extend(faces)
+	return many_faces
+
+
+def get_many_frame_faces(vision_frames : List[VisionFrame], frame_numbers : Optional[List[Optional[int]]] = None) -> List[List[Face]]:
+	many_frame_faces : List[Optional[List[Face]]] = []
+	detect_indices = []
+	frame_numbers = frame_numbers or [ None ] * len(vision_frames)
+
+	for index, (vision_frame, frame_number) in enumerate(zip(vision_frames, frame_numbers)):
+		faces = []
+
 		if numpy.any(vision_frame):
-			static_faces = get_static_faces(vision_frame)
-			if static_faces:
-				many_faces.extend(static_faces)
-			else:
-				all_bounding_boxes = []
-				all_face_scores = []
-				all_face_landmarks_5 = []
-
-				for face_detector_angle in state_manager.get_item('face_detector_angles'):
-					if face_detector_angle == 0:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_faces(vision_frame)
-					else:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces(vision_frame, face_detector_angle)
-					all_bounding_boxes.extend(bounding_boxes)
-					all_face_scores.extend(face_scores)
-					all_face_landmarks_5.extend(face_landmarks_5)
-
-				if all_bounding_boxes and all_face_scores and all_face_landmarks_5 and state_manager.get_item('face_detector_score') > 0:
-					faces = create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5)
-
-					if faces:
-						many_faces.extend(faces)
-						set_static_faces(vision_frame, faces)
+			faces = get_static_faces(vision_frame, frame_number)
+
+			if faces is None and not can_track_faces(frame_numbers, many_frame_faces, index):
+				detect_indices.append(index)
+		many_frame_faces.append(faces)
+
+	detect_results = dict(zip(detect_indices, detect_angled_faces([ vision_frames[index] for index in detect_indices ]))) if detect_indices else {}
+
+	for index, (vision_frame, frame_number) in enumerate(zip(vision_frames, frame_numbers)):
+		if many_frame_faces[index] is None:
+			faces = None
+
+			if index not in detect_results:
+				faces = track_faces(frame_number, vision_frame)
+			if faces is None:
+				faces = create_detected_faces(vision_frame, detect_results.get(index) or get_first(detect_angled_faces([ vision_frame ])))
+
+				if frame_number is not None:
+					start_face_track(frame_number, vision_frame, faces)
+			set_static_faces(vision_frame, faces, frame_number)
+			many_frame_faces[index] = faces
+	return [ faces or [] for faces in many_frame_faces ]
+
+
+def can_track_faces(frame_numbers : List[Optional[int]], many_frame_faces : List[Optional[List[Face]]], index : int) -> bool:
+	frame_number = frame_numbers[index]
+
+	if frame_number is not None and is_track_frame(frame_number):
+		if has_face_track(frame_number - 1):
+			return True
+		return index > 0 and frame_numbers[index - 1] == frame_number - 1 and many_frame_faces[index - 1] is None
+	return False
+
+
+def create_detected_faces(vision_frame : VisionFrame, detect_result : Tuple[BoundingBoxes, Scores, FaceLandmarks5]) -> List[Face]:
+	bounding_boxes, face_scores, face_landmarks_5 = detect_result
+
+	if face_scores.size and state_manager.get_item('face_detector_score') > 0:
+		return create_faces(vision_frame, bounding_boxes, face_scores, face_landmarks_5)
+	return []
+
+
+def get_many_image_faces(image_paths : List[str]) -> List[Face]:
+	many_faces : List[Face] = []
+	image_faces_set = { image_path: get_cached_faces(image_path) for image_path in image_paths }
+	detect_image_paths = [ image_path for image_path, image_faces in image_faces_set.items() if image_faces is None ]
+	detect_vision_frames = [ read_static_image(image_path) for image_path in detect_image_paths ]
+
+	for image_path, image_faces in zip(detect_image_paths, get_many_frame_faces(detect_vision_frames)):
+		image_faces_set[image_path] = image_faces
+		set_cached_faces(image_path, image_faces)
+
+	for image_path in image_paths:
+		many_faces.extend(image_faces_set.get(image_path))
 	return many_faces
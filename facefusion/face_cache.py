@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy
+
+from facefusion import state_manager
+from facefusion.filesystem import create_directory, is_file, remove_file
+from facefusion.types import Face, FaceLandmarkSet, FaceScoreSet, FaceSet
+
+FACE_CACHE_VERSION = '1'
+FACE_CACHE_SET : FaceSet = {}
+
+
+def get_cached_faces(image_path : str) -> Optional[List[Face]]:
+	face_cache_key = create_face_cache_key(image_path)
+
+	if face_cache_key:
+		if face_cache_key not in FACE_CACHE_SET:
+			faces = read_face_cache(resolve_face_cache_path(face_cache_key))
+
+			if faces is not None:
+				FACE_CACHE_SET[face_cache_key] = faces
+		return FACE_CACHE_SET.get(face_cache_key)
+	return None
+
+
+def set_cached_faces(image_path : str, faces : List[Face]) -> bool:
+	face_cache_key = create_face_cache_key(image_path)
+
+	if face_cache_key:
+		FACE_CACHE_SET[face_cache_key] = faces
+		return write_face_cache(resolve_face_cache_path(face_cache_key), faces)
+	return False
+
+
+def clear_cached_faces() -> None:
+	FACE_CACHE_SET.clear()
+
+
+def create_face_cache_key(image_path : str) -> Optional[str]:
+	if state_manager.get_item('cache_path') and is_file(image_path):
+		file_digest = create_static_file_digest(image_path, os.path.getsize(image_path), os.path.getmtime(image_path))
+		face_analyser_options =\
+		[
+			FACE_CACHE_VERSION,
+			state_manager.get_item('face_detector_model'),
+			state_manager.get_item('face_detector_size'),
+			state_manager.get_item('face_detector_angles'),
+			state_manager.get_item('face_detector_score'),
+			state_manager.get_item('face_landmarker_model'),
+			state_manager.get_item('face_landmarker_score')
+		]
+		return hashlib.sha256((file_digest + str(face_analyser_options)).encode()).hexdigest()
+	return None
+
+
+@lru_cache(maxsize = None)
+def create_static_file_digest(file_path : str, file_size : int, file_modified_time : float) -> str:
+	with open(file_path, 'rb') as file:
+		return hashlib.sha256(file.read()).hexdigest()
+
+
+def resolve_face_cache_path(face_cache_key : str) -> str:
+	return os.path.join(state_manager.get_item('cache_path'), 'faces', face_cache_key[:2], face_cache_key + '.npz')
+
+
+def read_face_cache(face_cache_path : str) -> Optional[List[Face]]:
+	faces = []
+
+	if is_file(face_cache_path):
+		try:
+			with numpy.load(face_cache_path, allow_pickle = False) as face_cache:
+				for index in range(face_cache['face_total']):
+					face_score_set : FaceScoreSet =\
+					{
+						'detector': float(face_cache['detector_scores'][index]),
+						'landmarker': float(face_cache['landmarker_scores'][index])
+					}
+					face_landmark_set : FaceLandmarkSet =\
+					{
+						'5': face_cache['face_landmarks_5'][index],
+						'5/68': face_cache['face_landmarks_5_68'][index],
+						'68': face_cache['face_landmarks_68'][index],
+						'68/5': face_cache['face_landmarks_68_5'][index]
+					}
+					faces.append(Face(
+						bounding_box = face_cache['bounding_boxes'][index],
+						score_set = face_score_set,
+						landmark_set = face_landmark_set,
+						angle = int(face_cache['angles'][index]),
+						embedding = face_cache['embeddings'][index],
+						normed_embedding = face_cache['normed_embeddings'][index],
+						gender = str(face_cache['genders'][index]),
+						age = range(*face_cache['ages'][index]),
+						race = str(face_cache['races'][index])
+					))
+			return faces
+		except (OSError, KeyError, ValueError):
+			remove_file(face_cache_path)
+	return None
+
+
+def write_face_cache(face_cache_path : str, faces : List[Face]) -> bool:
+	face_cache_temp_path = face_cache_path + '.' + str(os.getpid()) + '.' + str(threading.get_ident())
+	face_cache : Dict[str, Any] =\
+	{
+		'face_total': numpy.array(len(faces))
+	}
+
+	if faces:
+		face_cache.update(
+		{
+			'bounding_boxes': numpy.stack([ face.bounding_box for face in faces ]),
+			'detector_scores': numpy.array([ face.score_set.get('detector') for face in faces ]),
+			'landmarker_scores': numpy.array([ face.score_set.get('landmarker') for face in faces ]),
+			'face_landmarks_5': numpy.stack([ face.landmark_set.get('5') for face in faces ]),
+			'face_landmarks_5_68': numpy.stack([ face.landmark_set.get('5/68') for face in faces ]),
+			'face_landmarks_68': numpy.stack([ face.landmark_set.get('68') for face in faces ]),
+			'face_landmarks_68_5': numpy.stack([ face.landmark_set.get('68/5') for face in faces ]),
+			'angles': numpy.array([ face.angle for face in faces ]),
+			'embeddings': numpy.stack([ face.embedding for face in faces ]),
+			'normed_embeddings': numpy.stack([ face.normed_embedding for face in faces ]),
+			'genders': numpy.array([ face.gender for face in faces ]),
+			'ages': numpy.array([ (face.age.start, face.age.stop) for face in faces ]),
+			'races': numpy.array([ face.race for face in faces ])
+		})
+
+	if create_directory(os.path.dirname(face_cache_path)):
+		try:
+			with open(face_cache_temp_path, 'wb') as face_cache_file:
+				numpy.savez(face_cache_file, **face_cache)
+			os.replace(face_cache_temp_path, face_cache_path)
+			return True
+		except OSError:
+			remove_file(face_cache_temp_path)
+	return False
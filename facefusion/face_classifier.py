@@ -1,12 +1,14 @@
 from functools import lru_cache
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import numpy
+from onnxruntime import InferenceSession
 
 from facefusion import inference_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.face_helper import warp_face_by_face_landmark_5
 from facefusion.filesystem import resolve_relative_path
+from facefusion.metrics import measure
 from facefusion.thread_helper import conditional_thread_semaphore
 from facefusion.types import Age, DownloadScope, FaceLandmark5, Gender, InferencePool, ModelOptions, ModelSet, Race, VisionFrame
 
@@ -48,6 +50,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ 'fairface' ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ 'fairface' ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -82,8 +91,9 @@ def classify_face(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandmar
 	return gender, age, race
 
 
+@measure
 def forward(crop_vision_frame : VisionFrame) -> Tuple[List[int], List[int], List[int]]:
-	face_classifier = get_inference_pool().get('face_classifier')
+	face_classifier = get_inference_session('face_classifier')
 
 	with conditional_thread_semaphore():
 		race_id, gender_id, age_id = face_classifier.run(None,
@@ -1,15 +1,18 @@
 from functools import lru_cache
-from typing import List, Sequence, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 from facefusion import inference_manager, state_manager
+from facefusion.common_helper import get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
-from facefusion.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_box, transform_bounding_box, transform_points
+from facefusion.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_boxes, transform_bounding_boxes, transform_points
 from facefusion.filesystem import resolve_relative_path
+from facefusion.metrics import measure
 from facefusion.thread_helper import thread_semaphore
-from facefusion.types import Angle, BoundingBox, Detection, DownloadScope, DownloadSet, FaceLandmark5, InferencePool, ModelSet, Score, VisionFrame
+from facefusion.types import Angle, BoundingBoxes, Detection, DownloadScope, DownloadSet, FaceLandmarks5, InferencePool, ModelSet, Scores, VisionFrame
 from facefusion.vision import restrict_frame, unpack_resolution
 
 
@@ -84,6 +87,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('face_detector_model') ]
+	_, model_source_set = collect_model_downloads()
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('face_detector_model') ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -108,216 +118,208 @@ def pre_check() -> bool:
 	return conditional_download_hashes(model_hash_set) and conditional_download_sources(model_source_set)
 
 
-def detect_faces(vision_frame : VisionFrame) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	all_bounding_boxes : List[BoundingBox] = []
-	all_face_scores : List[Score] = []
-	all_face_landmarks_5 : List[FaceLandmark5] = []
+def detect_faces(vision_frame : VisionFrame) -> Tuple[BoundingBoxes, Scores, FaceLandmarks5]:
+	return get_first(detect_faces_batch([ vision_frame ]))
+
+
+def detect_faces_batch(vision_frames : List[VisionFrame]) -> List[Tuple[BoundingBoxes, Scores, FaceLandmarks5]]:
+	all_bounding_boxes : List[List[BoundingBoxes]] = [ [ numpy.empty((0, 4)) ] for _ in vision_frames ]
+	all_face_scores : List[List[Scores]] = [ [ numpy.empty(0) ] for _ in vision_frames ]
+	all_face_landmarks_5 : List[List[FaceLandmarks5]] = [ [ numpy.empty((0, 5, 2)) ] for _ in vision_frames ]
+	detect_results = []
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'retinaface' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_retinaface(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		detect_results.extend(detect_with_retinaface(vision_frames, state_manager.get_item('face_detector_size')))
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'scrfd' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_scrfd(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		detect_results.extend(detect_with_scrfd(vision_frames, state_manager.get_item('face_detector_size')))
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'yolo_face' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_yolo_face(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		detect_results.extend(detect_with_yolo_face(vision_frames, state_manager.get_item('face_detector_size')))
 
-	all_bounding_boxes = [ normalize_bounding_box(all_bounding_box) for all_bounding_box in all_bounding_boxes ]
-	return all_bounding_boxes, all_face_scores, all_face_landmarks_5
+	for index, (bounding_boxes, face_scores, face_landmarks_5) in enumerate(detect_results):
+		all_bounding_boxes[index % len(vision_frames)].append(bounding_boxes)
+		all_face_scores[index % len(vision_frames)].append(face_scores)
+		all_face_landmarks_5[index % len(vision_frames)].append(face_landmarks_5)
 
+	return [ (normalize_bounding_boxes(numpy.concatenate(bounding_boxes)), numpy.concatenate(face_scores), numpy.concatenate(face_landmarks_5)) for bounding_boxes, face_scores, face_landmarks_5 in zip(all_bounding_boxes, all_face_scores, all_face_landmarks_5) ]
 
-def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
-	rotated_vision_frame = cv2.warpAffine(vision_frame, rotated_matrix, rotated_size)
-	rotated_inverse_matrix = cv2.invertAffineTransform(rotated_matrix)
-	bounding_boxes, face_scores, face_landmarks_5 = detect_faces(rotated_vision_frame)
-	bounding_boxes = [ transform_bounding_box(bounding_box, rotated_inverse_matrix) for bounding_box in bounding_boxes ]
-	face_landmarks_5 = [ transform_points(face_landmark_5, rotated_inverse_matrix) for face_landmark_5 in face_landmarks_5 ]
-	return bounding_boxes, face_scores, face_landmarks_5
 
+def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> Tuple[BoundingBoxes, Scores, FaceLandmarks5]:
+	return get_first(detect_rotated_faces_batch([ vision_frame ], angle))
 
-def detect_with_retinaface(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
-	feature_strides = [ 8, 16, 32 ]
-	feature_map_channel = 3
-	anchor_total = 2
-	face_detector_score = state_manager.get_item('face_detector_score')
-	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = restrict_frame(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detect_vision_frame = normalize_detect_frame(detect_vision_frame, [ -1, 1 ])
-	detection = forward_with_retinaface(detect_vision_frame)
 
-	for index, feature_stride in enumerate(feature_strides):
-		keep_indices = numpy.where(detection[index] >= face_detector_score)[0]
+def detect_rotated_faces_batch(vision_frames : List[VisionFrame], angle : Angle) -> List[Tuple[BoundingBoxes, Scores, FaceLandmarks5]]:
+	rotated_vision_frames = []
+	rotated_inverse_matrices = []
+	detect_results = []
+
+	for vision_frame in vision_frames:
+		rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
+		rotated_vision_frames.append(cv2.warpAffine(vision_frame, rotated_matrix, rotated_size))
+		rotated_inverse_matrices.append(cv2.invertAffineTransform(rotated_matrix))
+
+	for (bounding_boxes, face_scores, face_landmarks_5), rotated_inverse_matrix in zip(detect_faces_batch(rotated_vision_frames), rotated_inverse_matrices):
+		if face_scores.size:
+			bounding_boxes = transform_bounding_boxes(bounding_boxes, rotated_inverse_matrix)
+			face_landmarks_5 = transform_points(face_landmarks_5, rotated_inverse_matrix).reshape(-1, 5, 2)
+		detect_results.append((bounding_boxes, face_scores, face_landmarks_5))
+
+	return detect_results
 
-		if numpy.any(keep_indices):
-			stride_height = face_detector_height // feature_stride
-			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_boxes_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmarks_5_raw = detection[index + feature_map_channel * 2] * feature_stride
 
-			for bounding_box_raw in distance_to_bounding_box(anchors, bounding_boxes_raw)[keep_indices]:
-				bounding_boxes.append(numpy.array(
-				[
-					bounding_box_raw[0] * ratio_width,
-					bounding_box_raw[1] * ratio_height,
-					bounding_box_raw[2] * ratio_width,
-					bounding_box_raw[3] * ratio_height
-				]))
+def detect_with_retinaface(vision_frames : List[VisionFrame], face_detector_size : str) -> List[Tuple[BoundingBoxes, Scores, FaceLandmarks5]]:
+	temp_vision_frames = restrict_detect_frames(vision_frames, face_detector_size)
+	detect_vision_frames = prepare_detect_frames(temp_vision_frames, face_detector_size)
+	detect_vision_frames = normalize_detect_frame(detect_vision_frames, [ -1, 1 ])
+	detections = forward_with_retinaface(detect_vision_frames)
+	detect_results = []
 
-			for face_score_raw in detection[index][keep_indices]:
-				face_scores.append(face_score_raw[0])
+	for vision_frame, temp_vision_frame, detection in zip(vision_frames, temp_vision_frames, detections):
+		ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
+		ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
+		detect_results.append(decode_anchor_detection(detection, face_detector_size, ratio_width, ratio_height))
 
-			for face_landmark_raw_5 in distance_to_face_landmark_5(anchors, face_landmarks_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_raw_5 * [ ratio_width, ratio_height ])
+	return detect_results
 
-	return bounding_boxes, face_scores, face_landmarks_5
 
+def detect_with_scrfd(vision_frames : List[VisionFrame], face_detector_size : str) -> List[Tuple[BoundingBoxes, Scores, FaceLandmarks5]]:
+	temp_vision_frames = restrict_detect_frames(vision_frames, face_detector_size)
+	detect_vision_frames = prepare_detect_frames(temp_vision_frames, face_detector_size)
+	detect_vision_frames = normalize_detect_frame(detect_vision_frames, [ -1, 1 ])
+	detections = forward_with_scrfd(detect_vision_frames)
+	detect_results = []
 
-def detect_with_scrfd(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+	for vision_frame, temp_vision_frame, detection in zip(vision_frames, temp_vision_frames, detections):
+		ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
+		ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
+		detect_results.append(decode_anchor_detection(detection, face_detector_size, ratio_width, ratio_height))
+
+	return detect_results
+
+
+def detect_with_yolo_face(vision_frames : List[VisionFrame], face_detector_size : str) -> List[Tuple[BoundingBoxes, Scores, FaceLandmarks5]]:
+	temp_vision_frames = restrict_detect_frames(vision_frames, face_detector_size)
+	detect_vision_frames = prepare_detect_frames(temp_vision_frames, face_detector_size)
+	detect_vision_frames = normalize_detect_frame(detect_vision_frames, [ 0, 1 ])
+	detections = forward_with_yolo_face(detect_vision_frames)
+	detect_results = []
+
+	for vision_frame, temp_vision_frame, detection in zip(vision_frames, temp_vision_frames, detections):
+		ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
+		ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
+		detect_results.append(decode_yolo_face_detection(detection, ratio_width, ratio_height))
+
+	return detect_results
+
+
+def decode_anchor_detection(detection : Detection, face_detector_size : str, ratio_width : float, ratio_height : float) -> Tuple[BoundingBoxes, Scores, FaceLandmarks5]:
+	bounding_boxes = [ numpy.empty((0, 4)) ]
+	face_scores = [ numpy.empty(0) ]
+	face_landmarks_5 = [ numpy.empty((0, 5, 2)) ]
 	feature_strides = [ 8, 16, 32 ]
 	feature_map_channel = 3
 	anchor_total = 2
 	face_detector_score = state_manager.get_item('face_detector_score')
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = restrict_frame(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detect_vision_frame = normalize_detect_frame(detect_vision_frame, [ -1, 1 ])
-	detection = forward_with_scrfd(detect_vision_frame)
 
 	for index, feature_stride in enumerate(feature_strides):
-		keep_indices = numpy.where(detection[index] >= face_detector_score)[0]
+		keep_indices = numpy.where(detection[index][:, 0] >= face_detector_score)[0]
 
-		if numpy.any(keep_indices):
+		if keep_indices.size:
 			stride_height = face_detector_height // feature_stride
 			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_boxes_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmarks_5_raw = detection[index + feature_map_channel * 2] * feature_stride
-
-			for bounding_box_raw in distance_to_bounding_box(anchors, bounding_boxes_raw)[keep_indices]:
-				bounding_boxes.append(numpy.array(
-				[
-					bounding_box_raw[0] * ratio_width,
-					bounding_box_raw[1] * ratio_height,
-					bounding_box_raw[2] * ratio_width,
-					bounding_box_raw[3] * ratio_height
-				]))
-
-			for face_score_raw in detection[index][keep_indices]:
-				face_scores.append(face_score_raw[0])
+			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)[keep_indices]
+			bounding_boxes_raw = detection[index + feature_map_channel][keep_indices] * feature_stride
+			face_landmarks_5_raw = detection[index + feature_map_channel * 2][keep_indices] * feature_stride
+			bounding_boxes.append(distance_to_bounding_box(anchors, bounding_boxes_raw) * [ ratio_width, ratio_height, ratio_width, ratio_height ])
+			face_scores.append(detection[index][keep_indices, 0])
+			face_landmarks_5.append(distance_to_face_landmark_5(anchors, face_landmarks_5_raw) * [ ratio_width, ratio_height ])
 
-			for face_landmark_raw_5 in distance_to_face_landmark_5(anchors, face_landmarks_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_raw_5 * [ ratio_width, ratio_height ])
+	return numpy.concatenate(bounding_boxes), numpy.concatenate(face_scores), numpy.concatenate(face_landmarks_5)
 
-	return bounding_boxes, face_scores, face_landmarks_5
 
-
-def detect_with_yolo_face(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+def decode_yolo_face_detection(detection : Detection, ratio_width : float, ratio_height : float) -> Tuple[BoundingBoxes, Scores, FaceLandmarks5]:
 	face_detector_score = state_manager.get_item('face_detector_score')
-	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = restrict_frame(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detect_vision_frame = normalize_detect_frame(detect_vision_frame, [ 0, 1 ])
-	detection = forward_with_yolo_face(detect_vision_frame)
 	detection = numpy.squeeze(detection).T
 	bounding_boxes_raw, face_scores_raw, face_landmarks_5_raw = numpy.split(detection, [ 4, 5 ], axis = 1)
-	keep_indices = numpy.where(face_scores_raw > face_detector_score)[0]
+	keep_indices = numpy.where(face_scores_raw[:, 0] > face_detector_score)[0]
+	bounding_boxes_raw, face_scores_raw, face_landmarks_5_raw = bounding_boxes_raw[keep_indices], face_scores_raw[keep_indices, 0], face_landmarks_5_raw[keep_indices]
+	bounding_boxes = numpy.column_stack(
+	[
+		bounding_boxes_raw[:, 0] - bounding_boxes_raw[:, 2] / 2,
+		bounding_boxes_raw[:, 1] - bounding_boxes_raw[:, 3] / 2,
+		bounding_boxes_raw[:, 0] + bounding_boxes_raw[:, 2] / 2,
+		bounding_boxes_raw[:, 1] + bounding_boxes_raw[:, 3] / 2
+	]) * [ ratio_width, ratio_height, ratio_width, ratio_height ]
+	face_landmarks_5 = face_landmarks_5_raw.reshape(-1, 5, 3)[:, :, :2] * [ ratio_width, ratio_height ]
+	return bounding_boxes, face_scores_raw, face_landmarks_5
 
-	if numpy.any(keep_indices):
-		bounding_boxes_raw, face_scores_raw, face_landmarks_5_raw = bounding_boxes_raw[keep_indices], face_scores_raw[keep_indices], face_landmarks_5_raw[keep_indices]
 
-		for bounding_box_raw in bounding_boxes_raw:
-			bounding_boxes.append(numpy.array(
-			[
-				(bounding_box_raw[0] - bounding_box_raw[2] / 2) * ratio_width,
-				(bounding_box_raw[1] - bounding_box_raw[3] / 2) * ratio_height,
-				(bounding_box_raw[0] + bounding_box_raw[2] / 2) * ratio_width,
-				(bounding_box_raw[1] + bounding_box_raw[3] / 2) * ratio_height
-			]))
+@measure
+def forward_with_retinaface(detect_vision_frames : VisionFrame) -> List[Detection]:
+	face_detector = get_inference_session('retinaface')
+	return forward_detect_frames(face_detector, detect_vision_frames)
 
-		face_scores = face_scores_raw.ravel().tolist()
-		face_landmarks_5_raw[:, 0::3] = (face_landmarks_5_raw[:, 0::3]) * ratio_width
-		face_landmarks_5_raw[:, 1::3] = (face_landmarks_5_raw[:, 1::3]) * ratio_height
 
-		for face_landmark_raw_5 in face_landmarks_5_raw:
-			face_landmarks_5.append(numpy.array(face_landmark_raw_5.reshape(-1, 3)[:, :2]))
+@measure
+def forward_with_scrfd(detect_vision_frames : VisionFrame) -> List[Detection]:
+	face_detector = get_inference_session('scrfd')
+	return forward_detect_frames(face_detector, detect_vision_frames)
 
-	return bounding_boxes, face_scores, face_landmarks_5
 
+@measure
+def forward_with_yolo_face(detect_vision_frames : VisionFrame) -> List[Detection]:
+	face_detector = get_inference_session('yolo_face')
+	return forward_detect_frames(face_detector, detect_vision_frames)
 
-def forward_with_retinaface(detect_vision_frame : VisionFrame) -> Detection:
-	face_detector = get_inference_pool().get('retinaface')
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
+@measure
+def forward_detect_frames(face_detector : InferenceSession, detect_vision_frames : VisionFrame) -> List[Detection]:
+	detections : List[Detection] = []
+	batch_size = resolve_batch_size(face_detector, len(detect_vision_frames))
 
-	return detection
+	for index in range(0, len(detect_vision_frames), batch_size):
+		batch_vision_frames = detect_vision_frames[index:index + batch_size]
 
+		with thread_semaphore():
+			detection = face_detector.run(None,
+			{
+				'input': batch_vision_frames
+			})
 
-def forward_with_scrfd(detect_vision_frame : VisionFrame) -> Detection:
-	face_detector = get_inference_pool().get('scrfd')
+		for batch_index in range(len(batch_vision_frames)):
+			detections.append([ output.reshape(len(batch_vision_frames), -1, output.shape[-1])[batch_index] for output in detection ]) #type:ignore[arg-type]
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
+	return detections
 
-	return detection
 
+def resolve_batch_size(face_detector : InferenceSession, frame_total : int) -> int:
+	batch_size = get_first(face_detector.get_inputs()[0].shape)
 
-def forward_with_yolo_face(detect_vision_frame : VisionFrame) -> Detection:
-	face_detector = get_inference_pool().get('yolo_face')
+	if isinstance(batch_size, int) and batch_size > 0:
+		return batch_size
+	return max(frame_total, 1)
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
-		{
-			'input': detect_vision_frame
-		})
 
-	return detection
+def restrict_detect_frames(vision_frames : List[VisionFrame], face_detector_size : str) -> List[VisionFrame]:
+	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
+	return [ restrict_frame(vision_frame, (face_detector_width, face_detector_height)) for vision_frame in vision_frames ]
 
 
-def prepare_detect_frame(temp_vision_frame : VisionFrame, face_detector_size : str) -> VisionFrame:
+def prepare_detect_frames(temp_vision_frames : List[VisionFrame], face_detector_size : str) -> VisionFrame:
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	detect_vision_frame = numpy.zeros((face_detector_height, face_detector_width, 3))
-	detect_vision_frame[:temp_vision_frame.shape[0], :temp_vision_frame.shape[1], :] = temp_vision_frame
-	detect_vision_frame = numpy.expand_dims(detect_vision_frame.transpose(2, 0, 1), axis = 0).astype(numpy.float32)
-	return detect_vision_frame
+	detect_vision_frames = numpy.zeros((len(temp_vision_frames), 3, face_detector_height, face_detector_width), dtype = numpy.float32)
+
+	for index, temp_vision_frame in enumerate(temp_vision_frames):
+		detect_vision_frames[index, :, :temp_vision_frame.shape[0], :temp_vision_frame.shape[1]] = temp_vision_frame.transpose(2, 0, 1)
+	return detect_vision_frames
 
 
 def normalize_detect_frame(detect_vision_frame : VisionFrame, normalize_range : Sequence[int]) -> VisionFrame:
 	if normalize_range == [ -1, 1 ]:
-		return (detect_vision_frame - 127.5) / 128.0
+		detect_vision_frame -= 127.5
+		detect_vision_frame /= 128.0
 	if normalize_range == [ 0, 1 ]:
-		return detect_vision_frame / 255.0
+		detect_vision_frame /= 255.0
 	return detect_vision_frame
@@ -5,7 +5,8 @@ import cv2
 import numpy
 from cv2.typing import Size
 
-from facefusion.types import Anchors, Angle, BoundingBox, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, Mask, Matrix, Points, Scale, Score, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
+from facefusion.metrics import measure
+from facefusion.types import Anchors, Angle, BoundingBox, BoundingBoxes, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, Mask, Matrix, PasteContext, Points, Scale, Scores, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
 
 WARP_TEMPLATE_SET : WarpTemplateSet =\
 {
@@ -98,21 +99,36 @@ def warp_face_by_translation(temp_vision_frame : VisionFrame, translation : Tran
 	return crop_vision_frame, affine_matrix
 
 
+@measure
 def paste_back(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
-	paste_bounding_box, paste_matrix = calc_paste_area(temp_vision_frame, crop_vision_frame, affine_matrix)
-	x_min, y_min, x_max, y_max = paste_bounding_box
-	paste_width = x_max - x_min
-	paste_height = y_max - y_min
-	inverse_mask = cv2.warpAffine(crop_mask, paste_matrix, (paste_width, paste_height)).clip(0, 1)
-	inverse_mask = numpy.expand_dims(inverse_mask, axis = -1)
-	inverse_vision_frame = cv2.warpAffine(crop_vision_frame, paste_matrix, (paste_width, paste_height), borderMode = cv2.BORDER_REPLICATE)
+	return paste_back_many(temp_vision_frame, [ (crop_vision_frame, crop_mask, affine_matrix) ])
+
+
+@measure
+def paste_back_many(temp_vision_frame : VisionFrame, paste_contexts : List[PasteContext]) -> VisionFrame:
 	temp_vision_frame = temp_vision_frame.copy()
-	paste_vision_frame = temp_vision_frame[y_min:y_max, x_min:x_max]
-	paste_vision_frame = paste_vision_frame * (1 - inverse_mask) + inverse_vision_frame * inverse_mask
-	temp_vision_frame[y_min:y_max, x_min:x_max] = paste_vision_frame.astype(temp_vision_frame.dtype)
+
+	for crop_vision_frame, crop_mask, affine_matrix in paste_contexts:
+		blend_paste_area(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
 	return temp_vision_frame
 
 
+def blend_paste_area(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> None:
+	paste_bounding_box, paste_matrix = calc_paste_area(temp_vision_frame, crop_vision_frame, affine_matrix)
+	x_min, y_min, x_max, y_max = paste_bounding_box
+	paste_size = (x_max - x_min, y_max - y_min)
+
+	if paste_size[0] > 0 and paste_size[1] > 0:
+		paste_mask = cv2.warpAffine(crop_mask.astype(numpy.float32, copy = False), paste_matrix, paste_size)
+		paste_vision_frame = cv2.warpAffine(crop_vision_frame, paste_matrix, paste_size, borderMode = cv2.BORDER_REPLICATE).astype(numpy.float32)
+		temp_paste_frame = temp_vision_frame[y_min:y_max, x_min:x_max]
+		numpy.clip(paste_mask, 0, 1, out = paste_mask)
+		paste_vision_frame -= temp_paste_frame
+		paste_vision_frame *= paste_mask[:, :, numpy.newaxis]
+		paste_vision_frame += temp_paste_frame
+		temp_paste_frame[:] = paste_vision_frame
+
+
 def calc_paste_area(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, affine_matrix : Matrix) -> Tuple[BoundingBox, Matrix]:
 	temp_height, temp_width = temp_vision_frame.shape[:2]
 	crop_height, crop_width = crop_vision_frame.shape[:2]
@@ -161,6 +177,14 @@ def normalize_bounding_box(bounding_box : BoundingBox) -> BoundingBox:
 	return numpy.array([ x1, y1, x2, y2 ])
 
 
+def normalize_bounding_boxes(bounding_boxes : BoundingBoxes) -> BoundingBoxes:
+	x1 = numpy.minimum(bounding_boxes[:, 0], bounding_boxes[:, 2])
+	y1 = numpy.minimum(bounding_boxes[:, 1], bounding_boxes[:, 3])
+	x2 = numpy.maximum(bounding_boxes[:, 0], bounding_boxes[:, 2])
+	y2 = numpy.maximum(bounding_boxes[:, 1], bounding_boxes[:, 3])
+	return numpy.column_stack([ x1, y1, x2, y2 ])
+
+
 def transform_points(points : Points, matrix : Matrix) -> Points:
 	points = points.reshape(-1, 1, 2)
 	points = cv2.transform(points, matrix) #type:ignore[assignment]
@@ -182,6 +206,14 @@ def transform_bounding_box(bounding_box : BoundingBox, matrix : Matrix) -> Bound
 	return normalize_bounding_box(numpy.array([ x1, y1, x2, y2 ]))
 
 
+def transform_bounding_boxes(bounding_boxes : BoundingBoxes, matrix : Matrix) -> BoundingBoxes:
+	points = bounding_boxes[:, [ 0, 1, 2, 1, 2, 3, 0, 3 ]]
+	points = transform_points(points, matrix).reshape(-1, 4, 2)
+	x1, y1 = numpy.min(points, axis = 1).T
+	x2, y2 = numpy.max(points, axis = 1).T
+	return numpy.column_stack([ x1, y1, x2, y2 ])
+
+
 def distance_to_bounding_box(points : Points, distance : Distance) -> BoundingBox:
 	x1 = points[:, 0] - distance[:, 0]
 	y1 = points[:, 1] - distance[:, 1]
@@ -228,9 +260,9 @@ def estimate_face_angle(face_landmark_68 : FaceLandmark68) -> Angle:
 	return face_angle
 
 
-def apply_nms(bounding_boxes : List[BoundingBox], scores : List[Score], score_threshold : float, nms_threshold : float) -> Sequence[int]:
-	normed_bounding_boxes = [ (x1, y1, x2 - x1, y2 - y1) for (x1, y1, x2, y2) in bounding_boxes ]
-	keep_indices = cv2.dnn.NMSBoxes(normed_bounding_boxes, scores, score_threshold = score_threshold, nms_threshold = nms_threshold)
+def apply_nms(bounding_boxes : BoundingBoxes, scores : Scores, score_threshold : float, nms_threshold : float) -> Sequence[int]:
+	normed_bounding_boxes = numpy.column_stack([ bounding_boxes[:, :2], bounding_boxes[:, 2:] - bounding_boxes[:, :2] ])
+	keep_indices = cv2.dnn.NMSBoxes(normed_bounding_boxes, scores, score_threshold = score_threshold, nms_threshold = nms_threshold) #type:ignore[arg-type]
 	return keep_indices
 
 
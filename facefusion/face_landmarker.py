@@ -1,13 +1,15 @@
 from functools import lru_cache
-from typing import Tuple
+from typing import Optional, Tuple
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 from facefusion import inference_manager, state_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.face_helper import create_rotated_matrix_and_size, estimate_matrix_by_face_landmark_5, transform_points, warp_face_by_translation
 from facefusion.filesystem import resolve_relative_path
+from facefusion.metrics import measure
 from facefusion.thread_helper import conditional_thread_semaphore
 from facefusion.types import Angle, BoundingBox, DownloadScope, DownloadSet, FaceLandmark5, FaceLandmark68, InferencePool, ModelSet, Prediction, Score, VisionFrame
 
@@ -85,6 +87,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('face_landmarker_model'), 'fan_68_5' ]
+	_, model_source_set = collect_model_downloads()
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('face_landmarker_model'), 'fan_68_5' ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -186,8 +195,9 @@ def estimate_face_landmark_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark
 	return face_landmark_68_5
 
 
+@measure
 def forward_with_2dfan4(crop_vision_frame : VisionFrame) -> Tuple[Prediction, Prediction]:
-	face_landmarker = get_inference_pool().get('2dfan4')
+	face_landmarker = get_inference_session('2dfan4')
 
 	with conditional_thread_semaphore():
 		prediction = face_landmarker.run(None,
@@ -198,8 +208,9 @@ def forward_with_2dfan4(crop_vision_frame : VisionFrame) -> Tuple[Prediction, Pr
 	return prediction
 
 
+@measure
 def forward_with_peppa_wutz(crop_vision_frame : VisionFrame) -> Prediction:
-	face_landmarker = get_inference_pool().get('peppa_wutz')
+	face_landmarker = get_inference_session('peppa_wutz')
 
 	with conditional_thread_semaphore():
 		prediction = face_landmarker.run(None,
@@ -210,8 +221,9 @@ def forward_with_peppa_wutz(crop_vision_frame : VisionFrame) -> Prediction:
 	return prediction
 
 
+@measure
 def forward_fan_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark68:
-	face_landmarker = get_inference_pool().get('fan_68_5')
+	face_landmarker = get_inference_session('fan_68_5')
 
 	with conditional_thread_semaphore():
 		face_landmark_68_5 = face_landmarker.run(None,
@@ -1,15 +1,21 @@
 from functools import lru_cache
-from typing import List, Tuple
+from typing import Any, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy
+from cv2.typing import Size
+from numpy.typing import NDArray
+from onnxruntime import InferenceSession
 
 import facefusion.choices
 from facefusion import inference_manager, state_manager
+from facefusion.common_helper import get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
+from facefusion.face_helper import warp_face_by_face_landmark_5
 from facefusion.filesystem import resolve_relative_path
+from facefusion.metrics import measure
 from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.types import DownloadScope, DownloadSet, FaceLandmark68, FaceMaskArea, FaceMaskRegion, InferencePool, Mask, ModelSet, Padding, VisionFrame
+from facefusion.types import DownloadScope, DownloadSet, Face, FaceLandmark68, FaceMaskArea, FaceMaskRegion, InferencePool, Mask, ModelSet, Padding, VisionFrame, WarpTemplate
 
 
 @lru_cache(maxsize = None)
@@ -94,7 +100,9 @@ def create_static_model_set(download_scope : DownloadScope) -> ModelSet:
 					'path': resolve_relative_path('../.assets/models/bisenet_resnet_18.onnx')
 				}
 			},
-			'size': (512, 512)
+			'size': (512, 512),
+			'mean': [ 0.485, 0.456, 0.406 ],
+			'standard_deviation': [ 0.229, 0.224, 0.225 ]
 		},
 		'bisenet_resnet_34':
 		{
@@ -114,7 +122,9 @@ def create_static_model_set(download_scope : DownloadScope) -> ModelSet:
 					'path': resolve_relative_path('../.assets/models/bisenet_resnet_34.onnx')
 				}
 			},
-			'size': (512, 512)
+			'size': (512, 512),
+			'mean': [ 0.485, 0.456, 0.406 ],
+			'standard_deviation': [ 0.229, 0.224, 0.225 ]
 		}
 	}
 
@@ -126,6 +136,21 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+@lru_cache(maxsize = None)
+def create_static_model_normalizer(model_name : str) -> Tuple[NDArray[Any], NDArray[Any]]:
+	model_options = create_static_model_set('full').get(model_name)
+	model_mean = numpy.array(model_options.get('mean')).astype(numpy.float32)
+	model_standard_deviation = numpy.array(model_options.get('standard_deviation')).astype(numpy.float32)
+	return model_mean, model_standard_deviation
+
+
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('face_occluder_model'), state_manager.get_item('face_parser_model') ]
+	_, model_source_set = collect_model_downloads()
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('face_occluder_model'), state_manager.get_item('face_parser_model') ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -155,8 +180,14 @@ def pre_check() -> bool:
 	return conditional_download_hashes(model_hash_set) and conditional_download_sources(model_source_set)
 
 
+@measure
 def create_box_mask(crop_vision_frame : VisionFrame, face_mask_blur : float, face_mask_padding : Padding) -> Mask:
 	crop_size = crop_vision_frame.shape[:2][::-1]
+	return create_static_box_mask(crop_size, face_mask_blur, tuple(face_mask_padding)) #type:ignore[arg-type]
+
+
+@lru_cache(maxsize = None)
+def create_static_box_mask(crop_size : Size, face_mask_blur : float, face_mask_padding : Padding) -> Mask:
 	blur_amount = int(crop_size[0] * 0.5 * face_mask_blur)
 	blur_area = max(blur_amount // 2, 1)
 	box_mask : Mask = numpy.ones(crop_size).astype(numpy.float32)
@@ -167,22 +198,38 @@ def create_box_mask(crop_vision_frame : VisionFrame, face_mask_blur : float, fac
 
 	if blur_amount > 0:
 		box_mask = cv2.GaussianBlur(box_mask, (0, 0), blur_amount * 0.25)
+	box_mask.setflags(write = False)
 	return box_mask
 
 
+@measure
 def create_occlusion_mask(crop_vision_frame : VisionFrame) -> Mask:
+	return get_first(create_occlusion_masks([ crop_vision_frame ]))
+
+
+@measure
+def create_occlusion_masks(crop_vision_frames : List[VisionFrame]) -> List[Mask]:
 	model_name = state_manager.get_item('face_occluder_model')
 	model_size = create_static_model_set('full').get(model_name).get('size')
-	prepare_vision_frame = cv2.resize(crop_vision_frame, model_size)
-	prepare_vision_frame = numpy.expand_dims(prepare_vision_frame, axis = 0).astype(numpy.float32) / 255.0
-	prepare_vision_frame = prepare_vision_frame.transpose(0, 1, 2, 3)
-	occlusion_mask = forward_occlude_face(prepare_vision_frame)
-	occlusion_mask = occlusion_mask.transpose(0, 1, 2).clip(0, 1).astype(numpy.float32)
-	occlusion_mask = cv2.resize(occlusion_mask, crop_vision_frame.shape[:2][::-1])
-	occlusion_mask = (cv2.GaussianBlur(occlusion_mask.clip(0, 1), (0, 0), 5).clip(0.5, 1) - 0.5) * 2
-	return occlusion_mask
+	prepare_vision_frames = numpy.stack([ cv2.resize(crop_vision_frame, model_size) for crop_vision_frame in crop_vision_frames ]).astype(numpy.float32) / 255.0
+	occlusion_masks = []
+
+	for crop_vision_frame, prepare_occlusion_mask in zip(crop_vision_frames, forward_occlude_faces(prepare_vision_frames)):
+		occlusion_mask : Mask = prepare_occlusion_mask.clip(0, 1).astype(numpy.float32)
+		occlusion_mask = cv2.resize(occlusion_mask, crop_vision_frame.shape[:2][::-1])
+		occlusion_mask = (cv2.GaussianBlur(occlusion_mask.clip(0, 1), (0, 0), 5).clip(0.5, 1) - 0.5) * 2
+		occlusion_masks.append(occlusion_mask)
 
+	return occlusion_masks
 
+
+def create_face_occlusion_masks(vision_frame : VisionFrame, faces : List[Face], warp_template : WarpTemplate, crop_size : Size) -> Sequence[Optional[Mask]]:
+	if 'occlusion' in state_manager.get_item('face_mask_types') and faces:
+		return create_occlusion_masks(warp_faces(vision_frame, faces, warp_template, crop_size))
+	return [ None ] * len(faces)
+
+
+@measure
 def create_area_mask(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLandmark68, face_mask_areas : List[FaceMaskArea]) -> Mask:
 	crop_size = crop_vision_frame.shape[:2][::-1]
 	landmark_points = []
@@ -198,43 +245,84 @@ def create_area_mask(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLan
 	return area_mask
 
 
+@measure
 def create_region_mask(crop_vision_frame : VisionFrame, face_mask_regions : List[FaceMaskRegion]) -> Mask:
+	return get_first(create_region_masks([ crop_vision_frame ], face_mask_regions))
+
+
+@measure
+def create_region_masks(crop_vision_frames : List[VisionFrame], face_mask_regions : List[FaceMaskRegion]) -> List[Mask]:
 	model_name = state_manager.get_item('face_parser_model')
 	model_size = create_static_model_set('full').get(model_name).get('size')
-	prepare_vision_frame = cv2.resize(crop_vision_frame, model_size)
-	prepare_vision_frame = prepare_vision_frame[:, :, ::-1].astype(numpy.float32) / 255.0
-	prepare_vision_frame = numpy.subtract(prepare_vision_frame, numpy.array([ 0.485, 0.456, 0.406 ]).astype(numpy.float32))
-	prepare_vision_frame = numpy.divide(prepare_vision_frame, numpy.array([ 0.229, 0.224, 0.225 ]).astype(numpy.float32))
-	prepare_vision_frame = numpy.expand_dims(prepare_vision_frame, axis = 0)
-	prepare_vision_frame = prepare_vision_frame.transpose(0, 3, 1, 2)
-	region_mask = forward_parse_face(prepare_vision_frame)
-	region_mask = numpy.isin(region_mask.argmax(0), [ facefusion.choices.face_mask_region_set.get(face_mask_region) for face_mask_region in face_mask_regions ])
-	region_mask = cv2.resize(region_mask.astype(numpy.float32), crop_vision_frame.shape[:2][::-1])
-	region_mask = (cv2.GaussianBlur(region_mask.clip(0, 1), (0, 0), 5).clip(0.5, 1) - 0.5) * 2
-	return region_mask
-
-
-def forward_occlude_face(prepare_vision_frame : VisionFrame) -> Mask:
+	model_mean, model_standard_deviation = create_static_model_normalizer(model_name)
+	prepare_vision_frames = numpy.stack([ cv2.resize(crop_vision_frame, model_size) for crop_vision_frame in crop_vision_frames ])
+	prepare_vision_frames = prepare_vision_frames[:, :, :, ::-1].astype(numpy.float32) / 255.0
+	prepare_vision_frames = numpy.subtract(prepare_vision_frames, model_mean)
+	prepare_vision_frames = numpy.divide(prepare_vision_frames, model_standard_deviation)
+	prepare_vision_frames = prepare_vision_frames.transpose(0, 3, 1, 2)
+	face_mask_region_indices = [ facefusion.choices.face_mask_region_set.get(face_mask_region) for face_mask_region in face_mask_regions ]
+	region_masks = []
+
+	for crop_vision_frame, prepare_region_mask in zip(crop_vision_frames, forward_parse_faces(prepare_vision_frames)):
+		region_mask : Mask = numpy.isin(prepare_region_mask.argmax(0), face_mask_region_indices)
+		region_mask = cv2.resize(region_mask.astype(numpy.float32), crop_vision_frame.shape[:2][::-1])
+		region_mask = (cv2.GaussianBlur(region_mask.clip(0, 1), (0, 0), 5).clip(0.5, 1) - 0.5) * 2
+		region_masks.append(region_mask)
+
+	return region_masks
+
+
+def create_face_region_masks(vision_frame : VisionFrame, faces : List[Face], warp_template : WarpTemplate, crop_size : Size, face_mask_regions : List[FaceMaskRegion]) -> Sequence[Optional[Mask]]:
+	if 'region' in state_manager.get_item('face_mask_types') and faces:
+		return create_region_masks(warp_faces(vision_frame, faces, warp_template, crop_size), face_mask_regions)
+	return [ None ] * len(faces)
+
+
+def warp_faces(vision_frame : VisionFrame, faces : List[Face], warp_template : WarpTemplate, crop_size : Size) -> List[VisionFrame]:
+	return [ warp_face_by_face_landmark_5(vision_frame, face.landmark_set.get('5/68'), warp_template, crop_size)[0] for face in faces ]
+
+
+@measure
+def forward_occlude_faces(prepare_vision_frames : VisionFrame) -> List[Mask]:
 	model_name = state_manager.get_item('face_occluder_model')
-	face_occluder = get_inference_pool().get(model_name)
+	face_occluder = get_inference_session(model_name)
+	batch_size = resolve_batch_size(face_occluder, len(prepare_vision_frames))
+	occlusion_masks : List[Mask] = []
 
-	with conditional_thread_semaphore():
-		occlusion_mask : Mask = face_occluder.run(None,
-		{
-			'input': prepare_vision_frame
-		})[0][0]
+	for index in range(0, len(prepare_vision_frames), batch_size):
+		with conditional_thread_semaphore():
+			occlusion_mask = face_occluder.run(None,
+			{
+				'input': prepare_vision_frames[index:index + batch_size]
+			})[0]
+
+		occlusion_masks.extend(occlusion_mask)
 
-	return occlusion_mask
+	return occlusion_masks
 
 
-def forward_parse_face(prepare_vision_frame : VisionFrame) -> Mask:
+@measure
+def forward_parse_faces(prepare_vision_frames : VisionFrame) -> List[Mask]:
 	model_name = state_manager.get_item('face_parser_model')
-	face_parser = get_inference_pool().get(model_name)
+	face_parser = get_inference_session(model_name)
+	batch_size = resolve_batch_size(face_parser, len(prepare_vision_frames))
+	region_masks : List[Mask] = []
 
-	with conditional_thread_semaphore():
-		region_mask : Mask = face_parser.run(None,
-		{
-			'input': prepare_vision_frame
-		})[0][0]
+	for index in range(0, len(prepare_vision_frames), batch_size):
+		with conditional_thread_semaphore():
+			region_mask = face_parser.run(None,
+			{
+				'input': prepare_vision_frames[index:index + batch_size]
+			})[0]
+
+		region_masks.extend(region_mask)
+
+	return region_masks
+
+
+def resolve_batch_size(inference_session : InferenceSession, frame_total : int) -> int:
+	batch_size = get_first(inference_session.get_inputs()[0].shape)
 
-	return region_mask
+	if isinstance(batch_size, int) and batch_size > 0:
+		return batch_size
+	return max(frame_total, 1)
@@ -1,12 +1,14 @@
 from functools import lru_cache
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy
+from onnxruntime import InferenceSession
 
 from facefusion import inference_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.face_helper import warp_face_by_face_landmark_5
 from facefusion.filesystem import resolve_relative_path
+from facefusion.metrics import measure
 from facefusion.thread_helper import conditional_thread_semaphore
 from facefusion.types import DownloadScope, Embedding, FaceLandmark5, InferencePool, ModelOptions, ModelSet, VisionFrame
 
@@ -46,6 +48,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ 'arcface' ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ 'arcface' ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -75,8 +84,9 @@ def calc_embedding(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandma
 	return embedding, normed_embedding
 
 
+@measure
 def forward(crop_vision_frame : VisionFrame) -> Embedding:
-	face_recognizer = get_inference_pool().get('face_recognizer')
+	face_recognizer = get_inference_session('face_recognizer')
 
 	with conditional_thread_semaphore():
 		embedding = face_recognizer.run(None,
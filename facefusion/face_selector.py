@@ -6,6 +6,18 @@ from facefusion import state_manager
 from facefusion.types import Face, FaceSelectorOrder, FaceSet, Gender, Race, Score
 
 
+def select_faces(faces : List[Face], reference_faces : FaceSet) -> List[Face]:
+	many_faces = sort_and_filter_faces(faces)
+
+	if state_manager.get_item('face_selector_mode') == 'many':
+		return many_faces
+	if state_manager.get_item('face_selector_mode') == 'one':
+		return many_faces[:1]
+	if state_manager.get_item('face_selector_mode') == 'reference':
+		return find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
+	return []
+
+
 def find_similar_faces(faces : List[Face], reference_faces : FaceSet, face_distance : float) -> List[Face]:
 	similar_faces : List[Face] = []
 
@@ -1,6 +1,10 @@
+import hashlib
+import threading
 from typing import List, Optional
 
-from facefusion.hash_helper import create_hash
+import numpy
+
+from facefusion import state_manager
 from facefusion.types import Face, FaceSet, FaceStore, VisionFrame
 
 FACE_STORE : FaceStore =\
@@ -8,25 +12,69 @@ FACE_STORE : FaceStore =\
 	'static_faces': {},
 	'reference_faces': {}
 }
+FACE_STORE_LOCK : threading.Lock = threading.Lock()
+STATIC_FACES_MEMORY_LIMIT : int = 256 * 1024 * 1024
+STATIC_FACES_ENTRY_MEMORY : int = 256
+STATIC_FACES_MEMORY : int = 0
 
 
 def get_face_store() -> FaceStore:
 	return FACE_STORE
 
 
-def get_static_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
-	vision_hash = create_hash(vision_frame.tobytes())
-	return FACE_STORE.get('static_faces').get(vision_hash)
+def get_static_faces(vision_frame : VisionFrame, frame_number : Optional[int] = None) -> Optional[List[Face]]:
+	vision_key = create_vision_key(vision_frame, frame_number)
+
+	with FACE_STORE_LOCK:
+		static_faces = FACE_STORE.get('static_faces').pop(vision_key, None)
+
+		if static_faces is not None:
+			FACE_STORE['static_faces'][vision_key] = static_faces
+	return static_faces
+
+
+def set_static_faces(vision_frame : VisionFrame, faces : List[Face], frame_number : Optional[int] = None) -> None:
+	global STATIC_FACES_MEMORY
+
+	vision_key = create_vision_key(vision_frame, frame_number)
+
+	with FACE_STORE_LOCK:
+		previous_faces = FACE_STORE.get('static_faces').pop(vision_key, None)
 
+		if previous_faces is not None:
+			STATIC_FACES_MEMORY -= calc_faces_memory(previous_faces)
+		FACE_STORE['static_faces'][vision_key] = faces
+		STATIC_FACES_MEMORY += calc_faces_memory(faces)
 
-def set_static_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
-	vision_hash = create_hash(vision_frame.tobytes())
-	if vision_hash:
-		FACE_STORE['static_faces'][vision_hash] = faces
+		while STATIC_FACES_MEMORY > STATIC_FACES_MEMORY_LIMIT and len(FACE_STORE.get('static_faces')) > 1:
+			oldest_key = next(iter(FACE_STORE.get('static_faces')))
+			STATIC_FACES_MEMORY -= calc_faces_memory(FACE_STORE['static_faces'].pop(oldest_key))
 
 
 def clear_static_faces() -> None:
-	FACE_STORE['static_faces'].clear()
+	global STATIC_FACES_MEMORY
+
+	with FACE_STORE_LOCK:
+		FACE_STORE['static_faces'].clear()
+		STATIC_FACES_MEMORY = 0
+
+
+def create_vision_key(vision_frame : VisionFrame, frame_number : Optional[int]) -> str:
+	if frame_number is not None:
+		return state_manager.get_item('target_path') + ':' + str(frame_number)
+
+	vision_hash = hashlib.sha256(str(vision_frame.shape).encode())
+	vision_hash.update(numpy.ascontiguousarray(vision_frame).data)
+	return vision_hash.hexdigest()
+
+
+def calc_faces_memory(faces : List[Face]) -> int:
+	faces_memory = STATIC_FACES_ENTRY_MEMORY
+
+	for face in faces:
+		faces_memory += face.bounding_box.nbytes + face.embedding.nbytes + face.normed_embedding.nbytes
+		faces_memory += sum(face_landmark.nbytes for face_landmark in face.landmark_set.values())
+	return faces_memory
 
 
 def get_reference_faces() -> Optional[FaceSet]:
@@ -0,0 +1,93 @@
+import threading
+from typing import List, Optional
+
+import cv2
+import numpy
+
+from facefusion import state_manager
+from facefusion.face_helper import transform_bounding_box, transform_points
+from facefusion.types import Face, FaceLandmarkSet, FaceTrackSet, Matrix, VisionFrame
+from facefusion.vision import calc_histogram_difference
+
+FACE_TRACK_SET : FaceTrackSet = {}
+FACE_TRACK_LOCK : threading.Lock = threading.Lock()
+FACE_TRACK_LIMIT : int = 16
+
+
+def has_face_track(frame_number : int) -> bool:
+	with FACE_TRACK_LOCK:
+		return frame_number in FACE_TRACK_SET
+
+
+def is_track_frame(frame_number : int) -> bool:
+	return frame_number % state_manager.get_item('face_tracker_interval') > 0
+
+
+def track_faces(frame_number : int, vision_frame : VisionFrame) -> Optional[List[Face]]:
+	with FACE_TRACK_LOCK:
+		face_track = FACE_TRACK_SET.pop(frame_number - 1, None)
+
+	if face_track and is_track_frame(frame_number):
+		previous_vision_frame = face_track.get('vision_frame')
+
+		if previous_vision_frame.shape == vision_frame.shape and not detect_scene_cut(previous_vision_frame, vision_frame):
+			faces = propagate_faces(previous_vision_frame, vision_frame, face_track.get('faces'))
+
+			if faces:
+				start_face_track(frame_number, vision_frame, faces)
+				return faces
+	return None
+
+
+def start_face_track(frame_number : int, vision_frame : VisionFrame, faces : List[Face]) -> None:
+	if faces and is_track_frame(frame_number + 1):
+		with FACE_TRACK_LOCK:
+			FACE_TRACK_SET[frame_number] =\
+			{
+				'vision_frame': vision_frame,
+				'faces': faces
+			}
+
+			while len(FACE_TRACK_SET) > FACE_TRACK_LIMIT:
+				FACE_TRACK_SET.pop(next(iter(FACE_TRACK_SET)))
+
+
+def clear_face_tracks() -> None:
+	with FACE_TRACK_LOCK:
+		FACE_TRACK_SET.clear()
+
+
+def detect_scene_cut(previous_vision_frame : VisionFrame, vision_frame : VisionFrame) -> bool:
+	return calc_histogram_difference(previous_vision_frame, vision_frame) < 0.7
+
+
+def propagate_faces(previous_vision_frame : VisionFrame, vision_frame : VisionFrame, faces : List[Face]) -> List[Face]:
+	previous_gray_frame = cv2.cvtColor(previous_vision_frame, cv2.COLOR_BGR2GRAY)
+	gray_frame = cv2.cvtColor(vision_frame, cv2.COLOR_BGR2GRAY)
+	previous_points = numpy.concatenate([ face.landmark_set.get('68') for face in faces ]).reshape(-1, 1, 2).astype(numpy.float32)
+	points, point_status, _ = cv2.calcOpticalFlowPyrLK(previous_gray_frame, gray_frame, previous_points, None, winSize = (21, 21), maxLevel = 3)
+	point_status = point_status.reshape(len(faces), -1).astype(bool)
+	previous_points = previous_points.reshape(len(faces), -1, 2)
+	points = points.reshape(len(faces), -1, 2)
+	tracked_faces = []
+
+	for face, face_points, previous_face_points, face_point_status in zip(faces, points, previous_points, point_status):
+		if numpy.count_nonzero(face_point_status) < face_point_status.size // 2:
+			return []
+		affine_matrix, _ = cv2.estimateAffinePartial2D(previous_face_points[face_point_status], face_points[face_point_status], method = cv2.RANSAC)
+
+		if affine_matrix is None:
+			return []
+		tracked_faces.append(transform_face(face, affine_matrix))
+	return tracked_faces
+
+
+def transform_face(face : Face, affine_matrix : Matrix) -> Face:
+	face_landmark_set : FaceLandmarkSet =\
+	{
+		'5': transform_points(face.landmark_set.get('5'), affine_matrix),
+		'5/68': transform_points(face.landmark_set.get('5/68'), affine_matrix),
+		'68': transform_points(face.landmark_set.get('68'), affine_matrix),
+		'68/5': transform_points(face.landmark_set.get('68/5'), affine_matrix)
+	}
+	return face._replace(bounding_box = transform_bounding_box(face.bounding_box, affine_matrix), landmark_set = face_landmark_set)
@@ -2,16 +2,19 @@ import os
 import subprocess
 import tempfile
 from functools import partial
+from io import BufferedReader
 from typing import List, Optional, cast
 
+import numpy
 from tqdm import tqdm
 
 import facefusion.choices
 from facefusion import ffmpeg_builder, logger, process_manager, state_manager, wording
 from facefusion.filesystem import get_file_format, remove_file
+from facefusion.metrics import measure
 from facefusion.temp_helper import get_temp_file_path, get_temp_frames_pattern
-from facefusion.types import AudioBuffer, AudioEncoder, Commands, EncoderSet, Fps, UpdateProgress, VideoEncoder, VideoFormat
-from facefusion.vision import detect_video_duration, detect_video_fps, predict_video_frame_total
+from facefusion.types import AudioBuffer, AudioEncoder, Commands, Duration, EncoderSet, Fps, UpdateProgress, VideoEncoder, VideoFormat, VisionFrame
+from facefusion.vision import detect_video_duration, detect_video_fps, predict_video_frame_total, unpack_resolution
 
 
 def run_ffmpeg_with_progress(commands : Commands, update_progress : UpdateProgress) -> subprocess.Popen[bytes]:
@@ -106,6 +109,7 @@ def get_available_encoder_set() -> EncoderSet:
 	return available_encoder_set
 
 
+@measure
 def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
 	extract_frame_total = predict_video_frame_total(target_path, temp_video_fps, trim_frame_start, trim_frame_end)
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
@@ -211,6 +215,7 @@ def replace_audio(target_path : str, audio_path : str, output_path : str) -> boo
 	return run_ffmpeg(commands).returncode == 0
 
 
+@measure
 def merge_video(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
 	output_video_encoder = state_manager.get_item('output_video_encoder')
 	output_video_quality = state_manager.get_item('output_video_quality')
@@ -239,6 +244,117 @@ def merge_video(target_path : str, temp_video_fps : Fps, output_video_resolution
 		return process.returncode == 0
 
 
+@measure
+def merge_video_segment(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, segment_path : str, segment_frame_start : int, segment_frame_total : int) -> bool:
+	output_video_encoder = state_manager.get_item('output_video_encoder')
+	output_video_quality = state_manager.get_item('output_video_quality')
+	output_video_preset = state_manager.get_item('output_video_preset')
+	segment_video_format = cast(VideoFormat, get_file_format(segment_path))
+	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
+
+	output_video_encoder = fix_video_encoder(segment_video_format, output_video_encoder)
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.set_input_fps(temp_video_fps),
+		ffmpeg_builder.set_input_start_number(segment_frame_start),
+		ffmpeg_builder.set_input(temp_frames_pattern),
+		ffmpeg_builder.set_media_resolution(output_video_resolution),
+		ffmpeg_builder.set_video_encoder(output_video_encoder),
+		ffmpeg_builder.set_video_quality(output_video_encoder, output_video_quality),
+		ffmpeg_builder.set_video_preset(output_video_encoder, output_video_preset),
+		ffmpeg_builder.set_video_fps(output_video_fps),
+		ffmpeg_builder.set_video_duration(segment_frame_total / temp_video_fps),
+		ffmpeg_builder.set_pixel_format(output_video_encoder),
+		ffmpeg_builder.set_video_colorspace('bt709'),
+		ffmpeg_builder.force_output(segment_path)
+	)
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
+
+
+def open_extract_stream(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> subprocess.Popen[bytes]:
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.set_input(target_path),
+		ffmpeg_builder.set_media_resolution(temp_video_resolution),
+		ffmpeg_builder.select_frame_range(trim_frame_start, trim_frame_end, temp_video_fps),
+		ffmpeg_builder.prevent_frame_drop(),
+		ffmpeg_builder.cast_raw_video(),
+		ffmpeg_builder.cast_stream()
+	)
+	return open_ffmpeg(commands)
+
+
+def open_merge_stream(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps) -> subprocess.Popen[bytes]:
+	output_video_encoder = state_manager.get_item('output_video_encoder')
+	output_video_quality = state_manager.get_item('output_video_quality')
+	output_video_preset = state_manager.get_item('output_video_preset')
+	temp_video_path = get_temp_file_path(target_path)
+	temp_video_format = cast(VideoFormat, get_file_format(temp_video_path))
+
+	output_video_encoder = fix_video_encoder(temp_video_format, output_video_encoder)
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.cast_raw_video(),
+		ffmpeg_builder.set_media_resolution(output_video_resolution),
+		ffmpeg_builder.set_input_fps(temp_video_fps),
+		ffmpeg_builder.set_input('-'),
+		ffmpeg_builder.set_video_encoder(output_video_encoder),
+		ffmpeg_builder.set_video_quality(output_video_encoder, output_video_quality),
+		ffmpeg_builder.set_video_preset(output_video_encoder, output_video_preset),
+		ffmpeg_builder.set_video_fps(output_video_fps),
+		ffmpeg_builder.set_pixel_format(output_video_encoder),
+		ffmpeg_builder.set_video_colorspace('bt709'),
+		ffmpeg_builder.force_output(temp_video_path)
+	)
+	return open_ffmpeg(commands)
+
+
+def read_stream_frame(process : subprocess.Popen[bytes], video_resolution : str) -> Optional[VisionFrame]:
+	video_width, video_height = unpack_resolution(video_resolution)
+	vision_frame = numpy.empty((video_height, video_width, 3), dtype = numpy.uint8)
+
+	if cast(BufferedReader, process.stdout).readinto(vision_frame.data) == vision_frame.nbytes:
+		return vision_frame
+	return None
+
+
+def write_stream_frame(process : subprocess.Popen[bytes], vision_frame : VisionFrame) -> bool:
+	try:
+		process.stdin.write(numpy.ascontiguousarray(vision_frame, dtype = numpy.uint8).data)
+		return True
+	except (BrokenPipeError, ValueError):
+		return False
+
+
+def close_stream(process : subprocess.Popen[bytes]) -> bool:
+	if process.stdin:
+		process.stdin.close()
+	if process.stdout:
+		process.stdout.close()
+	if process_manager.is_stopping():
+		process.terminate()
+	return process.wait() == 0
+
+
+def create_test_video(overlay_path : str, output_path : str, video_resolution : str, video_fps : Fps, video_duration : Duration) -> bool:
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.set_test_video_input(video_resolution, video_fps, video_duration),
+		ffmpeg_builder.set_input(overlay_path),
+		ffmpeg_builder.overlay_input_centered(),
+		ffmpeg_builder.set_video_encoder('libx264'),
+		ffmpeg_builder.set_pixel_format('libx264'),
+		ffmpeg_builder.force_output(output_path)
+	)
+	return run_ffmpeg(commands).returncode == 0
+
+
+def create_test_audio(output_path : str, audio_duration : Duration) -> bool:
+	commands = ffmpeg_builder.chain(
+		ffmpeg_builder.set_test_audio_input(audio_duration),
+		ffmpeg_builder.force_output(output_path)
+	)
+	return run_ffmpeg(commands).returncode == 0
+
+
 def concat_video(output_path : str, temp_output_paths : List[str]) -> bool:
 	concat_video_path = tempfile.mktemp()
 
@@ -32,10 +32,26 @@ def set_input(input_path : str) -> Commands:
 	return [ '-i', input_path ]
 
 
+def set_test_video_input(video_resolution : str, video_fps : Fps, video_duration : Duration) -> Commands:
+	return [ '-f', 'lavfi', '-i', 'testsrc2=size=' + video_resolution + ':rate=' + str(video_fps) + ':duration=' + str(video_duration) ]
+
+
+def set_test_audio_input(audio_duration : Duration) -> Commands:
+	return [ '-f', 'lavfi', '-i', 'sine=frequency=440:duration=' + str(audio_duration) ]
+
+
+def overlay_input_centered() -> Commands:
+	return [ '-filter_complex', 'overlay=(W-w)/2:(H-h)/2' ]
+
+
 def set_input_fps(input_fps : Fps) -> Commands:
 	return [ '-r', str(input_fps)]
 
 
+def set_input_start_number(start_number : int) -> Commands:
+	return [ '-start_number', str(start_number) ]
+
+
 def set_output(output_path : str) -> Commands:
 	return [ output_path ]
 
@@ -216,6 +232,10 @@ def capture_video() -> Commands:
 	return [ '-f', 'rawvideo', '-pix_fmt', 'rgb24' ]
 
 
+def cast_raw_video() -> Commands:
+	return [ '-f', 'rawvideo', '-pix_fmt', 'bgr24' ]
+
+
 def ignore_video_stream() -> Commands:
 	return [ '-vn' ]
 
@@ -1,5 +1,6 @@
 import os
 import zlib
+from functools import lru_cache
 from typing import Optional
 
 from facefusion.filesystem import get_file_name, is_file
@@ -16,13 +17,16 @@ def validate_hash(validate_path : str) -> bool:
 		with open(hash_path) as hash_file:
 			hash_content = hash_file.read()
 
-		with open(validate_path, 'rb') as validate_file:
-			validate_content = validate_file.read()
-
-		return create_hash(validate_content) == hash_content
+		return create_static_file_hash(validate_path, os.path.getsize(validate_path), os.path.getmtime(validate_path)) == hash_content
 	return False
 
 
+@lru_cache(maxsize = None)
+def create_static_file_hash(file_path : str, file_size : int, file_modified_time : float) -> str:
+	with open(file_path, 'rb') as file:
+		return create_hash(file.read())
+
+
 def get_hash_path(validate_path : str) -> Optional[str]:
 	if is_file(validate_path):
 		validate_directory_path, file_name_and_extension = os.path.split(validate_path)
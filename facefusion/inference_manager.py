@@ -1,49 +1,91 @@
 import importlib
+import os
+import threading
+from collections import OrderedDict
 from time import sleep
-from typing import List
+from typing import List, Optional, Tuple, cast
 
-from onnxruntime import InferenceSession
+from onnxruntime import GraphOptimizationLevel, InferenceSession, __version__ as onnxruntime_version
 
+import facefusion.choices
 from facefusion import process_manager, state_manager
 from facefusion.app_context import detect_app_context
-from facefusion.execution import create_inference_session_providers
-from facefusion.filesystem import is_file
-from facefusion.types import DownloadSet, ExecutionProvider, InferencePool, InferencePoolSet
+from facefusion.execution import create_inference_session_options, create_inference_session_providers
+from facefusion.filesystem import create_directory, is_file
+from facefusion.hash_helper import create_hash
+from facefusion.types import DownloadSet, ExecutionProvider, InferencePool, InferencePoolSet, SessionProfile
 
 INFERENCE_POOL_SET : InferencePoolSet =\
 {
 	'cli': {},
 	'ui': {}
 }
+INFERENCE_MEMORY_SET : OrderedDict[Tuple[str, str], int] = OrderedDict()
+INFERENCE_LOCK : threading.RLock = threading.RLock()
 
 
 def get_inference_pool(module_name : str, model_names : List[str], model_source_set : DownloadSet) -> InferencePool:
+	for model_name in model_source_set.keys():
+		get_inference_session(module_name, model_names, model_source_set, model_name)
+
+	return resolve_inference_pool(module_name, model_names)
+
+
+def get_inference_session(module_name : str, model_names : List[str], model_source_set : DownloadSet, model_name : str) -> Optional[InferenceSession]:
 	while process_manager.is_checking():
 		sleep(0.5)
 	execution_device_id = state_manager.get_item('execution_device_id')
 	execution_providers = resolve_execution_providers(module_name)
+	inference_pool = resolve_inference_pool(module_name, model_names)
+	inference_context = get_inference_context(module_name, model_names, execution_device_id, execution_providers)
+
+	with INFERENCE_LOCK:
+		if model_name not in inference_pool and model_name in model_source_set:
+			model_path = model_source_set.get(model_name).get('path')
+
+			if is_file(model_path):
+				session_profile = resolve_session_profile(model_name)
+				inference_pool[model_name] = create_inference_session(model_path, execution_device_id, execution_providers, session_profile)
+				INFERENCE_MEMORY_SET[(inference_context, model_name)] = os.path.getsize(model_path)
+
+		if (inference_context, model_name) in INFERENCE_MEMORY_SET:
+			INFERENCE_MEMORY_SET.move_to_end((inference_context, model_name))
+			evict_inference_sessions(inference_context)
+
+	return inference_pool.get(model_name)
+
+
+def resolve_inference_pool(module_name : str, model_names : List[str]) -> InferencePool:
+	execution_device_id = state_manager.get_item('execution_device_id')
+	execution_providers = resolve_execution_providers(module_name)
 	app_context = detect_app_context()
 	inference_context = get_inference_context(module_name, model_names, execution_device_id, execution_providers)
 
-	if app_context == 'cli' and INFERENCE_POOL_SET.get('ui').get(inference_context):
-		INFERENCE_POOL_SET['cli'][inference_context] = INFERENCE_POOL_SET.get('ui').get(inference_context)
-	if app_context == 'ui' and INFERENCE_POOL_SET.get('cli').get(inference_context):
-		INFERENCE_POOL_SET['ui'][inference_context] = INFERENCE_POOL_SET.get('cli').get(inference_context)
-	if not INFERENCE_POOL_SET.get(app_context).get(inference_context):
-		INFERENCE_POOL_SET[app_context][inference_context] = create_inference_pool(model_source_set, execution_device_id, execution_providers)
+	with INFERENCE_LOCK:
+		if app_context == 'cli' and inference_context in INFERENCE_POOL_SET.get('ui'):
+			INFERENCE_POOL_SET['cli'][inference_context] = INFERENCE_POOL_SET.get('ui').get(inference_context)
+		if app_context == 'ui' and inference_context in INFERENCE_POOL_SET.get('cli'):
+			INFERENCE_POOL_SET['ui'][inference_context] = INFERENCE_POOL_SET.get('cli').get(inference_context)
+		if inference_context not in INFERENCE_POOL_SET.get(app_context):
+			INFERENCE_POOL_SET[app_context][inference_context] = {}
 
 	return INFERENCE_POOL_SET.get(app_context).get(inference_context)
 
 
-def create_inference_pool(model_source_set : DownloadSet, execution_device_id : str, execution_providers : List[ExecutionProvider]) -> InferencePool:
-	inference_pool : InferencePool = {}
+def evict_inference_sessions(keep_inference_context : str) -> None:
+	video_memory_limit = state_manager.get_item('video_memory_limit')
 
-	for model_name in model_source_set.keys():
-		model_path = model_source_set.get(model_name).get('path')
-		if is_file(model_path):
-			inference_pool[model_name] = create_inference_session(model_path, execution_device_id, execution_providers)
+	if video_memory_limit:
+		for inference_context, model_name in list(INFERENCE_MEMORY_SET.keys()):
+			if sum(INFERENCE_MEMORY_SET.values()) <= video_memory_limit * 1024 * 1024:
+				break
+
+			if inference_context != keep_inference_context:
+				del INFERENCE_MEMORY_SET[(inference_context, model_name)]
 
-	return inference_pool
+				for app_context in INFERENCE_POOL_SET:
+					if inference_context in INFERENCE_POOL_SET.get(app_context):
+						INFERENCE_POOL_SET[app_context][inference_context].pop(model_name, None)
 
 
 def clear_inference_pool(module_name : str, model_names : List[str]) -> None:
@@ -52,13 +94,63 @@ def clear_inference_pool(module_name : str, model_names : List[str]) -> None:
 	app_context = detect_app_context()
 	inference_context = get_inference_context(module_name, model_names, execution_device_id, execution_providers)
 
-	if INFERENCE_POOL_SET.get(app_context).get(inference_context):
-		del INFERENCE_POOL_SET[app_context][inference_context]
+	if state_manager.get_item('video_memory_limit'):
+		return
 
+	with INFERENCE_LOCK:
+		if inference_context in INFERENCE_POOL_SET.get(app_context):
+			del INFERENCE_POOL_SET[app_context][inference_context]
 
-def create_inference_session(model_path : str, execution_device_id : str, execution_providers : List[ExecutionProvider]) -> InferenceSession:
+			for inference_memory_key in list(INFERENCE_MEMORY_SET.keys()):
+				if inference_memory_key[0] == inference_context:
+					del INFERENCE_MEMORY_SET[inference_memory_key]
+
+
+def create_inference_session(model_path : str, execution_device_id : str, execution_providers : List[ExecutionProvider], session_profile : SessionProfile = 'balanced') -> InferenceSession:
 	inference_session_providers = create_inference_session_providers(execution_device_id, execution_providers)
-	return InferenceSession(model_path, providers = inference_session_providers)
+	session_options = create_inference_session_options(session_profile, resolve_execution_thread_total())
+	session_cache_path = resolve_session_cache_path(model_path, execution_providers, session_profile)
+
+	if session_cache_path:
+		if is_file(session_cache_path):
+			session_options.graph_optimization_level = GraphOptimizationLevel.ORT_DISABLE_ALL
+			return InferenceSession(session_cache_path, sess_options = session_options, providers = inference_session_providers)
+
+		if create_directory(os.path.dirname(session_cache_path)):
+			session_cache_temp_path = session_cache_path + '.' + str(os.getpid()) + '.' + str(threading.get_ident())
+			session_options.optimized_model_filepath = session_cache_temp_path
+			inference_session = InferenceSession(model_path, sess_options = session_options, providers = inference_session_providers)
+
+			if is_file(session_cache_temp_path):
+				os.replace(session_cache_temp_path, session_cache_path)
+			return inference_session
+
+	return InferenceSession(model_path, sess_options = session_options, providers = inference_session_providers)
+
+
+def resolve_session_profile(model_name : str) -> SessionProfile:
+	session_model_profiles = state_manager.get_item('session_model_profiles')
+
+	if session_model_profiles:
+		for session_model_profile in session_model_profiles:
+			session_model_name, _, session_profile = session_model_profile.partition('=')
+
+			if session_model_name == model_name and session_profile in facefusion.choices.session_profiles:
+				return cast(SessionProfile, session_profile)
+	return state_manager.get_item('session_profile') or 'balanced'
+
+
+def resolve_session_cache_path(model_path : str, execution_providers : List[ExecutionProvider], session_profile : SessionProfile) -> Optional[str]:
+	if state_manager.get_item('session_cache') and state_manager.get_item('cache_path') and set(execution_providers).issubset([ 'cpu', 'cuda' ]):
+		session_cache_key = create_hash('.'.join([ model_path, str(os.path.getmtime(model_path)), session_profile, onnxruntime_version ] + list(execution_providers)).encode())
+		return os.path.join(state_manager.get_item('cache_path'), 'sessions', session_cache_key + '.onnx')
+	return None
+
+
+def resolve_execution_thread_total() -> int:
+	execution_thread_count = state_manager.get_item('execution_thread_count') or 1
+	execution_process_count = state_manager.get_item('execution_process_count') or 1
+	return execution_thread_count * execution_process_count
 
 
 def get_inference_context(module_name : str, model_names : List[str], execution_device_id : str, execution_providers : List[ExecutionProvider]) -> str:
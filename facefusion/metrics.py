@@ -0,0 +1,133 @@
+import os
+import threading
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, List, TypeVar, cast
+
+from facefusion.filesystem import get_file_name
+from facefusion.json import write_json
+from facefusion.types import Metric, MetricProfile, MetricSet
+
+METRIC_BUCKETS : List[float] = [ 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0 ]
+METRIC_SET : MetricSet = {}
+METRIC_LOCK : threading.Lock = threading.Lock()
+MeasureFunction = TypeVar('MeasureFunction', bound = Callable[..., Any])
+
+
+def measure(function : MeasureFunction) -> MeasureFunction:
+	metric_name = function.__module__.split('.')[-1] + '.' + function.__name__
+
+	@wraps(function)
+	def measure_function(*args : Any, **kwargs : Any) -> Any:
+		start_time = perf_counter()
+
+		try:
+			return function(*args, **kwargs)
+		finally:
+			record_metric(metric_name, perf_counter() - start_time)
+
+	return cast(MeasureFunction, measure_function)
+
+
+def record_metric(metric_name : str, duration : float) -> None:
+	with METRIC_LOCK:
+		metric = METRIC_SET.get(metric_name)
+
+		if not metric:
+			metric = METRIC_SET[metric_name] = create_metric()
+		metric['count'] += 1
+		metric['total'] += duration
+
+		for index, metric_bucket in enumerate(METRIC_BUCKETS):
+			if duration <= metric_bucket:
+				metric['buckets'][index] += 1
+				break
+
+
+def create_metric() -> Metric:
+	return\
+	{
+		'count': 0,
+		'total': 0.0,
+		'buckets': [ 0 ] * (len(METRIC_BUCKETS) + 1)
+	}
+
+
+def get_metrics() -> MetricSet:
+	with METRIC_LOCK:
+		return\
+		{
+			metric_name:
+			{
+				'count': metric.get('count'),
+				'total': metric.get('total'),
+				'buckets': metric.get('buckets').copy()
+			} for metric_name, metric in METRIC_SET.items()
+		}
+
+
+def merge_metrics(metric_set : MetricSet) -> None:
+	with METRIC_LOCK:
+		for metric_name, metric in metric_set.items():
+			if metric_name not in METRIC_SET:
+				METRIC_SET[metric_name] = create_metric()
+			METRIC_SET[metric_name]['count'] += metric.get('count')
+			METRIC_SET[metric_name]['total'] += metric.get('total')
+			METRIC_SET[metric_name]['buckets'] = [ bucket_a + bucket_b for bucket_a, bucket_b in zip(METRIC_SET.get(metric_name).get('buckets'), metric.get('buckets')) ]
+
+
+def clear_metrics() -> None:
+	with METRIC_LOCK:
+		METRIC_SET.clear()
+
+
+def create_metric_profile() -> MetricProfile:
+	metric_profile : MetricProfile = {}
+
+	for metric_name, metric in sorted(get_metrics().items()):
+		metric_profile[metric_name] =\
+		{
+			'count': metric.get('count'),
+			'total': round(metric.get('total'), 6),
+			'mean': round(metric.get('total') / max(metric.get('count'), 1), 6),
+			'p50': calc_metric_quantile(metric, 0.5),
+			'p95': calc_metric_quantile(metric, 0.95),
+			'p99': calc_metric_quantile(metric, 0.99)
+		}
+	return metric_profile
+
+
+def calc_metric_quantile(metric : Metric, quantile : float) -> float:
+	bucket_limit = metric.get('count') * quantile
+	bucket_count = 0
+
+	for index, metric_bucket in enumerate(METRIC_BUCKETS):
+		bucket_count += metric.get('buckets')[index]
+
+		if bucket_count >= bucket_limit:
+			return metric_bucket
+	return float('inf')
+
+
+def write_metric_profile(output_path : str) -> bool:
+	metric_profile_path = os.path.join(os.path.dirname(output_path), get_file_name(output_path) + '.profile.json')
+	return write_json(metric_profile_path, create_metric_profile())
+
+
+def render_metrics() -> str:
+	metric_lines =\
+	[
+		'# HELP facefusion_stage_duration_seconds Latency of the instrumented processing stages.',
+		'# TYPE facefusion_stage_duration_seconds histogram'
+	]
+
+	for metric_name, metric in sorted(get_metrics().items()):
+		bucket_count = 0
+
+		for index, metric_bucket in enumerate(METRIC_BUCKETS):
+			bucket_count += metric.get('buckets')[index]
+			metric_lines.append('facefusion_stage_duration_seconds_bucket{stage="' + metric_name + '",le="' + str(metric_bucket) + '"} ' + str(bucket_count))
+		metric_lines.append('facefusion_stage_duration_seconds_bucket{stage="' + metric_name + '",le="+Inf"} ' + str(metric.get('count')))
+		metric_lines.append('facefusion_stage_duration_seconds_sum{stage="' + metric_name + '"} ' + str(metric.get('total')))
+		metric_lines.append('facefusion_stage_duration_seconds_count{stage="' + metric_name + '"} ' + str(metric.get('count')))
+	return '\n'.join(metric_lines) + '\n'
@@ -1,15 +1,31 @@
 import importlib
+import math
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from queue import Queue
 from types import ModuleType
-from typing import Any, List
+from typing import Any, Deque, Dict, Generator, List, Optional, Set, Tuple
 
+import cv2
+import numpy
 from tqdm import tqdm
 
-from facefusion import logger, state_manager, wording
+import facefusion.choices
+from facefusion import logger, process_manager, state_manager, wording
+from facefusion.audio import create_empty_audio_frame, get_voice_frame
+from facefusion.common_helper import get_first
+from facefusion.execution_tuner import create_execution_tuner, update_execution_tuner
 from facefusion.exit_helper import hard_exit
-from facefusion.types import ProcessFrames, QueuePayload
+from facefusion.face_analyser import get_average_face, get_many_frame_faces, get_many_image_faces
+from facefusion.face_selector import sort_faces_by_order
+from facefusion.face_store import get_reference_faces, get_static_faces, set_static_faces
+from facefusion.ffmpeg import read_stream_frame, write_stream_frame
+from facefusion.filesystem import filter_audio_paths, filter_image_paths
+from facefusion.types import AudioFrame, ExecutionTuner, Face, FaceSet, Fps, ProcessFrames, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.vision import read_image, restrict_video_fps, unpack_resolution, write_image
 
 PROCESSORS_METHODS =\
 [
@@ -26,6 +42,13 @@ PROCESSORS_METHODS =\
 	'process_image',
 	'process_video'
 ]
+TEMP_FRAME_READER : Optional[ThreadPoolExecutor] = None
+TEMP_FRAME_WRITER : Optional[ThreadPoolExecutor] = None
+TEMP_FRAME_FUTURES : Dict[str, Future[VisionFrame]] = {}
+TEMP_FRAME_PATHS : Deque[str] = deque()
+TEMP_FRAME_SKIPS : Set[str] = set()
+TEMP_FRAME_LOCK : threading.Lock = threading.Lock()
+TEMP_FRAME_SEMAPHORE : threading.BoundedSemaphore = threading.BoundedSemaphore()
 
 
 def load_processor_module(processor : str) -> Any:
@@ -55,19 +78,233 @@ def get_processors_modules(processors : List[str]) -> List[ModuleType]:
 
 def multi_process_frames(source_paths : List[str], temp_frame_paths : List[str], process_frames : ProcessFrames) -> None:
 	queue_payloads = create_queue_payloads(temp_frame_paths)
+	execution_tuner = create_multi_process_tuner()
+	start_temp_frame_pipeline(queue_payloads)
 	with tqdm(total = len(queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
 		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
-		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
-			futures = []
+		with ThreadPoolExecutor(max_workers = resolve_thread_limit()) as executor:
+			futures : Dict[Future[None], int] = {}
 			queue : Queue[QueuePayload] = create_queue(queue_payloads)
-			queue_per_future = max(len(queue_payloads) // state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_queue_count'), 1)
 
-			while not queue.empty():
-				future = executor.submit(process_frames, source_paths, pick_queue(queue, queue_per_future), progress.update)
+			while not queue.empty() or futures:
+				while not queue.empty() and len(futures) < execution_tuner.get('thread_count'):
+					queue_per_future = calc_queue_per_future(queue.qsize(), execution_tuner.get('thread_count'), execution_tuner.get('queue_count'), state_manager.get_item('face_tracker_interval'))
+					future_queue_payloads = pick_queue(queue, queue_per_future)
+					future = executor.submit(process_frames, source_paths, future_queue_payloads, progress.update)
+					futures[future] = len(future_queue_payloads)
+
+				futures_done, _ = wait(futures, return_when = FIRST_COMPLETED)
+
+				for future_done in futures_done:
+					future_done.result()
+					if update_execution_tuner(execution_tuner, futures.pop(future_done)) and execution_tuner.get('phase') == 'done':
+						logger.debug(wording.get('execution_tuned').format(thread_count = execution_tuner.get('thread_count'), queue_count = execution_tuner.get('queue_count')), __name__)
+
+		stop_temp_frame_pipeline()
+
+
+def start_temp_frame_pipeline(queue_payloads : List[QueuePayload]) -> None:
+	global TEMP_FRAME_READER, TEMP_FRAME_WRITER, TEMP_FRAME_SEMAPHORE
+
+	stop_temp_frame_pipeline()
+	pipeline_limit = state_manager.get_item('execution_thread_count') * 2
+	pipeline_worker_count = max(state_manager.get_item('execution_thread_count') // 2, 1)
+	TEMP_FRAME_READER = ThreadPoolExecutor(max_workers = pipeline_worker_count)
+	TEMP_FRAME_WRITER = ThreadPoolExecutor(max_workers = pipeline_worker_count)
+	TEMP_FRAME_SEMAPHORE = threading.BoundedSemaphore(pipeline_limit)
+	TEMP_FRAME_PATHS.extend(queue_payload.get('frame_path') for queue_payload in queue_payloads)
+
+	with TEMP_FRAME_LOCK:
+		prefetch_temp_frames(pipeline_limit)
+
+
+def stop_temp_frame_pipeline() -> None:
+	global TEMP_FRAME_READER, TEMP_FRAME_WRITER
+
+	if TEMP_FRAME_READER and TEMP_FRAME_WRITER:
+		TEMP_FRAME_READER.shutdown(wait = True, cancel_futures = True)
+		TEMP_FRAME_WRITER.shutdown(wait = True)
+	TEMP_FRAME_READER = None
+	TEMP_FRAME_WRITER = None
+	TEMP_FRAME_FUTURES.clear()
+	TEMP_FRAME_PATHS.clear()
+	TEMP_FRAME_SKIPS.clear()
+
+
+def prefetch_temp_frames(pipeline_limit : int) -> None:
+	while TEMP_FRAME_READER and TEMP_FRAME_PATHS and len(TEMP_FRAME_FUTURES) < pipeline_limit:
+		temp_frame_path = TEMP_FRAME_PATHS.popleft()
+
+		if temp_frame_path in TEMP_FRAME_SKIPS:
+			TEMP_FRAME_SKIPS.discard(temp_frame_path)
+		else:
+			TEMP_FRAME_FUTURES[temp_frame_path] = TEMP_FRAME_READER.submit(read_image, temp_frame_path)
+
+
+def read_temp_frame(temp_frame_path : str) -> Optional[VisionFrame]:
+	with TEMP_FRAME_LOCK:
+		future = TEMP_FRAME_FUTURES.pop(temp_frame_path, None)
+
+		if TEMP_FRAME_READER:
+			if not future:
+				TEMP_FRAME_SKIPS.add(temp_frame_path)
+			prefetch_temp_frames(state_manager.get_item('execution_thread_count') * 2)
+
+	if future:
+		return future.result()
+	return read_image(temp_frame_path)
+
+
+def manage_temp_frames(queue_payloads : List[QueuePayload]) -> Generator[Tuple[QueuePayload, VisionFrame], None, None]:
+	frame_batch_size = state_manager.get_item('execution_queue_count')
+
+	for batch_index in range(0, len(queue_payloads), frame_batch_size):
+		batch_queue_payloads = list(process_manager.manage(queue_payloads[batch_index:batch_index + frame_batch_size]))
+		target_vision_frames = [ read_temp_frame(queue_payload.get('frame_path')) for queue_payload in batch_queue_payloads ]
+		get_many_frame_faces(target_vision_frames, [ queue_payload.get('frame_number') for queue_payload in batch_queue_payloads ])
+
+		for queue_payload, target_vision_frame in zip(batch_queue_payloads, target_vision_frames):
+			yield queue_payload, target_vision_frame
+
+
+def write_temp_frame(temp_frame_path : str, vision_frame : VisionFrame, update_progress : UpdateProgress) -> None:
+	temp_frame_writer = TEMP_FRAME_WRITER
+
+	if temp_frame_writer:
+		TEMP_FRAME_SEMAPHORE.acquire()
+		temp_frame_writer.submit(finish_temp_frame, temp_frame_path, vision_frame, update_progress)
+	else:
+		write_image(temp_frame_path, vision_frame)
+		update_progress(1)
+
+
+def finish_temp_frame(temp_frame_path : str, vision_frame : VisionFrame, update_progress : UpdateProgress) -> None:
+	write_image(temp_frame_path, vision_frame)
+	update_progress(1)
+	TEMP_FRAME_SEMAPHORE.release()
+
+
+def create_multi_process_tuner() -> ExecutionTuner:
+	return create_execution_tuner(state_manager.get_item('execution_thread_count'), state_manager.get_item('execution_queue_count'), state_manager.get_item('execution_autotune'))
+
+
+def calc_queue_per_future(queue_total : int, thread_count : int, queue_count : int, face_tracker_interval : int) -> int:
+	queue_per_future = max(min(queue_count, queue_total // thread_count), 1)
+	return math.ceil(queue_per_future / face_tracker_interval) * face_tracker_interval
+
+
+def resolve_thread_limit() -> int:
+	if state_manager.get_item('execution_autotune'):
+		return max(facefusion.choices.execution_thread_count_range)
+	return state_manager.get_item('execution_thread_count')
+
+
+def multi_process_stream(source_paths : List[str], extract_process : subprocess.Popen[bytes], merge_process : subprocess.Popen[bytes], temp_video_resolution : str, temp_video_fps : Fps, output_video_resolution : str, frame_total : int) -> bool:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = extract_source_face(source_paths)
+	source_audio_path = get_first(filter_audio_paths(source_paths))
+	stream_limit = state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_queue_count')
+
+	with tqdm(total = frame_total, desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		progress.set_postfix(execution_providers = state_manager.get_item('execution_providers'))
+		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+			futures : Deque[Future[VisionFrame]] = deque()
+			frame_number = 0
+			is_written = True
+
+			while is_written and process_manager.is_processing():
+				target_vision_frame = read_stream_frame(extract_process, temp_video_resolution)
+				if target_vision_frame is None:
+					break
+				source_audio_frame = get_source_audio_frame(source_audio_path, temp_video_fps, frame_number)
+				future = executor.submit(process_vision_frame, processor_modules, reference_faces, source_face, source_audio_frame, target_vision_frame, frame_number)
 				futures.append(future)
+				frame_number += 1
+
+				while is_written and (len(futures) > stream_limit or futures and futures[0].done()):
+					is_written = write_stream_frame(merge_process, fit_stream_frame(futures.popleft().result(), output_video_resolution))
+					if is_written:
+						progress.update()
+
+			while is_written and futures and process_manager.is_processing():
+				is_written = write_stream_frame(merge_process, fit_stream_frame(futures.popleft().result(), output_video_resolution))
+				if is_written:
+					progress.update()
+
+			for future in futures:
+				future.cancel()
+	return is_written
+
+
+def process_fused_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
+	source_face = extract_source_face(source_paths)
+	source_audio_path = get_first(filter_audio_paths(source_paths))
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+
+	for queue_payload in process_manager.manage(queue_payloads):
+		frame_number = queue_payload.get('frame_number')
+		target_vision_path = queue_payload.get('frame_path')
+		source_audio_frame = get_source_audio_frame(source_audio_path, temp_video_fps, frame_number)
+		target_vision_frame = read_temp_frame(target_vision_path)
+		output_vision_frame = process_vision_frame(processor_modules, reference_faces, source_face, source_audio_frame, target_vision_frame, frame_number)
+		write_temp_frame(target_vision_path, output_vision_frame, update_progress)
+
+
+def process_vision_frame(processor_modules : List[ModuleType], reference_faces : FaceSet, source_face : Face, source_audio_frame : AudioFrame, target_vision_frame : VisionFrame, target_frame_number : Optional[int]) -> VisionFrame:
+	source_vision_frame = target_vision_frame
+
+	for processor_module in processor_modules:
+		output_vision_frame = processor_module.process_frame(
+		{
+			'reference_faces': reference_faces,
+			'source_face': source_face,
+			'source_audio_frame': source_audio_frame,
+			'source_vision_frame': source_vision_frame,
+			'target_vision_frame': target_vision_frame,
+			'target_frame_number': target_frame_number
+		})
+		if target_frame_number is None and processor_module is not processor_modules[-1]:
+			share_static_faces(target_vision_frame, output_vision_frame)
+		target_vision_frame = output_vision_frame
+	return target_vision_frame
+
+
+def share_static_faces(target_vision_frame : VisionFrame, output_vision_frame : VisionFrame) -> None:
+	if output_vision_frame is not target_vision_frame and output_vision_frame.shape == target_vision_frame.shape:
+		static_faces = get_static_faces(target_vision_frame)
+
+		if static_faces:
+			set_static_faces(output_vision_frame, static_faces)
+
+
+def extract_source_face(source_paths : List[str]) -> Optional[Face]:
+	source_faces = []
+
+	for source_path in filter_image_paths(source_paths):
+		temp_faces = get_many_image_faces([ source_path ])
+		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
+		if temp_faces:
+			source_faces.append(get_first(temp_faces))
+	return get_average_face(source_faces)
+
+
+def get_source_audio_frame(source_audio_path : Optional[str], temp_video_fps : Fps, frame_number : int) -> AudioFrame:
+	source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number)
+	if not numpy.any(source_audio_frame):
+		source_audio_frame = create_empty_audio_frame()
+	return source_audio_frame
+
+
+def fit_stream_frame(vision_frame : VisionFrame, video_resolution : str) -> VisionFrame:
+	video_width, video_height = unpack_resolution(video_resolution)
+	height, width = vision_frame.shape[:2]
 
-			for future_done in as_completed(futures):
-				future_done.result()
+	if width != video_width or height != video_height:
+		return cv2.resize(vision_frame, (video_width, video_height), interpolation = cv2.INTER_AREA)
+	return vision_frame
 
 
 def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
@@ -1,30 +1,32 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 import facefusion.choices
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
-from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, video_manager, wording
-from facefusion.common_helper import create_int_metavar
+from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, state_manager, video_manager, wording
+from facefusion.common_helper import create_int_metavar, get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
-from facefusion.face_analyser import get_many_faces, get_one_face
+from facefusion.face_analyser import get_many_faces
 from facefusion.face_helper import merge_matrix, paste_back, scale_face_landmark_5, warp_face_by_face_landmark_5
-from facefusion.face_masker import create_box_mask, create_occlusion_mask
-from facefusion.face_selector import find_similar_faces, sort_and_filter_faces
+from facefusion.face_masker import create_box_mask, create_face_occlusion_masks
+from facefusion.face_selector import select_faces
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.metrics import measure
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.types import AgeModifierDirection, AgeModifierInputs
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import thread_semaphore
-from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import match_frame_color, read_image, read_static_image, write_image
+from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.vision import match_frame_color, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -70,6 +72,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('age_modifier_model') ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('age_modifier_model') ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -127,7 +136,7 @@ def post_process() -> None:
 		face_recognizer.clear_inference_pool()
 
 
-def modify_age(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+def modify_age(target_face : Face, occlusion_mask : Optional[Mask], temp_vision_frame : VisionFrame) -> VisionFrame:
 	model_templates = get_model_options().get('templates')
 	model_sizes = get_model_options().get('sizes')
 	face_landmark_5 = target_face.landmark_set.get('5/68').copy()
@@ -141,8 +150,7 @@ def modify_age(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 		box_mask
 	]
 
-	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(crop_vision_frame)
+	if occlusion_mask is not None:
 		combined_matrix = merge_matrix([ extend_affine_matrix, cv2.invertAffineTransform(affine_matrix) ])
 		occlusion_mask = cv2.warpAffine(occlusion_mask, combined_matrix, model_sizes.get('target_with_background'))
 		crop_masks.append(occlusion_mask)
@@ -160,8 +168,9 @@ def modify_age(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 	return paste_vision_frame
 
 
+@measure
 def forward(crop_vision_frame : VisionFrame, extend_vision_frame : VisionFrame, age_modifier_direction : AgeModifierDirection) -> VisionFrame:
-	age_modifier = get_inference_pool().get('age_modifier')
+	age_modifier = get_inference_session('age_modifier')
 	age_modifier_inputs = {}
 
 	if has_execution_provider('coreml'):
@@ -200,43 +209,34 @@ def normalize_extend_frame(extend_vision_frame : VisionFrame) -> VisionFrame:
 
 
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
-	return modify_age(target_face, temp_vision_frame)
+	occlusion_mask = get_first(create_face_occlusion_masks(temp_vision_frame, [ target_face ], get_model_options().get('templates').get('target'), get_model_options().get('sizes').get('target')))
+	return modify_age(target_face, occlusion_mask, temp_vision_frame)
 
 
+@measure
 def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
-
-	if state_manager.get_item('face_selector_mode') == 'many':
-		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = modify_age(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'one':
-		target_face = get_one_face(many_faces)
-		if target_face:
-			target_vision_frame = modify_age(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
-		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = modify_age(similar_face, target_vision_frame)
+	target_frame_number = inputs.get('target_frame_number')
+	target_faces = select_faces(get_many_faces([ target_vision_frame ], [ target_frame_number ]), reference_faces)
+	occlusion_masks = create_face_occlusion_masks(target_vision_frame, target_faces, get_model_options().get('templates').get('target'), get_model_options().get('sizes').get('target'))
+
+	for target_face, occlusion_mask in zip(target_faces, occlusion_masks):
+		target_vision_frame = modify_age(target_face, occlusion_mask, target_vision_frame)
 	return target_vision_frame
 
 
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.manage_temp_frames(queue_payloads):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
-			'target_vision_frame': target_vision_frame
+			'target_vision_frame': target_vision_frame,
+			'target_frame_number': queue_payload.get('frame_number')
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(queue_payload.get('frame_path'), output_vision_frame, update_progress)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
@@ -245,7 +245,8 @@ def process_image(source_path : str, target_path : str, output_path : str) -> No
 	output_vision_frame = process_frame(
 	{
 		'reference_faces': reference_faces,
-		'target_vision_frame': target_vision_frame
+		'target_vision_frame': target_vision_frame,
+		'target_frame_number': None
 	})
 	write_image(output_path, output_vision_frame)
 
@@ -1,29 +1,31 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy
 from cv2.typing import Size
+from onnxruntime import InferenceSession
 
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
-from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, video_manager, wording
-from facefusion.common_helper import create_int_metavar
+from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, state_manager, video_manager, wording
+from facefusion.common_helper import create_int_metavar, get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url_by_provider
-from facefusion.face_analyser import get_many_faces, get_one_face
+from facefusion.face_analyser import get_many_faces
 from facefusion.face_helper import paste_back, warp_face_by_face_landmark_5
-from facefusion.face_masker import create_area_mask, create_box_mask, create_occlusion_mask, create_region_mask
-from facefusion.face_selector import find_similar_faces, sort_and_filter_faces
+from facefusion.face_masker import create_area_mask, create_box_mask, create_face_occlusion_masks, create_region_mask
+from facefusion.face_selector import select_faces
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import get_file_name, in_directory, is_image, is_video, resolve_file_paths, resolve_relative_path, same_file_extension
+from facefusion.metrics import measure
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.types import DeepSwapperInputs, DeepSwapperMorph
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import thread_semaphore
 from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import conditional_match_frame_color, read_image, read_static_image, write_image
+from facefusion.vision import conditional_match_frame_color, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -254,6 +256,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('deep_swapper_model') ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('deep_swapper_model') ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -265,7 +274,7 @@ def get_model_options() -> ModelOptions:
 
 
 def get_model_size() -> Size:
-	deep_swapper = get_inference_pool().get('deep_swapper')
+	deep_swapper = get_inference_session('deep_swapper')
 
 	for deep_swapper_input in deep_swapper.get_inputs():
 		if deep_swapper_input.name == 'in_face:0':
@@ -323,7 +332,7 @@ def post_process() -> None:
 		face_recognizer.clear_inference_pool()
 
 
-def swap_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+def swap_face(target_face : Face, occlusion_mask : Optional[Mask], temp_vision_frame : VisionFrame) -> VisionFrame:
 	model_template = get_model_options().get('template')
 	model_size = get_model_size()
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, model_size)
@@ -334,8 +343,7 @@ def swap_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFram
 		box_mask
 	]
 
-	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(crop_vision_frame)
+	if occlusion_mask is not None:
 		crop_masks.append(occlusion_mask)
 
 	crop_vision_frame = prepare_crop_frame(crop_vision_frame)
@@ -359,8 +367,9 @@ def swap_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFram
 	return paste_vision_frame
 
 
+@measure
 def forward(crop_vision_frame : VisionFrame, deep_swapper_morph : DeepSwapperMorph) -> Tuple[VisionFrame, Mask, Mask]:
-	deep_swapper = get_inference_pool().get('deep_swapper')
+	deep_swapper = get_inference_session('deep_swapper')
 	deep_swapper_inputs = {}
 
 	for deep_swapper_input in deep_swapper.get_inputs():
@@ -376,7 +385,7 @@ def forward(crop_vision_frame : VisionFrame, deep_swapper_morph : DeepSwapperMor
 
 
 def has_morph_input() -> bool:
-	deep_swapper = get_inference_pool().get('deep_swapper')
+	deep_swapper = get_inference_session('deep_swapper')
 
 	for deep_swapper_input in deep_swapper.get_inputs():
 		if deep_swapper_input.name == 'morph_value:0':
@@ -410,43 +419,34 @@ def prepare_crop_mask(crop_source_mask : Mask, crop_target_mask : Mask) -> Mask:
 
 
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
-	return swap_face(target_face, temp_vision_frame)
+	occlusion_mask = get_first(create_face_occlusion_masks(temp_vision_frame, [ target_face ], get_model_options().get('template'), get_model_size()))
+	return swap_face(target_face, occlusion_mask, temp_vision_frame)
 
 
+@measure
 def process_frame(inputs : DeepSwapperInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
-
-	if state_manager.get_item('face_selector_mode') == 'many':
-		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = swap_face(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'one':
-		target_face = get_one_face(many_faces)
-		if target_face:
-			target_vision_frame = swap_face(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
-		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = swap_face(similar_face, target_vision_frame)
+	target_frame_number = inputs.get('target_frame_number')
+	target_faces = select_faces(get_many_faces([ target_vision_frame ], [ target_frame_number ]), reference_faces)
+	occlusion_masks = create_face_occlusion_masks(target_vision_frame, target_faces, get_model_options().get('template'), get_model_size())
+
+	for target_face, occlusion_mask in zip(target_faces, occlusion_masks):
+		target_vision_frame = swap_face(target_face, occlusion_mask, target_vision_frame)
 	return target_vision_frame
 
 
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.manage_temp_frames(queue_payloads):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
-			'target_vision_frame': target_vision_frame
+			'target_vision_frame': target_vision_frame,
+			'target_frame_number': queue_payload.get('frame_number')
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(queue_payload.get('frame_path'), output_vision_frame, update_progress)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
@@ -455,7 +455,8 @@ def process_image(source_path : str, target_path : str, output_path : str) -> No
 	output_vision_frame = process_frame(
 	{
 		'reference_faces': reference_faces,
-		'target_vision_frame': target_vision_frame
+		'target_vision_frame': target_vision_frame,
+		'target_frame_number': None
 	})
 	write_image(output_path, output_vision_frame)
 
@@ -1,29 +1,31 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
-from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, video_manager, wording
+from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, state_manager, video_manager, wording
 from facefusion.common_helper import create_int_metavar
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
-from facefusion.face_analyser import get_many_faces, get_one_face
+from facefusion.face_analyser import get_many_faces
 from facefusion.face_helper import paste_back, warp_face_by_face_landmark_5
-from facefusion.face_masker import create_box_mask, create_occlusion_mask
-from facefusion.face_selector import find_similar_faces, sort_and_filter_faces
+from facefusion.face_masker import create_box_mask, create_face_occlusion_masks
+from facefusion.face_selector import select_faces
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.metrics import measure
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.live_portrait import create_rotation, limit_expression
 from facefusion.processors.types import ExpressionRestorerInputs, LivePortraitExpression, LivePortraitFeatureVolume, LivePortraitMotionPoints, LivePortraitPitch, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitYaw
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import conditional_thread_semaphore, thread_semaphore
-from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, read_video_frame, write_image
+from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, Mask, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.vision import read_static_image, read_video_frame, write_image
 
 
 @lru_cache(maxsize = None)
@@ -81,6 +83,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('expression_restorer_model') ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('expression_restorer_model') ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -141,7 +150,7 @@ def post_process() -> None:
 		face_recognizer.clear_inference_pool()
 
 
-def restore_expression(source_vision_frame : VisionFrame, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+def restore_expression(source_vision_frame : VisionFrame, target_face : Face, occlusion_mask : Optional[Mask], temp_vision_frame : VisionFrame) -> VisionFrame:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	expression_restorer_factor = float(numpy.interp(float(state_manager.get_item('expression_restorer_factor')), [ 0, 100 ], [ 0, 1.2 ]))
@@ -154,8 +163,7 @@ def restore_expression(source_vision_frame : VisionFrame, target_face : Face, te
 		box_mask
 	]
 
-	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(target_crop_vision_frame)
+	if occlusion_mask is not None:
 		crop_masks.append(occlusion_mask)
 
 	source_crop_vision_frame = prepare_crop_frame(source_crop_vision_frame)
@@ -181,8 +189,9 @@ def apply_restore(source_crop_vision_frame : VisionFrame, target_crop_vision_fra
 	return crop_vision_frame
 
 
+@measure
 def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeatureVolume:
-	feature_extractor = get_inference_pool().get('feature_extractor')
+	feature_extractor = get_inference_session('feature_extractor')
 
 	with conditional_thread_semaphore():
 		feature_volume = feature_extractor.run(None,
@@ -193,8 +202,9 @@ def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeat
 	return feature_volume
 
 
+@measure
 def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortraitPitch, LivePortraitYaw, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitExpression, LivePortraitMotionPoints]:
-	motion_extractor = get_inference_pool().get('motion_extractor')
+	motion_extractor = get_inference_session('motion_extractor')
 
 	with conditional_thread_semaphore():
 		pitch, yaw, roll, scale, translation, expression, motion_points = motion_extractor.run(None,
@@ -205,8 +215,9 @@ def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortrai
 	return pitch, yaw, roll, scale, translation, expression, motion_points
 
 
+@measure
 def forward_generate_frame(feature_volume : LivePortraitFeatureVolume, source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> VisionFrame:
-	generator = get_inference_pool().get('generator')
+	generator = get_inference_session('generator')
 
 	with thread_semaphore():
 		crop_vision_frame = generator.run(None,
@@ -239,46 +250,36 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 	pass
 
 
+@measure
 def process_frame(inputs : ExpressionRestorerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	source_vision_frame = inputs.get('source_vision_frame')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
-
-	if state_manager.get_item('face_selector_mode') == 'many':
-		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = restore_expression(source_vision_frame, target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'one':
-		target_face = get_one_face(many_faces)
-		if target_face:
-			target_vision_frame = restore_expression(source_vision_frame, target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
-		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = restore_expression(source_vision_frame, similar_face, target_vision_frame)
+	target_frame_number = inputs.get('target_frame_number')
+	target_faces = select_faces(get_many_faces([ target_vision_frame ], [ target_frame_number ]), reference_faces)
+	occlusion_masks = create_face_occlusion_masks(target_vision_frame, target_faces, get_model_options().get('template'), get_model_options().get('size'))
+
+	for target_face, occlusion_mask in zip(target_faces, occlusion_masks):
+		target_vision_frame = restore_expression(source_vision_frame, target_face, occlusion_mask, target_vision_frame)
 	return target_vision_frame
 
 
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
+	for queue_payload, target_vision_frame in processors.manage_temp_frames(queue_payloads):
 		frame_number = queue_payload.get('frame_number')
 		if state_manager.get_item('trim_frame_start'):
 			frame_number += state_manager.get_item('trim_frame_start')
 		source_vision_frame = read_video_frame(state_manager.get_item('target_path'), frame_number)
-		target_vision_path = queue_payload.get('frame_path')
-		target_vision_frame = read_image(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'source_vision_frame': source_vision_frame,
-			'target_vision_frame': target_vision_frame
+			'target_vision_frame': target_vision_frame,
+			'target_frame_number': queue_payload.get('frame_number')
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(queue_payload.get('frame_path'), output_vision_frame, update_progress)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
@@ -289,7 +290,8 @@ def process_image(source_path : str, target_path : str, output_path : str) -> No
 	{
 		'reference_faces': reference_faces,
 		'source_vision_frame': source_vision_frame,
-		'target_vision_frame': target_vision_frame
+		'target_vision_frame': target_vision_frame,
+		'target_frame_number': None
 	})
 	write_image(output_path, output_vision_frame)
 
@@ -1,5 +1,5 @@
 from argparse import ArgumentParser
-from typing import List
+from typing import List, Optional, Sequence
 
 import cv2
 import numpy
@@ -7,18 +7,19 @@ import numpy
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
-from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, process_manager, state_manager, video_manager, wording
-from facefusion.face_analyser import get_many_faces, get_one_face
+from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, state_manager, video_manager, wording
+from facefusion.face_analyser import get_many_faces
 from facefusion.face_helper import warp_face_by_face_landmark_5
-from facefusion.face_masker import create_area_mask, create_box_mask, create_occlusion_mask, create_region_mask
-from facefusion.face_selector import find_similar_faces, sort_and_filter_faces
+from facefusion.face_masker import create_area_mask, create_box_mask, create_face_occlusion_masks, create_face_region_masks
+from facefusion.face_selector import select_faces
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import in_directory, same_file_extension
+from facefusion.metrics import measure
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.types import FaceDebuggerInputs
 from facefusion.program_helper import find_argument_group
-from facefusion.types import ApplyStateItem, Args, Face, InferencePool, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, write_image
+from facefusion.types import ApplyStateItem, Args, Face, InferencePool, Mask, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.vision import read_static_image, write_image
 
 
 def get_inference_pool() -> InferencePool:
@@ -66,7 +67,7 @@ def post_process() -> None:
 		face_recognizer.clear_inference_pool()
 
 
-def debug_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+def debug_face(target_face : Face, occlusion_mask : Optional[Mask], region_mask : Optional[Mask], temp_vision_frame : VisionFrame) -> VisionFrame:
 	primary_color = (0, 0, 255)
 	primary_light_color = (100, 100, 255)
 	secondary_color = (0, 255, 0)
@@ -100,8 +101,7 @@ def debug_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 			box_mask = create_box_mask(crop_vision_frame, 0, state_manager.get_item('face_mask_padding'))
 			crop_masks.append(box_mask)
 
-		if 'occlusion' in state_manager.get_item('face_mask_types'):
-			occlusion_mask = create_occlusion_mask(crop_vision_frame)
+		if occlusion_mask is not None:
 			crop_masks.append(occlusion_mask)
 
 		if 'area' in state_manager.get_item('face_mask_types'):
@@ -109,8 +109,7 @@ def debug_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 			area_mask = create_area_mask(crop_vision_frame, face_landmark_68, state_manager.get_item('face_mask_areas'))
 			crop_masks.append(area_mask)
 
-		if 'region' in state_manager.get_item('face_mask_types'):
-			region_mask = create_region_mask(crop_vision_frame, state_manager.get_item('face_mask_regions'))
+		if region_mask is not None:
 			crop_masks.append(region_mask)
 
 		crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
@@ -177,40 +176,35 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 	pass
 
 
+@measure
 def process_frame(inputs : FaceDebuggerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
-
-	if state_manager.get_item('face_selector_mode') == 'many':
-		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = debug_face(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'one':
-		target_face = get_one_face(many_faces)
-		if target_face:
-			target_vision_frame = debug_face(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
-		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = debug_face(similar_face, target_vision_frame)
+	target_frame_number = inputs.get('target_frame_number')
+	target_faces = select_faces(get_many_faces([ target_vision_frame ], [ target_frame_number ]), reference_faces)
+	occlusion_masks : Sequence[Optional[Mask]] = [ None ] * len(target_faces)
+	region_masks : Sequence[Optional[Mask]] = [ None ] * len(target_faces)
+
+	if 'face-mask' in state_manager.get_item('face_debugger_items'):
+		occlusion_masks = create_face_occlusion_masks(target_vision_frame, target_faces, 'arcface_128', (512, 512))
+		region_masks = create_face_region_masks(target_vision_frame, target_faces, 'arcface_128', (512, 512), state_manager.get_item('face_mask_regions'))
+
+	for target_face, occlusion_mask, region_mask in zip(target_faces, occlusion_masks, region_masks):
+		target_vision_frame = debug_face(target_face, occlusion_mask, region_mask, target_vision_frame)
 	return target_vision_frame
 
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.manage_temp_frames(queue_payloads):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
-			'target_vision_frame': target_vision_frame
+			'target_vision_frame': target_vision_frame,
+			'target_frame_number': queue_payload.get('frame_number')
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(queue_payload.get('frame_path'), output_vision_frame, update_progress)
 
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
@@ -219,7 +213,8 @@ def process_image(source_paths : List[str], target_path : str, output_path : str
 	output_vision_frame = process_frame(
 	{
 		'reference_faces': reference_faces,
-		'target_vision_frame': target_vision_frame
+		'target_vision_frame': target_vision_frame,
+		'target_frame_number': None
 	})
 	write_image(output_path, output_vision_frame)
 
@@ -1,29 +1,31 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
-from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, video_manager, wording
+from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, state_manager, video_manager, wording
 from facefusion.common_helper import create_float_metavar
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
-from facefusion.face_analyser import get_many_faces, get_one_face
+from facefusion.face_analyser import get_many_faces
 from facefusion.face_helper import paste_back, scale_face_landmark_5, warp_face_by_face_landmark_5
 from facefusion.face_masker import create_box_mask
-from facefusion.face_selector import find_similar_faces, sort_and_filter_faces
+from facefusion.face_selector import select_faces
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.metrics import measure
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.live_portrait import create_rotation, limit_euler_angles, limit_expression
 from facefusion.processors.types import FaceEditorInputs, LivePortraitExpression, LivePortraitFeatureVolume, LivePortraitMotionPoints, LivePortraitPitch, LivePortraitRoll, LivePortraitRotation, LivePortraitScale, LivePortraitTranslation, LivePortraitYaw
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import conditional_thread_semaphore, thread_semaphore
 from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, FaceLandmark68, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, write_image
+from facefusion.vision import read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -111,6 +113,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('face_editor_model') ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('face_editor_model') ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -232,8 +241,9 @@ def apply_edit(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLandmark6
 	return crop_vision_frame
 
 
+@measure
 def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeatureVolume:
-	feature_extractor = get_inference_pool().get('feature_extractor')
+	feature_extractor = get_inference_session('feature_extractor')
 
 	with conditional_thread_semaphore():
 		feature_volume = feature_extractor.run(None,
@@ -244,8 +254,9 @@ def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeat
 	return feature_volume
 
 
+@measure
 def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortraitPitch, LivePortraitYaw, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitExpression, LivePortraitMotionPoints]:
-	motion_extractor = get_inference_pool().get('motion_extractor')
+	motion_extractor = get_inference_session('motion_extractor')
 
 	with conditional_thread_semaphore():
 		pitch, yaw, roll, scale, translation, expression, motion_points = motion_extractor.run(None,
@@ -256,8 +267,9 @@ def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortrai
 	return pitch, yaw, roll, scale, translation, expression, motion_points
 
 
+@measure
 def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
-	eye_retargeter = get_inference_pool().get('eye_retargeter')
+	eye_retargeter = get_inference_session('eye_retargeter')
 
 	with conditional_thread_semaphore():
 		eye_motion_points = eye_retargeter.run(None,
@@ -268,8 +280,9 @@ def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePo
 	return eye_motion_points
 
 
+@measure
 def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
-	lip_retargeter = get_inference_pool().get('lip_retargeter')
+	lip_retargeter = get_inference_session('lip_retargeter')
 
 	with conditional_thread_semaphore():
 		lip_motion_points = lip_retargeter.run(None,
@@ -280,8 +293,9 @@ def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePo
 	return lip_motion_points
 
 
+@measure
 def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
-	stitcher = get_inference_pool().get('stitcher')
+	stitcher = get_inference_session('stitcher')
 
 	with thread_semaphore():
 		motion_points = stitcher.run(None,
@@ -293,8 +307,9 @@ def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints
 	return motion_points
 
 
+@measure
 def forward_generate_frame(feature_volume : LivePortraitFeatureVolume, source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> VisionFrame:
-	generator = get_inference_pool().get('generator')
+	generator = get_inference_session('generator')
 
 	with thread_semaphore():
 		crop_vision_frame = generator.run(None,
@@ -482,40 +497,28 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 	pass
 
 
+@measure
 def process_frame(inputs : FaceEditorInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
-
-	if state_manager.get_item('face_selector_mode') == 'many':
-		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = edit_face(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'one':
-		target_face = get_one_face(many_faces)
-		if target_face:
-			target_vision_frame = edit_face(target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
-		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = edit_face(similar_face, target_vision_frame)
+	target_frame_number = inputs.get('target_frame_number')
+
+	for target_face in select_faces(get_many_faces([ target_vision_frame ], [ target_frame_number ]), reference_faces):
+		target_vision_frame = edit_face(target_face, target_vision_frame)
 	return target_vision_frame
 
 
 def process_frames(source_path : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	for queue_payload, target_vision_frame in processors.manage_temp_frames(queue_payloads):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
-			'target_vision_frame': target_vision_frame
+			'target_vision_frame': target_vision_frame,
+			'target_frame_number': queue_payload.get('frame_number')
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(queue_payload.get('frame_path'), output_vision_frame, update_progress)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
@@ -524,7 +527,8 @@ def process_image(source_path : str, target_path : str, output_path : str) -> No
 	output_vision_frame = process_frame(
 	{
 		'reference_faces': reference_faces,
-		'target_vision_frame': target_vision_frame
+		'target_vision_frame': target_vision_frame,
+		'target_frame_number': None
 	})
 	write_image(output_path, output_vision_frame)
 
@@ -1,32 +1,37 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List, Tuple
+from typing import Any, List, Optional, Tuple
 
 import cv2
 import numpy
+from numpy.typing import NDArray
+from onnxruntime import InferenceSession
 
 import facefusion.choices
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
-from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, video_manager, wording
+from facefusion import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, state_manager, video_manager, wording
 from facefusion.common_helper import get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
-from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
-from facefusion.face_helper import paste_back, warp_face_by_face_landmark_5
-from facefusion.face_masker import create_area_mask, create_box_mask, create_occlusion_mask, create_region_mask
-from facefusion.face_selector import find_similar_faces, sort_and_filter_faces, sort_faces_by_order
+from facefusion.face_analyser import get_many_faces, get_many_image_faces, get_one_face
+from facefusion.face_helper import paste_back_many, warp_face_by_face_landmark_5
+from facefusion.face_masker import create_area_mask, create_box_mask, create_occlusion_masks, create_region_masks
+from facefusion.face_selector import select_faces
 from facefusion.face_store import get_reference_faces
 from facefusion.filesystem import filter_image_paths, has_image, in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.metrics import measure
 from facefusion.model_helper import get_static_model_initializer
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.pixel_boost import explode_pixel_boost, implode_pixel_boost
-from facefusion.processors.types import FaceSwapperInputs
+from facefusion.processors.types import FaceSwapperInputs, FaceSwapperSource, FaceSwapperSourceContext
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import conditional_thread_semaphore
-from facefusion.types import ApplyStateItem, Args, DownloadScope, Embedding, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, read_static_images, unpack_resolution, write_image
+from facefusion.types import ApplyStateItem, Args, DownloadScope, Embedding, Face, InferencePool, ModelOptions, ModelSet, PasteContext, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from facefusion.vision import read_static_image, unpack_resolution, write_image
+
+SOURCE_CONTEXT : Optional[FaceSwapperSourceContext] = None
 
 
 @lru_cache(maxsize = None)
@@ -415,11 +420,26 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ get_model_name() ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ get_model_name() ]
 	inference_manager.clear_inference_pool(__name__, model_names)
 
 
+@lru_cache(maxsize = None)
+def create_static_model_normalizer(model_name : str) -> Tuple[NDArray[Any], NDArray[Any]]:
+	model_options = create_static_model_set('full').get(model_name)
+	model_mean = numpy.array(model_options.get('mean')).astype(numpy.float32)
+	model_standard_deviation = numpy.array(model_options.get('standard_deviation')).astype(numpy.float32)
+	return model_mean, model_standard_deviation
+
+
 def get_model_options() -> ModelOptions:
 	model_name = get_model_name()
 	return create_static_model_set('full').get(model_name)
@@ -460,8 +480,7 @@ def pre_process(mode : ProcessMode) -> bool:
 		logger.error(wording.get('choose_image_source') + wording.get('exclamation_mark'), __name__)
 		return False
 	source_image_paths = filter_image_paths(state_manager.get_item('source_paths'))
-	source_frames = read_static_images(source_image_paths)
-	source_faces = get_many_faces(source_frames)
+	source_faces = get_many_image_faces(source_image_paths)
 	if not get_one_face(source_faces):
 		logger.error(wording.get('no_source_face_detected') + wording.get('exclamation_mark'), __name__)
 		return False
@@ -474,10 +493,12 @@ def pre_process(mode : ProcessMode) -> bool:
 	if mode == 'output' and not same_file_extension(state_manager.get_item('target_path'), state_manager.get_item('output_path')):
 		logger.error(wording.get('match_target_and_output_extension') + wording.get('exclamation_mark'), __name__)
 		return False
+	set_source_context(create_source_context(state_manager.get_item('source_paths')))
 	return True
 
 
 def post_process() -> None:
+	clear_source_context()
 	read_static_image.cache_clear()
 	video_manager.clear_video_pool()
 	if state_manager.get_item('video_memory_strategy') in [ 'strict', 'moderate' ]:
@@ -492,70 +513,162 @@ def post_process() -> None:
 		face_recognizer.clear_inference_pool()
 
 
+def create_source_context(source_paths : List[str]) -> Optional[FaceSwapperSourceContext]:
+	source_face = processors.extract_source_face(source_paths)
+
+	if source_face:
+		return\
+		{
+			'model_name': get_model_name(),
+			'source_paths': source_paths,
+			'source_face': source_face,
+			'face_swapper_source': prepare_face_swapper_source(source_face)
+		}
+	return None
+
+
+def get_source_context() -> Optional[FaceSwapperSourceContext]:
+	return SOURCE_CONTEXT
+
+
+def set_source_context(source_context : Optional[FaceSwapperSourceContext]) -> None:
+	global SOURCE_CONTEXT
+
+	SOURCE_CONTEXT = source_context
+
+
+def clear_source_context() -> None:
+	set_source_context(None)
+
+
+def resolve_source_face(source_paths : List[str]) -> Optional[Face]:
+	source_context = get_source_context()
+
+	if source_context and source_context.get('source_paths') == source_paths:
+		return source_context.get('source_face')
+	return processors.extract_source_face(source_paths)
+
+
+def resolve_face_swapper_source(source_face : Face) -> FaceSwapperSource:
+	source_context = get_source_context()
+
+	if source_context and source_context.get('model_name') == get_model_name() and numpy.array_equal(source_context.get('source_face').embedding, source_face.embedding):
+		return source_context.get('face_swapper_source')
+	return prepare_face_swapper_source(source_face)
+
+
+def prepare_face_swapper_source(source_face : Face) -> FaceSwapperSource:
+	model_type = get_model_options().get('type')
+
+	if model_type in [ 'blendswap', 'uniface' ]:
+		return prepare_source_frame(source_face)
+	return prepare_source_embedding(source_face)
+
+
 def swap_face(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	return get_first(swap_vision_frames(source_face, [ [ target_face ] ], [ temp_vision_frame ]))
+
+
+def swap_vision_frames(source_face : Face, batch_target_faces : List[List[Face]], temp_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	pixel_boost_size = unpack_resolution(state_manager.get_item('face_swapper_pixel_boost'))
 	pixel_boost_total = pixel_boost_size[0] // model_size[0]
-	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, pixel_boost_size)
-	temp_vision_frames = []
-	crop_masks = []
+	temp_vision_frames = list(temp_vision_frames)
+	crop_contexts = []
+	paste_contexts : List[List[PasteContext]] = [ [] for _ in temp_vision_frames ]
+	pixel_boost_vision_frames = []
+	crop_vision_frames = []
+
+	for frame_index, target_faces in enumerate(batch_target_faces):
+		for target_face in target_faces:
+			crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frames[frame_index], target_face.landmark_set.get('5/68'), model_template, pixel_boost_size)
+			crop_masks = []
+
+			if 'box' in state_manager.get_item('face_mask_types'):
+				box_mask = create_box_mask(crop_vision_frame, state_manager.get_item('face_mask_blur'), state_manager.get_item('face_mask_padding'))
+				crop_masks.append(box_mask)
 
-	if 'box' in state_manager.get_item('face_mask_types'):
-		box_mask = create_box_mask(crop_vision_frame, state_manager.get_item('face_mask_blur'), state_manager.get_item('face_mask_padding'))
-		crop_masks.append(box_mask)
+			for pixel_boost_vision_frame in implode_pixel_boost(crop_vision_frame, pixel_boost_total, model_size):
+				pixel_boost_vision_frames.append(prepare_crop_frame(pixel_boost_vision_frame))
+			crop_vision_frames.append(crop_vision_frame)
+			crop_contexts.append((frame_index, target_face, affine_matrix, crop_masks))
+
+	if not crop_contexts:
+		return temp_vision_frames
 
 	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(crop_vision_frame)
-		crop_masks.append(occlusion_mask)
-
-	pixel_boost_vision_frames = implode_pixel_boost(crop_vision_frame, pixel_boost_total, model_size)
-	for pixel_boost_vision_frame in pixel_boost_vision_frames:
-		pixel_boost_vision_frame = prepare_crop_frame(pixel_boost_vision_frame)
-		pixel_boost_vision_frame = forward_swap_face(source_face, pixel_boost_vision_frame)
-		pixel_boost_vision_frame = normalize_crop_frame(pixel_boost_vision_frame)
-		temp_vision_frames.append(pixel_boost_vision_frame)
-	crop_vision_frame = explode_pixel_boost(temp_vision_frames, pixel_boost_total, model_size, pixel_boost_size)
-
-	if 'area' in state_manager.get_item('face_mask_types'):
-		face_landmark_68 = cv2.transform(target_face.landmark_set.get('68').reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
-		area_mask = create_area_mask(crop_vision_frame, face_landmark_68, state_manager.get_item('face_mask_areas'))
-		crop_masks.append(area_mask)
+		for (_, _, _, crop_masks), occlusion_mask in zip(crop_contexts, create_occlusion_masks(crop_vision_frames)):
+			crop_masks.append(occlusion_mask)
+
+	output_vision_frames = forward_swap_face(source_face, numpy.concatenate(pixel_boost_vision_frames))
+
+	for crop_index in range(len(crop_contexts)):
+		pixel_boost_start = crop_index * pixel_boost_total ** 2
+		pixel_boost_end = pixel_boost_start + pixel_boost_total ** 2
+		temp_crop_frames = [ normalize_crop_frame(pixel_boost_vision_frame) for pixel_boost_vision_frame in output_vision_frames[pixel_boost_start:pixel_boost_end] ]
+		crop_vision_frames[crop_index] = explode_pixel_boost(temp_crop_frames, pixel_boost_total, model_size, pixel_boost_size)
 
 	if 'region' in state_manager.get_item('face_mask_types'):
-		region_mask = create_region_mask(crop_vision_frame, state_manager.get_item('face_mask_regions'))
-		crop_masks.append(region_mask)
+		for (_, _, _, crop_masks), region_mask in zip(crop_contexts, create_region_masks(crop_vision_frames, state_manager.get_item('face_mask_regions'))):
+			crop_masks.append(region_mask)
 
-	crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
-	temp_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
-	return temp_vision_frame
+	for (frame_index, target_face, affine_matrix, crop_masks), crop_vision_frame in zip(crop_contexts, crop_vision_frames):
+		if 'area' in state_manager.get_item('face_mask_types'):
+			face_landmark_68 = cv2.transform(target_face.landmark_set.get('68').reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
+			area_mask = create_area_mask(crop_vision_frame, face_landmark_68, state_manager.get_item('face_mask_areas'))
+			crop_masks.append(area_mask)
 
+		crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
+		paste_contexts[frame_index].append((crop_vision_frame, crop_mask, affine_matrix))
 
-def forward_swap_face(source_face : Face, crop_vision_frame : VisionFrame) -> VisionFrame:
-	face_swapper = get_inference_pool().get('face_swapper')
+	for frame_index, frame_paste_contexts in enumerate(paste_contexts):
+		if frame_paste_contexts:
+			temp_vision_frames[frame_index] = paste_back_many(temp_vision_frames[frame_index], frame_paste_contexts)
+	return temp_vision_frames
+
+
+@measure
+def forward_swap_face(source_face : Face, crop_vision_frames : VisionFrame) -> VisionFrame:
+	face_swapper = get_inference_session('face_swapper')
 	model_type = get_model_options().get('type')
-	face_swapper_inputs = {}
+	face_swapper_batch_size = resolve_batch_size(face_swapper, len(crop_vision_frames))
+	output_vision_frames = []
 
 	if has_execution_provider('coreml') and model_type in [ 'ghost', 'uniface' ]:
 		face_swapper.set_providers([ facefusion.choices.execution_provider_set.get('cpu') ])
 
+	face_swapper_source = resolve_face_swapper_source(source_face)
+
+	for batch_index in range(0, len(crop_vision_frames), face_swapper_batch_size):
+		crop_vision_batch = crop_vision_frames[batch_index:batch_index + face_swapper_batch_size]
+		face_swapper_inputs = {}
+
+		for face_swapper_input in face_swapper.get_inputs():
+			if face_swapper_input.name == 'source':
+				face_swapper_inputs[face_swapper_input.name] = numpy.repeat(face_swapper_source, len(crop_vision_batch), axis = 0)
+			if face_swapper_input.name == 'target':
+				face_swapper_inputs[face_swapper_input.name] = crop_vision_batch
+
+		with conditional_thread_semaphore():
+			output_vision_frames.append(face_swapper.run(None, face_swapper_inputs)[0])
+
+	return numpy.concatenate(output_vision_frames)
+
+
+def resolve_batch_size(face_swapper : InferenceSession, crop_total : int) -> int:
 	for face_swapper_input in face_swapper.get_inputs():
-		if face_swapper_input.name == 'source':
-			if model_type in [ 'blendswap', 'uniface' ]:
-				face_swapper_inputs[face_swapper_input.name] = prepare_source_frame(source_face)
-			else:
-				face_swapper_inputs[face_swapper_input.name] = prepare_source_embedding(source_face)
 		if face_swapper_input.name == 'target':
-			face_swapper_inputs[face_swapper_input.name] = crop_vision_frame
-
-	with conditional_thread_semaphore():
-		crop_vision_frame = face_swapper.run(None, face_swapper_inputs)[0][0]
+			batch_size = get_first(face_swapper_input.shape)
 
-	return crop_vision_frame
+			if isinstance(batch_size, int) and batch_size > 0:
+				return batch_size
+	return max(crop_total, 1)
 
 
+@measure
 def forward_convert_embedding(embedding : Embedding) -> Embedding:
-	embedding_converter = get_inference_pool().get('embedding_converter')
+	embedding_converter = get_inference_session('embedding_converter')
 
 	with conditional_thread_semaphore():
 		embedding = embedding_converter.run(None,
@@ -613,20 +726,18 @@ def convert_embedding(source_face : Face) -> Tuple[Embedding, Embedding]:
 
 
 def prepare_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
-	model_mean = get_model_options().get('mean')
-	model_standard_deviation = get_model_options().get('standard_deviation')
+	model_mean, model_standard_deviation = create_static_model_normalizer(get_model_name())
 
-	crop_vision_frame = crop_vision_frame[:, :, ::-1] / 255.0
+	crop_vision_frame = crop_vision_frame[:, :, ::-1].astype(numpy.float32) / 255.0
 	crop_vision_frame = (crop_vision_frame - model_mean) / model_standard_deviation
 	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1)
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0).astype(numpy.float32)
+	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
 	return crop_vision_frame
 
 
 def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
 	model_type = get_model_options().get('type')
-	model_mean = get_model_options().get('mean')
-	model_standard_deviation = get_model_options().get('standard_deviation')
+	model_mean, model_standard_deviation = create_static_model_normalizer(get_model_name())
 
 	crop_vision_frame = crop_vision_frame.transpose(1, 2, 0)
 	if model_type in [ 'ghost', 'hififace', 'hyperswap', 'uniface' ]:
@@ -640,70 +751,44 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 	return swap_face(source_face, target_face, temp_vision_frame)
 
 
+@measure
 def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	source_face = inputs.get('source_face')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
-
-	if state_manager.get_item('face_selector_mode') == 'many':
-		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = swap_face(source_face, target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'one':
-		target_face = get_one_face(many_faces)
-		if target_face:
-			target_vision_frame = swap_face(source_face, target_face, target_vision_frame)
-	if state_manager.get_item('face_selector_mode') == 'reference':
-		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
-		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = swap_face(source_face, similar_face, target_vision_frame)
+	target_frame_number = inputs.get('target_frame_number')
+	target_faces = select_faces(get_many_faces([ target_vision_frame ], [ target_frame_number ]), reference_faces)
+
+	if target_faces:
+		target_vision_frame = get_first(swap_vision_frames(source_face, [ target_faces ], [ target_vision_frame ]))
 	return target_vision_frame
 
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
-	source_frames = read_static_images(source_paths)
-	source_faces = []
-
-	for source_frame in source_frames:
-		temp_faces = get_many_faces([ source_frame ])
-		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
-		if temp_faces:
-			source_faces.append(get_first(temp_faces))
-	source_face = get_average_face(source_faces)
-
-	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+	source_face = resolve_source_face(source_paths)
+
+	for queue_payload, target_vision_frame in processors.manage_temp_frames(queue_payloads):
 		output_vision_frame = process_frame(
 		{
 			'reference_faces': reference_faces,
 			'source_face': source_face,
-			'target_vision_frame': target_vision_frame
+			'target_vision_frame': target_vision_frame,
+			'target_frame_number': queue_payload.get('frame_number')
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(queue_payload.get('frame_path'), output_vision_frame, update_progress)
 
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
-	source_frames = read_static_images(source_paths)
-	source_faces = []
-
-	for source_frame in source_frames:
-		temp_faces = get_many_faces([ source_frame ])
-		temp_faces = sort_faces_by_order(temp_faces, 'large-small')
-		if temp_faces:
-			source_faces.append(get_first(temp_faces))
-	source_face = get_average_face(source_faces)
+	source_face = resolve_source_face(source_paths)
 	target_vision_frame = read_static_image(target_path)
 	output_vision_frame = process_frame(
 	{
 		'reference_faces': reference_faces,
 		'source_face': source_face,
-		'target_vision_frame': target_vision_frame
+		'target_vision_frame': target_vision_frame,
+		'target_frame_number': None
 	})
 	write_image(output_path, output_vision_frame)
 
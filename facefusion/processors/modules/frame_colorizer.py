@@ -1,9 +1,10 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
@@ -13,12 +14,13 @@ from facefusion.common_helper import create_int_metavar
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
 from facefusion.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.metrics import measure
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.types import FrameColorizerInputs
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import thread_semaphore
 from facefusion.types import ApplyStateItem, Args, DownloadScope, ExecutionProvider, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import read_image, read_static_image, unpack_resolution, write_image
+from facefusion.vision import read_static_image, unpack_resolution, write_image
 
 
 @lru_cache(maxsize = None)
@@ -135,6 +137,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ state_manager.get_item('frame_colorizer_model') ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ state_manager.get_item('frame_colorizer_model') ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -203,8 +212,9 @@ def colorize_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 	return color_vision_frame
 
 
+@measure
 def forward(color_vision_frame : VisionFrame) -> VisionFrame:
-	frame_colorizer = get_inference_pool().get('frame_colorizer')
+	frame_colorizer = get_inference_session('frame_colorizer')
 
 	with thread_semaphore():
 		color_vision_frame = frame_colorizer.run(None,
@@ -265,6 +275,7 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 	pass
 
 
+@measure
 def process_frame(inputs : FrameColorizerInputs) -> VisionFrame:
 	target_vision_frame = inputs.get('target_vision_frame')
 	return colorize_frame(target_vision_frame)
@@ -273,13 +284,12 @@ def process_frame(inputs : FrameColorizerInputs) -> VisionFrame:
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	for queue_payload in process_manager.manage(queue_payloads):
 		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_temp_frame(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(target_vision_path, output_vision_frame, update_progress)
 
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
@@ -1,24 +1,26 @@
 from argparse import ArgumentParser
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 import cv2
 import numpy
+from onnxruntime import InferenceSession
 
 import facefusion.jobs.job_manager
 import facefusion.jobs.job_store
 import facefusion.processors.core as processors
 from facefusion import config, content_analyser, inference_manager, logger, process_manager, state_manager, video_manager, wording
-from facefusion.common_helper import create_int_metavar
+from facefusion.common_helper import create_int_metavar, get_first
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.execution import has_execution_provider
 from facefusion.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from facefusion.metrics import measure
 from facefusion.processors import choices as processors_choices
 from facefusion.processors.types import FrameEnhancerInputs
 from facefusion.program_helper import find_argument_group
 from facefusion.thread_helper import conditional_thread_semaphore
 from facefusion.types import ApplyStateItem, Args, DownloadScope, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from facefusion.vision import create_tile_frames, merge_tile_frames, read_image, read_static_image, write_image
+from facefusion.vision import create_tile_frames, merge_tile_frames, read_static_image, write_image
 
 
 @lru_cache(maxsize = None)
@@ -413,6 +415,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ get_frame_enhancer_model() ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ get_frame_enhancer_model() ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -441,12 +450,14 @@ def register_args(program : ArgumentParser) -> None:
 	if group_processors:
 		group_processors.add_argument('--frame-enhancer-model', help = wording.get('help.frame_enhancer_model'), default = config.get_str_value('processors', 'frame_enhancer_model', 'span_kendata_x4'), choices = processors_choices.frame_enhancer_models)
 		group_processors.add_argument('--frame-enhancer-blend', help = wording.get('help.frame_enhancer_blend'), type = int, default = config.get_int_value('processors', 'frame_enhancer_blend', '80'), choices = processors_choices.frame_enhancer_blend_range, metavar = create_int_metavar(processors_choices.frame_enhancer_blend_range))
-		facefusion.jobs.job_store.register_step_keys([ 'frame_enhancer_model', 'frame_enhancer_blend' ])
+		group_processors.add_argument('--frame-enhancer-batch-size', help = wording.get('help.frame_enhancer_batch_size'), type = int, default = config.get_int_value('processors', 'frame_enhancer_batch_size', '4'), choices = processors_choices.frame_enhancer_batch_size_range, metavar = create_int_metavar(processors_choices.frame_enhancer_batch_size_range))
+		facefusion.jobs.job_store.register_step_keys([ 'frame_enhancer_model', 'frame_enhancer_blend', 'frame_enhancer_batch_size' ])
 
 
 def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('frame_enhancer_model', args.get('frame_enhancer_model'))
 	apply_state_item('frame_enhancer_blend', args.get('frame_enhancer_blend'))
+	apply_state_item('frame_enhancer_batch_size', args.get('frame_enhancer_batch_size'))
 
 
 def pre_check() -> bool:
@@ -483,40 +494,51 @@ def enhance_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 	model_scale = get_model_options().get('scale')
 	temp_height, temp_width = temp_vision_frame.shape[:2]
 	tile_vision_frames, pad_width, pad_height = create_tile_frames(temp_vision_frame, model_size)
+	batch_size = resolve_batch_size(len(tile_vision_frames))
 
-	for index, tile_vision_frame in enumerate(tile_vision_frames):
-		tile_vision_frame = prepare_tile_frame(tile_vision_frame)
-		tile_vision_frame = forward(tile_vision_frame)
-		tile_vision_frames[index] = normalize_tile_frame(tile_vision_frame)
+	for index in range(0, len(tile_vision_frames), batch_size):
+		tile_batch_frames = prepare_tile_frames(tile_vision_frames[index:index + batch_size])
+		tile_batch_frames = forward(tile_batch_frames)
+		tile_vision_frames[index:index + batch_size] = normalize_tile_frames(tile_batch_frames)
 
 	merge_vision_frame = merge_tile_frames(tile_vision_frames, temp_width * model_scale, temp_height * model_scale, pad_width * model_scale, pad_height * model_scale, (model_size[0] * model_scale, model_size[1] * model_scale, model_size[2] * model_scale))
 	temp_vision_frame = blend_frame(temp_vision_frame, merge_vision_frame)
 	return temp_vision_frame
 
 
-def forward(tile_vision_frame : VisionFrame) -> VisionFrame:
-	frame_enhancer = get_inference_pool().get('frame_enhancer')
+@measure
+def forward(tile_batch_frames : VisionFrame) -> VisionFrame:
+	frame_enhancer = get_inference_session('frame_enhancer')
 
 	with conditional_thread_semaphore():
-		tile_vision_frame = frame_enhancer.run(None,
+		tile_batch_frames = frame_enhancer.run(None,
 		{
-			'input': tile_vision_frame
+			'input': tile_batch_frames
 		})[0]
 
-	return tile_vision_frame
+	return tile_batch_frames
+
+
+def resolve_batch_size(tile_total : int) -> int:
+	frame_enhancer = get_inference_session('frame_enhancer')
+	batch_size = get_first(frame_enhancer.get_inputs()[0].shape)
+
+	if isinstance(batch_size, int) and batch_size > 0:
+		return batch_size
+	return max(min(state_manager.get_item('frame_enhancer_batch_size'), tile_total), 1)
 
 
-def prepare_tile_frame(vision_tile_frame : VisionFrame) -> VisionFrame:
-	vision_tile_frame = numpy.expand_dims(vision_tile_frame[:, :, ::-1], axis = 0)
-	vision_tile_frame = vision_tile_frame.transpose(0, 3, 1, 2)
-	vision_tile_frame = vision_tile_frame.astype(numpy.float32) / 255.0
-	return vision_tile_frame
+def prepare_tile_frames(tile_vision_frames : List[VisionFrame]) -> VisionFrame:
+	tile_batch_frames = numpy.stack(tile_vision_frames)[:, :, :, ::-1]
+	tile_batch_frames = tile_batch_frames.transpose(0, 3, 1, 2)
+	tile_batch_frames = tile_batch_frames.astype(numpy.float32) / 255.0
+	return tile_batch_frames
 
 
-def normalize_tile_frame(vision_tile_frame : VisionFrame) -> VisionFrame:
-	vision_tile_frame = vision_tile_frame.transpose(0, 2, 3, 1).squeeze(0) * 255
-	vision_tile_frame = vision_tile_frame.clip(0, 255).astype(numpy.uint8)[:, :, ::-1]
-	return vision_tile_frame
+def normalize_tile_frames(tile_batch_frames : VisionFrame) -> List[VisionFrame]:
+	tile_batch_frames = tile_batch_frames.transpose(0, 2, 3, 1) * 255
+	tile_batch_frames = tile_batch_frames.clip(0, 255).astype(numpy.uint8)[:, :, :, ::-1]
+	return list(tile_batch_frames)
 
 
 def blend_frame(temp_vision_frame : VisionFrame, merge_vision_frame : VisionFrame) -> VisionFrame:
@@ -530,6 +552,7 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 	pass
 
 
+@measure
 def process_frame(inputs : FrameEnhancerInputs) -> VisionFrame:
 	target_vision_frame = inputs.get('target_vision_frame')
 	return enhance_frame(target_vision_frame)
@@ -538,13 +561,12 @@ def process_frame(inputs : FrameEnhancerInputs) -> VisionFrame:
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	for queue_payload in process_manager.manage(queue_payloads):
 		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_temp_frame(target_vision_path)
 		output_vision_frame = process_frame(
 		{
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
-		update_progress(1)
+		processors.write_temp_frame(target_vision_path, output_vision_frame, update_progress)
 
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Literal, TypeAlias, TypedDict
+from typing import Any, Dict, List, Literal, Optional, TypeAlias, TypedDict
 
 from numpy.typing import NDArray
 
@@ -20,39 +20,46 @@ FaceSwapperSet : TypeAlias = Dict[FaceSwapperModel, List[str]]
 AgeModifierInputs = TypedDict('AgeModifierInputs',
 {
 	'reference_faces' : FaceSet,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 DeepSwapperInputs = TypedDict('DeepSwapperInputs',
 {
 	'reference_faces' : FaceSet,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 ExpressionRestorerInputs = TypedDict('ExpressionRestorerInputs',
 {
 	'reference_faces' : FaceSet,
 	'source_vision_frame' : VisionFrame,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 FaceDebuggerInputs = TypedDict('FaceDebuggerInputs',
 {
 	'reference_faces' : FaceSet,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 FaceEditorInputs = TypedDict('FaceEditorInputs',
 {
 	'reference_faces' : FaceSet,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 FaceEnhancerInputs = TypedDict('FaceEnhancerInputs',
 {
 	'reference_faces' : FaceSet,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 FaceSwapperInputs = TypedDict('FaceSwapperInputs',
 {
 	'reference_faces' : FaceSet,
 	'source_face' : Face,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 FrameColorizerInputs = TypedDict('FrameColorizerInputs',
 {
@@ -66,7 +73,8 @@ LipSyncerInputs = TypedDict('LipSyncerInputs',
 {
 	'reference_faces' : FaceSet,
 	'source_audio_frame' : AudioFrame,
-	'target_vision_frame' : VisionFrame
+	'target_vision_frame' : VisionFrame,
+	'target_frame_number' : Optional[int]
 })
 
 ProcessorStateKey = Literal\
@@ -103,6 +111,7 @@ ProcessorStateKey = Literal\
 	'frame_colorizer_blend',
 	'frame_enhancer_model',
 	'frame_enhancer_blend',
+	'frame_enhancer_batch_size',
 	'lip_syncer_model',
 	'lip_syncer_weight'
 ]
@@ -140,6 +149,7 @@ ProcessorState = TypedDict('ProcessorState',
 	'frame_colorizer_blend' : int,
 	'frame_enhancer_model' : FrameEnhancerModel,
 	'frame_enhancer_blend' : int,
+	'frame_enhancer_batch_size' : int,
 	'lip_syncer_model' : LipSyncerModel
 })
 ProcessorStateSet : TypeAlias = Dict[AppContext, ProcessorState]
@@ -147,6 +157,7 @@ ProcessorStateSet : TypeAlias = Dict[AppContext, ProcessorState]
 AgeModifierDirection : TypeAlias = NDArray[Any]
 DeepSwapperMorph : TypeAlias = NDArray[Any]
 FaceEnhancerWeight : TypeAlias = NDArray[Any]
+FaceSwapperSource : TypeAlias = NDArray[Any]
 LipSyncerWeight : TypeAlias = NDArray[Any]
 LivePortraitPitch : TypeAlias = float
 LivePortraitYaw : TypeAlias = float
@@ -157,3 +168,11 @@ LivePortraitMotionPoints : TypeAlias = NDArray[Any]
 LivePortraitRotation : TypeAlias = NDArray[Any]
 LivePortraitScale : TypeAlias = NDArray[Any]
 LivePortraitTranslation : TypeAlias = NDArray[Any]
+
+FaceSwapperSourceContext = TypedDict('FaceSwapperSourceContext',
+{
+	'model_name' : str,
+	'source_paths' : List[str],
+	'source_face' : Face,
+	'face_swapper_source' : FaceSwapperSource
+})
@@ -32,7 +32,8 @@ def create_temp_path_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_paths = program.add_argument_group('paths')
 	group_paths.add_argument('--temp-path', help = wording.get('help.temp_path'), default = config.get_str_value('paths', 'temp_path', tempfile.gettempdir()))
-	job_store.register_job_keys([ 'temp_path' ])
+	group_paths.add_argument('--cache-path', help = wording.get('help.cache_path'), default = config.get_str_value('paths', 'cache_path'))
+	job_store.register_job_keys([ 'temp_path', 'cache_path' ])
 	return program
 
 
@@ -101,7 +102,8 @@ def create_face_detector_program() -> ArgumentParser:
 	group_face_detector.add_argument('--face-detector-size', help = wording.get('help.face_detector_size'), default = config.get_str_value('face_detector', 'face_detector_size', get_last(face_detector_size_choices)), choices = face_detector_size_choices)
 	group_face_detector.add_argument('--face-detector-angles', help = wording.get('help.face_detector_angles'), type = int, default = config.get_int_list('face_detector', 'face_detector_angles', '0'), choices = facefusion.choices.face_detector_angles, nargs = '+', metavar = 'FACE_DETECTOR_ANGLES')
 	group_face_detector.add_argument('--face-detector-score', help = wording.get('help.face_detector_score'), type = float, default = config.get_float_value('face_detector', 'face_detector_score', '0.5'), choices = facefusion.choices.face_detector_score_range, metavar = create_float_metavar(facefusion.choices.face_detector_score_range))
-	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_size', 'face_detector_score' ])
+	group_face_detector.add_argument('--face-tracker-interval', help = wording.get('help.face_tracker_interval'), type = int, default = config.get_int_value('face_detector', 'face_tracker_interval', '1'), choices = facefusion.choices.face_tracker_interval_range, metavar = create_int_metavar(facefusion.choices.face_tracker_interval_range))
+	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_size', 'face_detector_score', 'face_tracker_interval' ])
 	return program
 
 
@@ -150,8 +152,9 @@ def create_frame_extraction_program() -> ArgumentParser:
 	group_frame_extraction.add_argument('--trim-frame-start', help = wording.get('help.trim_frame_start'), type = int, default = facefusion.config.get_int_value('frame_extraction', 'trim_frame_start'))
 	group_frame_extraction.add_argument('--trim-frame-end', help = wording.get('help.trim_frame_end'), type = int, default = facefusion.config.get_int_value('frame_extraction', 'trim_frame_end'))
 	group_frame_extraction.add_argument('--temp-frame-format', help = wording.get('help.temp_frame_format'), default = config.get_str_value('frame_extraction', 'temp_frame_format', 'png'), choices = facefusion.choices.temp_frame_formats)
+	group_frame_extraction.add_argument('--video-process-mode', help = wording.get('help.video_process_mode'), default = config.get_str_value('frame_extraction', 'video_process_mode', 'sequential'), choices = facefusion.choices.video_process_modes)
 	group_frame_extraction.add_argument('--keep-temp', help = wording.get('help.keep_temp'), action = 'store_true', default = config.get_bool_value('frame_extraction', 'keep_temp'))
-	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp' ])
+	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'video_process_mode', 'keep_temp' ])
 	return program
 
 
@@ -215,6 +218,10 @@ def create_benchmark_program() -> ArgumentParser:
 	group_benchmark = program.add_argument_group('benchmark')
 	group_benchmark.add_argument('--benchmark-resolutions', help = wording.get('help.benchmark_resolutions'), default = config.get_str_list('benchmark', 'benchmark_resolutions', get_first(facefusion.choices.benchmark_resolutions)), choices = facefusion.choices.benchmark_resolutions, nargs = '+')
 	group_benchmark.add_argument('--benchmark-cycle-count', help = wording.get('help.benchmark_cycle_count'), type = int, default = config.get_int_value('benchmark', 'benchmark_cycle_count', '5'), choices = facefusion.choices.benchmark_cycle_count_range)
+	group_benchmark.add_argument('--benchmark-mode', help = wording.get('help.benchmark_mode'), default = config.get_str_value('benchmark', 'benchmark_mode', 'cycle'), choices = facefusion.choices.benchmark_modes)
+	group_benchmark.add_argument('--benchmark-synthetic', help = wording.get('help.benchmark_synthetic'), action = 'store_true', default = config.get_bool_value('benchmark', 'benchmark_synthetic'))
+	group_benchmark.add_argument('--benchmark-report-path', help = wording.get('help.benchmark_report_path'), default = config.get_str_value('benchmark', 'benchmark_report_path'))
+	group_benchmark.add_argument('--benchmark-baseline-path', help = wording.get('help.benchmark_baseline_path'), default = config.get_str_value('benchmark', 'benchmark_baseline_path'))
 	return program
 
 
@@ -226,7 +233,20 @@ def create_execution_program() -> ArgumentParser:
 	group_execution.add_argument('--execution-providers', help = wording.get('help.execution_providers').format(choices = ', '.join(available_execution_providers)), default = config.get_str_list('execution', 'execution_providers', get_first(available_execution_providers)), choices = available_execution_providers, nargs = '+', metavar = 'EXECUTION_PROVIDERS')
 	group_execution.add_argument('--execution-thread-count', help = wording.get('help.execution_thread_count'), type = int, default = config.get_int_value('execution', 'execution_thread_count', '4'), choices = facefusion.choices.execution_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_thread_count_range))
 	group_execution.add_argument('--execution-queue-count', help = wording.get('help.execution_queue_count'), type = int, default = config.get_int_value('execution', 'execution_queue_count', '1'), choices = facefusion.choices.execution_queue_count_range, metavar = create_int_metavar(facefusion.choices.execution_queue_count_range))
-	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count' ])
+	group_execution.add_argument('--execution-autotune', help = wording.get('help.execution_autotune'), action = 'store_true', default = config.get_bool_value('execution', 'execution_autotune'))
+	group_execution.add_argument('--execution-process-count', help = wording.get('help.execution_process_count'), type = int, default = config.get_int_value('execution', 'execution_process_count', '1'), choices = facefusion.choices.execution_process_count_range, metavar = create_int_metavar(facefusion.choices.execution_process_count_range))
+	group_execution.add_argument('--execution-process-device-ids', help = wording.get('help.execution_process_device_ids'), default = config.get_str_list('execution', 'execution_process_device_ids'), nargs = '+')
+	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count', 'execution_autotune', 'execution_process_count', 'execution_process_device_ids' ])
+	return program
+
+
+def create_session_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_session = program.add_argument_group('session')
+	group_session.add_argument('--session-profile', help = wording.get('help.session_profile'), default = config.get_str_value('session', 'session_profile', 'balanced'), choices = facefusion.choices.session_profiles)
+	group_session.add_argument('--session-model-profiles', help = wording.get('help.session_model_profiles'), default = config.get_str_list('session', 'session_model_profiles'), nargs = '+')
+	group_session.add_argument('--session-cache', help = wording.get('help.session_cache'), action = 'store_true', default = config.get_bool_value('session', 'session_cache'))
+	job_store.register_job_keys([ 'session_profile', 'session_model_profiles', 'session_cache' ])
 	return program
 
 
@@ -235,7 +255,8 @@ def create_memory_program() -> ArgumentParser:
 	group_memory = program.add_argument_group('memory')
 	group_memory.add_argument('--video-memory-strategy', help = wording.get('help.video_memory_strategy'), default = config.get_str_value('memory', 'video_memory_strategy', 'strict'), choices = facefusion.choices.video_memory_strategies)
 	group_memory.add_argument('--system-memory-limit', help = wording.get('help.system_memory_limit'), type = int, default = config.get_int_value('memory', 'system_memory_limit', '0'), choices = facefusion.choices.system_memory_limit_range, metavar = create_int_metavar(facefusion.choices.system_memory_limit_range))
-	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit' ])
+	group_memory.add_argument('--video-memory-limit', help = wording.get('help.video_memory_limit'), type = int, default = config.get_int_value('memory', 'video_memory_limit', '0'), choices = facefusion.choices.video_memory_limit_range, metavar = create_int_metavar(facefusion.choices.video_memory_limit_range))
+	job_store.register_job_keys([ 'video_memory_strategy', 'video_memory_limit', 'system_memory_limit' ])
 	return program
 
 
@@ -255,6 +276,14 @@ def create_halt_on_error_program() -> ArgumentParser:
 	return program
 
 
+def create_metrics_profile_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_misc = program.add_argument_group('misc')
+	group_misc.add_argument('--metrics-profile', help = wording.get('help.metrics_profile'), action = 'store_true', default = config.get_bool_value('misc', 'metrics_profile'))
+	job_store.register_job_keys([ 'metrics_profile' ])
+	return program
+
+
 def create_job_id_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	program.add_argument('job_id', help = wording.get('help.job_id'))
@@ -279,7 +308,7 @@ def collect_step_program() -> ArgumentParser:
 
 
 def collect_job_program() -> ArgumentParser:
-	return ArgumentParser(parents = [ create_execution_program(), create_download_providers_program(), create_memory_program(), create_log_level_program() ], add_help = False)
+	return ArgumentParser(parents = [ create_execution_program(), create_session_program(), create_download_providers_program(), create_memory_program(), create_log_level_program(), create_metrics_profile_program() ], add_help = False)
 
 
 def create_program() -> ArgumentParser:
@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import sys
+from multiprocessing.context import SpawnProcess
+from typing import List, Tuple, Union
+
+from tqdm import tqdm
+
+from facefusion import core, logger, metrics, process_manager, state_manager, wording
+from facefusion.ffmpeg import concat_video, merge_video_segment
+from facefusion.filesystem import get_file_extension, get_file_name
+from facefusion.json import read_json, write_json
+from facefusion.processors.core import get_processors_modules, multi_process_frames, process_fused_frames
+from facefusion.processors.types import ProcessorState
+from facefusion.temp_helper import get_temp_directory_path, get_temp_file_path
+from facefusion.types import Fps, State
+
+
+def run_segments(temp_video_fps : Fps, temp_frame_paths : List[str]) -> bool:
+	segments = create_segments(temp_frame_paths, state_manager.get_item('execution_process_count'))
+	segment_paths = [ resolve_segment_path(state_manager.get_item('target_path'), index) for index, _ in enumerate(segments) ]
+	segment_processes : List[SpawnProcess] = []
+	segment_context = multiprocessing.get_context('spawn')
+
+	for index, (segment_frame_paths, segment_path) in enumerate(zip(segments, segment_paths)):
+		execution_device_id = resolve_segment_device_id(index)
+		segment_process = segment_context.Process(target = process_segment, args = (state_manager.get_state(), execution_device_id, temp_video_fps, segment_frame_paths, segment_path))
+		segment_process.start()
+		segment_processes.append(segment_process)
+
+	with tqdm(total = len(segment_processes), desc = wording.get('processing'), unit = 'segment', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		progress.set_postfix(execution_process_count = len(segment_processes))
+
+		for segment_process in segment_processes:
+			while segment_process.is_alive() and not process_manager.is_stopping():
+				segment_process.join(timeout = 0.5)
+			progress.update()
+
+	if process_manager.is_stopping():
+		for segment_process in segment_processes:
+			segment_process.terminate()
+		return False
+
+	if all(segment_process.exitcode == 0 for segment_process in segment_processes):
+		for segment_path in segment_paths:
+			metrics.merge_metrics(read_json(resolve_segment_metrics_path(segment_path)) or {})
+		return concat_video(get_temp_file_path(state_manager.get_item('target_path')), segment_paths)
+	return False
+
+
+def create_segments(temp_frame_paths : List[str], segment_total : int) -> List[List[str]]:
+	segment_total = max(min(segment_total, len(temp_frame_paths)), 1)
+	segment_size, segment_rest = divmod(len(temp_frame_paths), segment_total)
+	segments = []
+	segment_start = 0
+
+	for index in range(segment_total):
+		segment_end = segment_start + segment_size + int(index < segment_rest)
+		segments.append(temp_frame_paths[segment_start:segment_end])
+		segment_start = segment_end
+	return segments
+
+
+def resolve_segment_path(target_path : str, segment_index : int) -> str:
+	temp_directory_path = get_temp_directory_path(target_path)
+	temp_file_extension = get_file_extension(get_temp_file_path(target_path))
+	return os.path.join(temp_directory_path, 'segment-' + str(segment_index).zfill(4) + temp_file_extension)
+
+
+def resolve_segment_metrics_path(segment_path : str) -> str:
+	return segment_path + '.metrics.json'
+
+
+def resolve_segment_device_id(segment_index : int) -> str:
+	execution_process_device_ids = state_manager.get_item('execution_process_device_ids')
+
+	if execution_process_device_ids:
+		return execution_process_device_ids[segment_index % len(execution_process_device_ids)]
+	return state_manager.get_item('execution_device_id')
+
+
+def resolve_segment_frame_range(segment_frame_paths : List[str]) -> Tuple[int, int]:
+	segment_frame_start = int(get_file_name(segment_frame_paths[0]))
+	return segment_frame_start, len(segment_frame_paths)
+
+
+def process_segment(state : Union[State, ProcessorState], execution_device_id : str, temp_video_fps : Fps, segment_frame_paths : List[str], segment_path : str) -> None:
+	for key, value in state.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+	state_manager.init_item('execution_device_id', execution_device_id)
+	state_manager.init_item('log_level', 'warn' if state_manager.get_item('log_level') in [ 'info', 'debug' ] else state_manager.get_item('log_level'))
+	logger.init(state_manager.get_item('log_level'))
+	process_manager.start()
+
+	for processor_module in get_processors_modules(state_manager.get_item('processors')):
+		if not processor_module.pre_process('output'):
+			sys.exit(2)
+	core.conditional_append_reference_faces()
+
+	if state_manager.get_item('video_process_mode') == 'fused':
+		multi_process_frames(state_manager.get_item('source_paths'), segment_frame_paths, process_fused_frames)
+		for processor_module in get_processors_modules(state_manager.get_item('processors')):
+			processor_module.post_process()
+	else:
+		for processor_module in get_processors_modules(state_manager.get_item('processors')):
+			processor_module.process_video(state_manager.get_item('source_paths'), segment_frame_paths)
+			processor_module.post_process()
+
+	segment_frame_start, segment_frame_total = resolve_segment_frame_range(segment_frame_paths)
+	is_merged = merge_video_segment(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), segment_path, segment_frame_start, segment_frame_total)
+	write_json(resolve_segment_metrics_path(segment_path), metrics.get_metrics())
+
+	if is_merged:
+		process_manager.end()
+		sys.exit(0)
+	process_manager.end()
+	sys.exit(1)
@@ -8,13 +8,16 @@ from onnxruntime import InferenceSession
 
 Scale : TypeAlias = float
 Score : TypeAlias = float
+Scores : TypeAlias = NDArray[Any]
 Angle : TypeAlias = int
 
 Detection : TypeAlias = NDArray[Any]
 Prediction : TypeAlias = NDArray[Any]
 
 BoundingBox : TypeAlias = NDArray[Any]
+BoundingBoxes : TypeAlias = NDArray[Any]
 FaceLandmark5 : TypeAlias = NDArray[Any]
+FaceLandmarks5 : TypeAlias = NDArray[Any]
 FaceLandmark68 : TypeAlias = NDArray[Any]
 FaceLandmarkSet = TypedDict('FaceLandmarkSet',
 {
@@ -57,9 +60,17 @@ Mask : TypeAlias = NDArray[Any]
 Points : TypeAlias = NDArray[Any]
 Distance : TypeAlias = NDArray[Any]
 Matrix : TypeAlias = NDArray[Any]
+PasteContext : TypeAlias = Tuple[VisionFrame, Mask, Matrix]
 Anchors : TypeAlias = NDArray[Any]
 Translation : TypeAlias = NDArray[Any]
 
+FaceTrack = TypedDict('FaceTrack',
+{
+	'vision_frame' : VisionFrame,
+	'faces' : List[Face]
+})
+FaceTrackSet : TypeAlias = Dict[int, FaceTrack]
+
 AudioBuffer : TypeAlias = bytes
 Audio : TypeAlias = NDArray[Any]
 AudioChunk : TypeAlias = NDArray[Any]
@@ -117,6 +128,7 @@ AudioFormat = Literal['flac', 'm4a', 'mp3', 'ogg', 'opus', 'wav']
 ImageFormat = Literal['bmp', 'jpeg', 'png', 'tiff', 'webp']
 VideoFormat = Literal['avi', 'm4v', 'mkv', 'mov', 'mp4', 'webm']
 TempFrameFormat = Literal['bmp', 'jpeg', 'png', 'tiff']
+VideoProcessMode = Literal['sequential', 'fused', 'stream']
 AudioTypeSet : TypeAlias = Dict[AudioFormat, str]
 ImageTypeSet : TypeAlias = Dict[ImageFormat, str]
 VideoTypeSet : TypeAlias = Dict[VideoFormat, str]
@@ -132,6 +144,7 @@ VideoPreset = Literal['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'm
 
 BenchmarkResolution = Literal['240p', '360p', '540p', '720p', '1080p', '1440p', '2160p']
 BenchmarkSet : TypeAlias = Dict[BenchmarkResolution, str]
+BenchmarkMode = Literal['cycle', 'component']
 BenchmarkCycleSet = TypedDict('BenchmarkCycleSet',
 {
 	'target_path' : str,
@@ -153,6 +166,18 @@ ExecutionProvider = Literal['cpu', 'coreml', 'cuda', 'directml', 'openvino', 'ro
 ExecutionProviderValue = Literal['CPUExecutionProvider', 'CoreMLExecutionProvider', 'CUDAExecutionProvider', 'DmlExecutionProvider', 'OpenVINOExecutionProvider', 'ROCMExecutionProvider', 'TensorrtExecutionProvider']
 ExecutionProviderSet : TypeAlias = Dict[ExecutionProvider, ExecutionProviderValue]
 InferenceSessionProvider : TypeAlias = Any
+SessionProfile = Literal['balanced', 'throughput', 'latency', 'memory']
+SessionExecutionMode = Literal['sequential', 'parallel']
+SessionGraphOptimization = Literal['disabled', 'basic', 'extended', 'all']
+SessionProfileOptions = TypedDict('SessionProfileOptions',
+{
+	'intra_op_thread_count' : int,
+	'inter_op_thread_count' : int,
+	'execution_mode' : SessionExecutionMode,
+	'graph_optimization' : SessionGraphOptimization,
+	'memory_arena' : bool
+})
+SessionProfileSet : TypeAlias = Dict[SessionProfile, SessionProfileOptions]
 ValueAndUnit = TypedDict('ValueAndUnit',
 {
 	'value' : int,
@@ -192,6 +217,42 @@ ExecutionDevice = TypedDict('ExecutionDevice',
 	'temperature': ExecutionDeviceTemperature,
 	'utilization' : ExecutionDeviceUtilization
 })
+Metric = TypedDict('Metric',
+{
+	'count' : int,
+	'total' : float,
+	'buckets' : List[int]
+})
+MetricSet : TypeAlias = Dict[str, Metric]
+MetricSummary = TypedDict('MetricSummary',
+{
+	'count' : int,
+	'total' : float,
+	'mean' : float,
+	'p50' : float,
+	'p95' : float,
+	'p99' : float
+})
+MetricProfile : TypeAlias = Dict[str, MetricSummary]
+BenchmarkComponentSet = TypedDict('BenchmarkComponentSet',
+{
+	'target_path' : str,
+	'cycle_count' : int,
+	'components' : MetricProfile
+})
+ExecutionTunerPhase = Literal['warmup', 'thread_up', 'thread_down', 'queue_up', 'queue_down', 'done']
+ExecutionTuner = TypedDict('ExecutionTuner',
+{
+	'phase' : ExecutionTunerPhase,
+	'thread_count' : int,
+	'queue_count' : int,
+	'best_thread_count' : int,
+	'best_queue_count' : int,
+	'best_fps' : float,
+	'frame_count' : int,
+	'frame_total' : int,
+	'window_time' : float
+})
 
 DownloadProvider = Literal['github', 'huggingface']
 DownloadProviderValue = TypedDict('DownloadProviderValue',
@@ -238,11 +299,36 @@ Job = TypedDict('Job',
 })
 JobSet : TypeAlias = Dict[str, Job]
 
+WorkerCommand = Literal['run', 'stop']
+WorkerRequest = TypedDict('WorkerRequest',
+{
+	'command' : WorkerCommand,
+	'job_id' : str,
+	'job_args' : List[str]
+})
+WorkerResponse = TypedDict('WorkerResponse',
+{
+	'progress' : float,
+	'error_code' : ErrorCode,
+	'metrics' : MetricSet
+}, total = False)
+WorkerJobStatus = Literal['queued', 'processing', 'completed', 'failed', 'cancelled']
+WorkerJob = TypedDict('WorkerJob',
+{
+	'job_args' : List[str],
+	'execution_device_id' : str,
+	'status' : WorkerJobStatus,
+	'progress' : float,
+	'error_code' : Optional[ErrorCode]
+})
+WorkerJobSet : TypeAlias = Dict[str, WorkerJob]
+
 StateKey = Literal\
 [
 	'command',
 	'config_path',
 	'temp_path',
+	'cache_path',
 	'jobs_path',
 	'source_paths',
 	'target_path',
@@ -254,10 +340,15 @@ StateKey = Literal\
 	'download_scope',
 	'benchmark_resolutions',
 	'benchmark_cycle_count',
+	'benchmark_mode',
+	'benchmark_synthetic',
+	'benchmark_report_path',
+	'benchmark_baseline_path',
 	'face_detector_model',
 	'face_detector_size',
 	'face_detector_angles',
 	'face_detector_score',
+	'face_tracker_interval',
 	'face_landmarker_model',
 	'face_landmarker_score',
 	'face_selector_mode',
@@ -279,6 +370,7 @@ StateKey = Literal\
 	'trim_frame_start',
 	'trim_frame_end',
 	'temp_frame_format',
+	'video_process_mode',
 	'keep_temp',
 	'output_image_quality',
 	'output_image_resolution',
@@ -298,10 +390,18 @@ StateKey = Literal\
 	'execution_providers',
 	'execution_thread_count',
 	'execution_queue_count',
+	'execution_autotune',
+	'execution_process_count',
+	'execution_process_device_ids',
+	'session_profile',
+	'session_model_profiles',
+	'session_cache',
 	'video_memory_strategy',
+	'video_memory_limit',
 	'system_memory_limit',
 	'log_level',
 	'halt_on_error',
+	'metrics_profile',
 	'job_id',
 	'job_status',
 	'step_index'
@@ -311,6 +411,7 @@ State = TypedDict('State',
 	'command' : str,
 	'config_path' : str,
 	'temp_path' : str,
+	'cache_path' : str,
 	'jobs_path' : str,
 	'source_paths' : List[str],
 	'target_path' : str,
@@ -322,10 +423,15 @@ State = TypedDict('State',
 	'download_scope': DownloadScope,
 	'benchmark_resolutions': List[BenchmarkResolution],
 	'benchmark_cycle_count': int,
+	'benchmark_mode' : BenchmarkMode,
+	'benchmark_synthetic' : bool,
+	'benchmark_report_path' : str,
+	'benchmark_baseline_path' : str,
 	'face_detector_model' : FaceDetectorModel,
 	'face_detector_size' : str,
 	'face_detector_angles' : List[Angle],
 	'face_detector_score' : Score,
+	'face_tracker_interval' : int,
 	'face_landmarker_model' : FaceLandmarkerModel,
 	'face_landmarker_score' : Score,
 	'face_selector_mode' : FaceSelectorMode,
@@ -347,6 +453,7 @@ State = TypedDict('State',
 	'trim_frame_start' : int,
 	'trim_frame_end' : int,
 	'temp_frame_format' : TempFrameFormat,
+	'video_process_mode' : VideoProcessMode,
 	'keep_temp' : bool,
 	'output_image_quality' : int,
 	'output_image_resolution' : str,
@@ -366,10 +473,18 @@ State = TypedDict('State',
 	'execution_providers' : List[ExecutionProvider],
 	'execution_thread_count' : int,
 	'execution_queue_count' : int,
+	'execution_autotune' : bool,
+	'execution_process_count' : int,
+	'execution_process_device_ids' : List[str],
+	'session_profile' : SessionProfile,
+	'session_model_profiles' : List[str],
+	'session_cache' : bool,
 	'video_memory_strategy' : VideoMemoryStrategy,
+	'video_memory_limit' : int,
 	'system_memory_limit' : int,
 	'log_level' : LogLevel,
 	'halt_on_error' : bool,
+	'metrics_profile' : bool,
 	'job_id' : str,
 	'job_status' : JobStatus,
 	'step_index' : int
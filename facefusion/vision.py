@@ -1,6 +1,6 @@
 import math
 from functools import lru_cache
-from typing import List, Optional, Tuple
+from typing import Generator, List, Optional, Tuple
 
 import cv2
 import numpy
@@ -9,6 +9,7 @@ from cv2.typing import Size
 import facefusion.choices
 from facefusion.common_helper import is_windows
 from facefusion.filesystem import get_file_extension, is_image, is_video
+from facefusion.metrics import measure
 from facefusion.thread_helper import thread_semaphore
 from facefusion.types import Duration, Fps, Orientation, Resolution, VisionFrame
 from facefusion.video_manager import get_video_capture
@@ -28,6 +29,7 @@ def read_static_images(image_paths : List[str]) -> List[VisionFrame]:
 	return frames
 
 
+@measure
 def read_image(image_path : str) -> Optional[VisionFrame]:
 	if is_image(image_path):
 		if is_windows():
@@ -37,6 +39,7 @@ def read_image(image_path : str) -> Optional[VisionFrame]:
 	return None
 
 
+@measure
 def write_image(image_path : str, vision_frame : VisionFrame) -> bool:
 	if image_path:
 		if is_windows():
@@ -98,6 +101,26 @@ def read_video_frame(video_path : str, frame_number : int = 0) -> Optional[Visio
 	return None
 
 
+def read_video_frames(video_path : str, frame_numbers : List[int]) -> Generator[VisionFrame, None, None]:
+	if is_video(video_path) and frame_numbers:
+		video_capture = cv2.VideoCapture(video_path)
+
+		if video_capture.isOpened():
+			frame_number = frame_numbers[0]
+			frame_number_set = set(frame_numbers)
+			video_capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+			while frame_number <= frame_numbers[-1] and video_capture.grab():
+				if frame_number in frame_number_set:
+					has_vision_frame, vision_frame = video_capture.retrieve()
+
+					if has_vision_frame:
+						yield vision_frame
+				frame_number += 1
+
+		video_capture.release()
+
+
 def count_video_frame_total(video_path : str) -> int:
 	if is_video(video_path):
 		video_capture = get_video_capture(video_path)
@@ -327,19 +350,9 @@ def create_tile_frames(vision_frame : VisionFrame, size : Size) -> Tuple[List[Vi
 
 
 def merge_tile_frames(tile_vision_frames : List[VisionFrame], temp_width : int, temp_height : int, pad_width : int, pad_height : int, size : Size) -> VisionFrame:
-	merge_vision_frame = numpy.zeros((pad_height, pad_width, 3)).astype(numpy.uint8)
-	tile_width = tile_vision_frames[0].shape[1] - 2 * size[2]
-	tiles_per_row = min(pad_width // tile_width, len(tile_vision_frames))
-
-	for index, tile_vision_frame in enumerate(tile_vision_frames):
-		tile_vision_frame = tile_vision_frame[size[2]:-size[2], size[2]:-size[2]]
-		row_index = index // tiles_per_row
-		col_index = index % tiles_per_row
-		top = row_index * tile_vision_frame.shape[0]
-		bottom = top + tile_vision_frame.shape[0]
-		left = col_index * tile_vision_frame.shape[1]
-		right = left + tile_vision_frame.shape[1]
-		merge_vision_frame[top:bottom, left:right, :] = tile_vision_frame
-
+	tile_batch_frames = numpy.stack(tile_vision_frames)[:, size[2]:-size[2], size[2]:-size[2]]
+	tile_total, tile_height, tile_width = tile_batch_frames.shape[:3]
+	tiles_per_row = min(pad_width // tile_width, tile_total)
+	merge_vision_frame = tile_batch_frames.reshape(-1, tiles_per_row, tile_height, tile_width, 3).transpose(0, 2, 1, 3, 4).reshape(-1, tiles_per_row * tile_width, 3)
 	merge_vision_frame = merge_vision_frame[size[1] : size[1] + temp_height, size[1]: size[1] + temp_width, :]
 	return merge_vision_frame
@@ -1,12 +1,14 @@
 from functools import lru_cache
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy
 import scipy
+from onnxruntime import InferenceSession
 
 from facefusion import inference_manager
 from facefusion.download import conditional_download_hashes, conditional_download_sources, resolve_download_url
 from facefusion.filesystem import resolve_relative_path
+from facefusion.metrics import measure
 from facefusion.thread_helper import thread_semaphore
 from facefusion.types import Audio, AudioChunk, DownloadScope, InferencePool, ModelOptions, ModelSet
 
@@ -44,6 +46,13 @@ def get_inference_pool() -> InferencePool:
 	return inference_manager.get_inference_pool(__name__, model_names, model_source_set)
 
 
+def get_inference_session(model_name : str) -> Optional[InferenceSession]:
+	model_names = [ 'kim_vocal_2' ]
+	model_source_set = get_model_options().get('sources')
+
+	return inference_manager.get_inference_session(__name__, model_names, model_source_set, model_name)
+
+
 def clear_inference_pool() -> None:
 	model_names = [ 'kim_vocal_2' ]
 	inference_manager.clear_inference_pool(__name__, model_names)
@@ -74,7 +83,7 @@ def batch_extract_voice(audio : Audio, chunk_size : int, step_size : int) -> Aud
 
 
 def extract_voice(temp_audio_chunk : AudioChunk) -> AudioChunk:
-	voice_extractor = get_inference_pool().get('voice_extractor')
+	voice_extractor = get_inference_session('voice_extractor')
 	chunk_size = (voice_extractor.get_inputs()[0].shape[3] - 1) * 1024
 	trim_size = 3840
 	temp_audio_chunk, pad_size = prepare_audio_chunk(temp_audio_chunk.T, chunk_size, trim_size)
@@ -85,8 +94,9 @@ def extract_voice(temp_audio_chunk : AudioChunk) -> AudioChunk:
 	return temp_audio_chunk
 
 
+@measure
 def forward(temp_audio_chunk : AudioChunk) -> AudioChunk:
-	voice_extractor = get_inference_pool().get('voice_extractor')
+	voice_extractor = get_inference_session('voice_extractor')
 
 	with thread_semaphore():
 		temp_audio_chunk = voice_extractor.run(None,
@@ -10,6 +10,9 @@ WORDING : Dict[str, Any] =\
 	'extracting_frames': 'Extracting frames with a resolution of {resolution} and {fps} frames per second',
 	'extracting_frames_succeed': 'Extracting frames succeed',
 	'extracting_frames_failed': 'Extracting frames failed',
+	'streaming_frames': 'Streaming frames with a resolution of {resolution} and {fps} frames per second',
+	'streaming_frames_succeed': 'Streaming frames succeed',
+	'streaming_frames_failed': 'Streaming frames failed',
 	'analysing': 'Analysing',
 	'extracting': 'Extracting',
 	'streaming': 'Streaming',
@@ -33,10 +36,12 @@ WORDING : Dict[str, Any] =\
 	'restoring_audio_skipped': 'Restoring audio skipped',
 	'clearing_temp': 'Clearing temporary resources',
 	'processing_stopped': 'Processing stopped',
+	'execution_tuned': 'Tuned execution to {thread_count} threads with {queue_count} frames each',
 	'processing_image_succeed': 'Processing to image succeed in {seconds} seconds',
 	'processing_image_failed': 'Processing to image failed',
 	'processing_video_succeed': 'Processing to video succeed in {seconds} seconds',
 	'processing_video_failed': 'Processing to video failed',
+	'benchmark_failed': 'Benchmark of {target_path} failed',
 	'choose_image_source': 'Choose a image for the source',
 	'choose_audio_source': 'Choose a audio for the source',
 	'choose_video_target': 'Choose a video for the target',
@@ -99,6 +104,7 @@ WORDING : Dict[str, Any] =\
 		# paths
 		'config_path': 'choose the config file to override defaults',
 		'temp_path': 'specify the directory for the temporary resources',
+		'cache_path': 'specify the directory to store analysis caches',
 		'jobs_path': 'specify the directory to store jobs',
 		'source_paths': 'choose the image or audio paths',
 		'target_path': 'choose the image or video path',
@@ -112,6 +118,7 @@ WORDING : Dict[str, Any] =\
 		'face_detector_size': 'specify the frame size provided to the face detector',
 		'face_detector_angles': 'specify the angles to rotate the frame before detecting faces',
 		'face_detector_score': 'filter the detected faces base on the confidence score',
+		'face_tracker_interval': 'specify the frame interval of the face detection while tracking the faces in between',
 		# face landmarker
 		'face_landmarker_model': 'choose the model responsible for detecting the face landmarks',
 		'face_landmarker_score': 'filter the detected face landmarks base on the confidence score',
@@ -137,6 +144,7 @@ WORDING : Dict[str, Any] =\
 		'trim_frame_start': 'specify the starting frame of the target video',
 		'trim_frame_end': 'specify the ending frame of the target video',
 		'temp_frame_format': 'specify the temporary resources format',
+		'video_process_mode': 'process the frames once per processor, once through all processors or stream them without temporary frames',
 		'keep_temp': 'keep the temporary resources after processing',
 		# output creation
 		'output_image_quality': 'specify the image quality which translates to the image compression',
@@ -183,6 +191,7 @@ WORDING : Dict[str, Any] =\
 		'frame_colorizer_blend': 'blend the colorized into the previous frame',
 		'frame_enhancer_model': 'choose the model responsible for enhancing the frame',
 		'frame_enhancer_blend': 'blend the enhanced into the previous frame',
+		'frame_enhancer_batch_size': 'specify the amount of tiles enhanced per inference run',
 		'lip_syncer_model': 'choose the model responsible for syncing the lips',
 		'lip_syncer_weight': 'specify the degree of weight applied to the lips',
 		# uis
@@ -195,17 +204,30 @@ WORDING : Dict[str, Any] =\
 		# benchmark
 		'benchmark_resolutions': 'choose the resolutions for the benchmarks (choices: {choices}, ...)',
 		'benchmark_cycle_count': 'specify the amount of cycles per benchmark',
+		'benchmark_mode': 'choose between end-to-end cycles and per-component benchmarks',
+		'benchmark_synthetic': 'generate synthetic sources and targets instead of downloading the examples',
+		'benchmark_report_path': 'specify the path to write the benchmark report as json',
+		'benchmark_baseline_path': 'specify the benchmark report to compare against',
 		# execution
 		'execution_device_id': 'specify the device used for processing',
 		'execution_providers': 'inference using different providers (choices: {choices}, ...)',
 		'execution_thread_count': 'specify the amount of parallel threads while processing',
 		'execution_queue_count': 'specify the amount of frames each thread is processing',
+		'execution_autotune': 'tune the amount of threads and frames per thread while processing',
+		'execution_process_count': 'specify the amount of parallel processes while processing video segments',
+		'execution_process_device_ids': 'specify the devices the video segment processes are distributed to',
+		# session
+		'session_profile': 'choose the inference session profile for thread count, execution mode and graph optimization',
+		'session_model_profiles': 'override the session profile per model using model=profile pairs',
+		'session_cache': 'cache the optimized models to speed up the session creation',
 		# memory
 		'video_memory_strategy': 'balance fast processing and low VRAM usage',
+		'video_memory_limit': 'keep the least recently used models loaded within a budget in MB instead of applying the video memory strategy',
 		'system_memory_limit': 'limit the available RAM that can be used while processing',
 		# misc
 		'log_level': 'adjust the message severity displayed in the terminal',
 		'halt_on_error': 'halt the program once an error occurred',
+		'metrics_profile': 'write the latency profile of the processing stages next to the output',
 		# run
 		'run': 'run the program',
 		'headless_run': 'run the program in headless mode',
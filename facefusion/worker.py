@@ -0,0 +1,276 @@
+import multiprocessing
+import threading
+from argparse import ArgumentParser
+from multiprocessing.connection import Connection
+from multiprocessing.context import SpawnProcess
+from queue import Queue
+from typing import Dict, List, Optional, Set, Tuple
+
+from tqdm import tqdm
+
+from facefusion import core, logger, metrics, process_manager, state_manager, wording
+from facefusion.args import apply_args
+from facefusion.face_store import clear_reference_faces, clear_static_faces
+from facefusion.face_tracker import clear_face_tracks
+from facefusion.jobs import job_manager
+from facefusion.program import create_program
+from facefusion.types import ErrorCode, WorkerJob, WorkerJobSet, WorkerJobStatus, WorkerRequest, WorkerResponse
+
+WORKER_JOB_SET : WorkerJobSet = {}
+WORKER_JOB_CONNECTIONS : Dict[str, Connection] = {}
+WORKER_QUEUES : Dict[str, Queue[Optional[str]]] = {}
+WORKER_THREADS : Dict[str, List[threading.Thread]] = {}
+WORKER_PROCESSES : List[SpawnProcess] = []
+WORKER_CONDITION : threading.Condition = threading.Condition()
+WORKER_CONNECTION : Optional[Connection] = None
+WORKER_CANCELLED_JOB_IDS : Set[str] = set()
+WORKER_LOCK : threading.Lock = threading.Lock()
+TQDM_UPDATE = tqdm.update
+
+
+def start_workers(execution_device_ids : List[str], worker_count : int) -> None:
+	for execution_device_id in execution_device_ids:
+		if execution_device_id not in WORKER_QUEUES:
+			WORKER_QUEUES[execution_device_id] = Queue()
+			WORKER_THREADS[execution_device_id] = []
+
+			for _ in range(worker_count):
+				worker_thread = threading.Thread(target = handle_worker_queue, args = (execution_device_id,), daemon = True)
+				worker_thread.start()
+				WORKER_THREADS[execution_device_id].append(worker_thread)
+
+
+def stop_workers() -> None:
+	for job_id in list(WORKER_JOB_SET.keys()):
+		cancel_job(job_id)
+
+	for execution_device_id, worker_threads in WORKER_THREADS.items():
+		for _ in worker_threads:
+			WORKER_QUEUES[execution_device_id].put(None)
+		for worker_thread in worker_threads:
+			worker_thread.join(timeout = 10)
+
+	for worker_process in WORKER_PROCESSES:
+		if worker_process.is_alive():
+			worker_process.terminate()
+			worker_process.join()
+	WORKER_QUEUES.clear()
+	WORKER_THREADS.clear()
+	WORKER_PROCESSES.clear()
+
+
+def submit_job(job_id : str, job_args : List[str], execution_device_id : Optional[str] = None) -> bool:
+	if WORKER_QUEUES and job_id not in WORKER_JOB_SET:
+		if execution_device_id not in WORKER_QUEUES:
+			execution_device_id = min(WORKER_QUEUES, key = lambda worker_device_id: WORKER_QUEUES[worker_device_id].qsize())
+
+		with WORKER_CONDITION:
+			WORKER_JOB_SET[job_id] =\
+			{
+				'job_args': job_args,
+				'execution_device_id': execution_device_id,
+				'status': 'queued',
+				'progress': 0.0,
+				'error_code': None
+			}
+		WORKER_QUEUES[execution_device_id].put(job_id)
+		return True
+	return False
+
+
+def get_job(job_id : str) -> Optional[WorkerJob]:
+	return WORKER_JOB_SET.get(job_id)
+
+
+def wait_job(job_id : str, timeout : Optional[float] = None) -> Optional[WorkerJob]:
+	with WORKER_CONDITION:
+		WORKER_CONDITION.wait_for(lambda: is_job_finished(job_id), timeout)
+	return get_job(job_id)
+
+
+def cancel_job(job_id : str) -> bool:
+	with WORKER_CONDITION:
+		worker_job = WORKER_JOB_SET.get(job_id)
+
+		if worker_job and worker_job.get('status') in [ 'queued', 'processing' ]:
+			if worker_job.get('status') == 'processing':
+				worker_request : WorkerRequest =\
+				{
+					'command': 'stop',
+					'job_id': job_id,
+					'job_args': []
+				}
+				WORKER_JOB_CONNECTIONS[job_id].send(worker_request)
+			worker_job['status'] = 'cancelled'
+			WORKER_CONDITION.notify_all()
+			return True
+	return False
+
+
+def clear_job(job_id : str) -> bool:
+	with WORKER_CONDITION:
+		if job_id in WORKER_JOB_SET and is_job_finished(job_id):
+			del WORKER_JOB_SET[job_id]
+			return True
+	return False
+
+
+def is_job_finished(job_id : str) -> bool:
+	worker_job = WORKER_JOB_SET.get(job_id)
+	return not worker_job or worker_job.get('status') in [ 'completed', 'failed', 'cancelled' ]
+
+
+def handle_worker_queue(execution_device_id : str) -> None:
+	worker_process, worker_connection = create_worker_process()
+
+	while job_id := WORKER_QUEUES[execution_device_id].get():
+		if not worker_process.is_alive():
+			worker_process, worker_connection = create_worker_process()
+
+		with WORKER_CONDITION:
+			worker_job = WORKER_JOB_SET.get(job_id)
+
+			if not worker_job or not worker_job.get('status') == 'queued':
+				continue
+			worker_job['status'] = 'processing'
+			worker_request : WorkerRequest =\
+			{
+				'command': 'run',
+				'job_id': job_id,
+				'job_args': worker_job.get('job_args') + [ '--execution-device-id', execution_device_id ]
+			}
+			worker_connection.send(worker_request)
+			WORKER_JOB_CONNECTIONS[job_id] = worker_connection
+
+		error_code = process_worker_responses(worker_job, worker_process, worker_connection)
+		finish_job(job_id, error_code)
+
+	stop_worker_process(worker_process, worker_connection)
+
+
+def process_worker_responses(worker_job : WorkerJob, worker_process : SpawnProcess, worker_connection : Connection) -> ErrorCode:
+	while worker_process.is_alive():
+		if worker_connection.poll(1):
+			worker_response : WorkerResponse = worker_connection.recv()
+
+			if 'metrics' in worker_response:
+				metrics.merge_metrics(worker_response.get('metrics'))
+			if 'error_code' in worker_response:
+				return worker_response.get('error_code')
+			worker_job['progress'] = worker_response.get('progress')
+	return 1
+
+
+def finish_job(job_id : str, error_code : ErrorCode) -> None:
+	with WORKER_CONDITION:
+		worker_job = WORKER_JOB_SET.get(job_id)
+		WORKER_JOB_CONNECTIONS.pop(job_id, None)
+
+		if worker_job:
+			worker_job['status'] = resolve_job_status(worker_job, error_code)
+			worker_job['error_code'] = error_code
+			if worker_job.get('status') == 'completed':
+				worker_job['progress'] = 1.0
+		WORKER_CONDITION.notify_all()
+
+
+def resolve_job_status(worker_job : WorkerJob, error_code : ErrorCode) -> WorkerJobStatus:
+	if worker_job.get('status') == 'cancelled':
+		return 'cancelled'
+	if error_code == 0:
+		return 'completed'
+	return 'failed'
+
+
+def create_worker_process() -> Tuple[SpawnProcess, Connection]:
+	worker_context = multiprocessing.get_context('spawn')
+	worker_connection, process_connection = worker_context.Pipe()
+	worker_process = worker_context.Process(target = run_worker, args = (process_connection,))
+	worker_process.start()
+	WORKER_PROCESSES.append(worker_process)
+	return worker_process, worker_connection
+
+
+def stop_worker_process(worker_process : SpawnProcess, worker_connection : Connection) -> None:
+	if worker_process.is_alive():
+		worker_connection.send(None)
+		worker_process.join(timeout = 10)
+		if worker_process.is_alive():
+			worker_process.terminate()
+
+
+def run_worker(worker_connection : Connection) -> None:
+	global WORKER_CONNECTION
+
+	WORKER_CONNECTION = worker_connection
+	worker_queue : Queue[Optional[WorkerRequest]] = Queue()
+	program = create_program()
+	tqdm.update = tqdm_update
+
+	if core.pre_check():
+		threading.Thread(target = listen_worker, args = (worker_queue,), daemon = True).start()
+
+		while worker_request := worker_queue.get():
+			error_code = process_worker_job(program, worker_request.get('job_id'), worker_request.get('job_args'))
+			send_worker_response(
+			{
+				'error_code': error_code,
+				'metrics': metrics.get_metrics()
+			})
+			metrics.clear_metrics()
+
+
+def listen_worker(worker_queue : Queue[Optional[WorkerRequest]]) -> None:
+	while worker_request := WORKER_CONNECTION.recv():
+		if worker_request.get('command') == 'stop':
+			if process_manager.is_pending():
+				WORKER_CANCELLED_JOB_IDS.add(worker_request.get('job_id'))
+			else:
+				process_manager.stop()
+		else:
+			worker_queue.put(worker_request)
+	worker_queue.put(None)
+
+
+def process_worker_job(program : ArgumentParser, job_id : str, job_args : List[str]) -> ErrorCode:
+	if is_job_cancelled(job_id):
+		return 1
+
+	try:
+		args = vars(program.parse_args(job_args))
+	except SystemExit:
+		return 2
+
+	apply_args(args, state_manager.init_item)
+	logger.init(state_manager.get_item('log_level'))
+	clear_static_faces()
+	clear_reference_faces()
+	clear_face_tracks()
+
+	if not job_manager.init_jobs(state_manager.get_item('jobs_path')):
+		return 1
+	if is_job_cancelled(job_id):
+		return 1
+	return core.process_headless(args)
+
+
+def is_job_cancelled(job_id : str) -> bool:
+	if job_id in WORKER_CANCELLED_JOB_IDS:
+		WORKER_CANCELLED_JOB_IDS.discard(job_id)
+		return True
+	return False
+
+
+def send_worker_response(worker_response : WorkerResponse) -> None:
+	with WORKER_LOCK:
+		WORKER_CONNECTION.send(worker_response)
+
+
+def tqdm_update(self : tqdm, n : int = 1) -> None:
+	TQDM_UPDATE(self, n)
+
+	if self.desc == wording.get('processing') and self.total:
+		send_worker_response(
+		{
+			'progress': self.n / self.total
+		})
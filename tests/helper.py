@@ -1,8 +1,11 @@
 import os
 import tempfile
+from typing import Optional
+
+import numpy
 
 from facefusion.filesystem import create_directory, is_directory, is_file, remove_directory
-from facefusion.types import JobStatus
+from facefusion.types import BoundingBox, Face, FaceLandmark68, JobStatus
 
 
 def is_test_job_file(file_path : str, job_status : JobStatus) -> bool:
@@ -42,3 +45,29 @@ def prepare_test_output_directory() -> bool:
 	remove_directory(test_outputs_directory)
 	create_directory(test_outputs_directory)
 	return is_directory(test_outputs_directory)
+
+
+def create_test_face(bounding_box : Optional[BoundingBox] = None, face_landmark_68 : Optional[FaceLandmark68] = None) -> Face:
+	if bounding_box is None:
+		bounding_box = numpy.array([ 10.0, 20.0, 110.0, 140.0 ])
+	if face_landmark_68 is None:
+		face_landmark_68 = numpy.ones((68, 2)) * 3
+	face_landmark_5 = face_landmark_68[:5]
+
+	return Face(
+		bounding_box = bounding_box,
+		score_set = { 'detector': 0.8, 'landmarker': 0.6 },
+		landmark_set =
+		{
+			'5': face_landmark_5,
+			'5/68': face_landmark_5,
+			'68': face_landmark_68,
+			'68/5': face_landmark_68 * 2
+		},
+		angle = 90,
+		embedding = numpy.arange(512, dtype = numpy.float32),
+		normed_embedding = numpy.arange(512, dtype = numpy.float32) / 512,
+		gender = 'female',
+		age = range(20, 29),
+		race = 'asian'
+	)
@@ -0,0 +1,71 @@
+import pytest
+
+from facefusion import benchmarker, face_classifier, face_detector, face_landmarker, face_recognizer, state_manager
+from facefusion.benchmarker import collect_benchmark_values, compare_benchmark_values, render_synthetic_face, resolve_source_paths, resolve_target_path
+from facefusion.face_analyser import get_many_faces
+from facefusion.vision import read_static_image, read_video_frame
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_device_id', '0')
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('download_providers', [ 'github' ])
+	state_manager.init_item('benchmark_synthetic', True)
+	state_manager.init_item('benchmark_resolutions', [ '240p', '720p' ])
+	state_manager.init_item('face_detector_angles', [ 0 ])
+	state_manager.init_item('face_detector_model', 'yolo_face')
+	state_manager.init_item('face_detector_size', '640x640')
+	state_manager.init_item('face_detector_score', 0.5)
+	state_manager.init_item('face_tracker_interval', 1)
+	state_manager.init_item('face_landmarker_model', '2dfan4')
+	state_manager.init_item('face_landmarker_score', 0.5)
+	face_classifier.pre_check()
+	face_detector.pre_check()
+	face_landmarker.pre_check()
+	face_recognizer.pre_check()
+	benchmarker.pre_check()
+
+
+def test_render_synthetic_face() -> None:
+	assert render_synthetic_face(120).shape == (120, 120, 3)
+
+
+def test_detect_synthetic_faces() -> None:
+	source_image_path = resolve_source_paths()[0]
+
+	assert len(get_many_faces([ read_static_image(source_image_path) ])) == 1
+
+	for benchmark_resolution in state_manager.get_item('benchmark_resolutions'):
+		target_path = resolve_target_path(benchmark_resolution)
+
+		assert len(get_many_faces([ read_video_frame(target_path) ])) == 1
+
+
+def test_collect_benchmark_values() -> None:
+	benchmark_report =\
+	{
+		'benchmark_mode': 'component',
+		'benchmarks':
+		[
+			{
+				'target_path': '.assets/examples/synthetic-target-240p.mp4',
+				'cycle_count': 1,
+				'components':
+				{
+					'face_helper.paste_back':
+					{
+						'mean': 0.002
+					}
+				}
+			}
+		]
+	}
+
+	assert collect_benchmark_values(benchmark_report) == { 'synthetic-target-240p/face_helper.paste_back': 0.002 }
+
+
+def test_compare_benchmark_values() -> None:
+	benchmark_comparisons = compare_benchmark_values({ 'target-240p': 1.2, 'target-360p': 2.0, 'target-540p': 3.0 }, { 'target-240p': 1.0, 'target-360p': 2.0 })
+
+	assert benchmark_comparisons == [ [ 'target-240p', 1.0, 1.2, 20.0, True ], [ 'target-360p', 2.0, 2.0, 0.0, False ] ]
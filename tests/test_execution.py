@@ -1,4 +1,8 @@
-from facefusion.execution import create_inference_session_providers, get_available_execution_providers, has_execution_provider
+import os
+
+from onnxruntime import ExecutionMode, GraphOptimizationLevel
+
+from facefusion.execution import create_inference_session_options, create_inference_session_providers, get_available_execution_providers, has_execution_provider
 
 
 def test_has_execution_provider() -> None:
@@ -22,3 +26,21 @@ def test_create_inference_session_providers() -> None:
 	]
 
 	assert create_inference_session_providers('1', [ 'cpu', 'cuda' ]) == inference_session_providers
+
+
+def test_create_inference_session_options() -> None:
+	session_options = create_inference_session_options('throughput', 4)
+
+	assert session_options.intra_op_num_threads == 1
+	assert session_options.execution_mode == ExecutionMode.ORT_SEQUENTIAL
+
+	session_options = create_inference_session_options('latency', 1)
+
+	assert session_options.intra_op_num_threads == os.cpu_count()
+	assert session_options.execution_mode == ExecutionMode.ORT_PARALLEL
+
+	session_options = create_inference_session_options('memory', 1024)
+
+	assert session_options.intra_op_num_threads == 1
+	assert session_options.graph_optimization_level == GraphOptimizationLevel.ORT_ENABLE_BASIC
+	assert session_options.enable_cpu_mem_arena is False
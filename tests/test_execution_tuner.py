@@ -0,0 +1,61 @@
+from facefusion.execution_tuner import EXECUTION_TUNER_FRAME_LIMIT, create_execution_tuner, tune_execution, update_execution_tuner
+
+
+def test_create_execution_tuner() -> None:
+	assert create_execution_tuner(4, 1, True).get('phase') == 'warmup'
+	assert create_execution_tuner(4, 1, False).get('phase') == 'done'
+
+
+def test_update_execution_tuner() -> None:
+	execution_tuner = create_execution_tuner(4, 1, True)
+
+	assert update_execution_tuner(execution_tuner, 32) is False
+	assert update_execution_tuner(execution_tuner, 32) is True
+	assert execution_tuner.get('phase') == 'thread_up'
+	assert execution_tuner.get('frame_total') == 64
+
+	execution_tuner = create_execution_tuner(4, 1, False)
+
+	assert update_execution_tuner(execution_tuner, 64) is False
+
+
+def test_tune_execution() -> None:
+	execution_tuner = create_execution_tuner(4, 1, True)
+	tune_execution(execution_tuner, 1.0)
+	tune_execution(execution_tuner, 10.0)
+
+	assert execution_tuner.get('thread_count') == 5
+
+	tune_execution(execution_tuner, 12.0)
+
+	assert execution_tuner.get('best_thread_count') == 5
+	assert execution_tuner.get('thread_count') == 6
+
+	tune_execution(execution_tuner, 11.0)
+
+	assert execution_tuner.get('phase') == 'thread_down'
+	assert execution_tuner.get('thread_count') == 4
+
+	tune_execution(execution_tuner, 8.0)
+
+	assert execution_tuner.get('phase') == 'queue_up'
+	assert execution_tuner.get('thread_count') == 5
+	assert execution_tuner.get('queue_count') == 2
+
+	tune_execution(execution_tuner, 20.0)
+	tune_execution(execution_tuner, 15.0)
+	tune_execution(execution_tuner, 15.0)
+
+	assert execution_tuner.get('phase') == 'done'
+	assert execution_tuner.get('thread_count') == 5
+	assert execution_tuner.get('queue_count') == 2
+
+
+def test_tune_execution_with_frame_limit() -> None:
+	execution_tuner = create_execution_tuner(4, 1, True)
+	tune_execution(execution_tuner, 1.0)
+	execution_tuner['frame_total'] = EXECUTION_TUNER_FRAME_LIMIT
+	tune_execution(execution_tuner, 10.0)
+
+	assert execution_tuner.get('phase') == 'done'
+	assert execution_tuner.get('thread_count') == 4
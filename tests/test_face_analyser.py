@@ -25,6 +25,7 @@ def before_all() -> None:
 	state_manager.init_item('face_detector_angles', [ 0 ])
 	state_manager.init_item('face_detector_model', 'many')
 	state_manager.init_item('face_detector_score', 0.5)
+	state_manager.init_item('face_tracker_interval', 1)
 	state_manager.init_item('face_landmarker_model', 'many')
 	state_manager.init_item('face_landmarker_score', 0.5)
 	face_classifier.pre_check()
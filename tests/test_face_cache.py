@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+import numpy
+import pytest
+
+from facefusion import state_manager
+from facefusion.face_cache import clear_cached_faces, get_cached_faces, set_cached_faces
+from .helper import create_test_face
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('cache_path', tempfile.mkdtemp())
+	state_manager.init_item('face_detector_model', 'yolo_face')
+	state_manager.init_item('face_detector_size', '640x640')
+	state_manager.init_item('face_detector_angles', [ 0 ])
+	state_manager.init_item('face_detector_score', 0.5)
+	state_manager.init_item('face_landmarker_model', '2dfan4')
+	state_manager.init_item('face_landmarker_score', 0.5)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_cached_faces()
+
+
+def create_image_path() -> str:
+	image_file, image_path = tempfile.mkstemp(suffix = '.jpg', dir = state_manager.get_item('cache_path'))
+	os.write(image_file, os.urandom(64))
+	os.close(image_file)
+	return image_path
+
+
+def test_get_cached_faces() -> None:
+	image_path = create_image_path()
+	face = create_test_face()
+
+	assert get_cached_faces(image_path) is None
+	assert set_cached_faces(image_path, [ face ]) is True
+
+	clear_cached_faces()
+	cached_face = get_cached_faces(image_path)[0]
+
+	assert numpy.array_equal(cached_face.bounding_box, face.bounding_box)
+	assert cached_face.score_set == face.score_set
+	assert numpy.array_equal(cached_face.landmark_set.get('68/5'), face.landmark_set.get('68/5'))
+	assert cached_face.angle == 90
+	assert numpy.array_equal(cached_face.normed_embedding, face.normed_embedding)
+	assert cached_face.gender == 'female'
+	assert cached_face.age == range(20, 29)
+	assert cached_face.race == 'asian'
+
+
+def test_get_cached_faces_without_faces() -> None:
+	image_path = create_image_path()
+
+	assert set_cached_faces(image_path, []) is True
+
+	clear_cached_faces()
+
+	assert get_cached_faces(image_path) == []
+
+
+def test_get_cached_faces_with_changed_options() -> None:
+	image_path = create_image_path()
+	set_cached_faces(image_path, [ create_test_face() ])
+	state_manager.set_item('face_detector_score', 0.7)
+
+	assert get_cached_faces(image_path) is None
+
+	state_manager.set_item('face_detector_score', 0.5)
+
+
+def test_get_cached_faces_without_cache_path() -> None:
+	image_path = create_image_path()
+	cache_path = state_manager.get_item('cache_path')
+	state_manager.set_item('cache_path', None)
+
+	assert set_cached_faces(image_path, [ create_test_face() ]) is False
+	assert get_cached_faces(image_path) is None
+
+	state_manager.set_item('cache_path', cache_path)
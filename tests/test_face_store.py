@@ -0,0 +1,60 @@
+import numpy
+import pytest
+
+from facefusion import face_store, state_manager
+from facefusion.face_store import calc_faces_memory, clear_static_faces, get_static_faces, set_static_faces
+from facefusion.types import VisionFrame
+from .helper import create_test_face
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_static_faces()
+
+
+def create_vision_frame(value : int) -> VisionFrame:
+	return numpy.full((720, 1280, 3), value, dtype = numpy.uint8)
+
+
+def test_get_static_faces() -> None:
+	face = create_test_face()
+	set_static_faces(create_vision_frame(1), [ face ])
+
+	assert get_static_faces(create_vision_frame(1)) == [ face ]
+	assert get_static_faces(create_vision_frame(2)) is None
+
+
+def test_get_static_faces_with_single_pixel_change() -> None:
+	face = create_test_face()
+	vision_frame = create_vision_frame(1)
+	set_static_faces(vision_frame, [ face ])
+	vision_frame[1, 1] = 2
+
+	assert get_static_faces(vision_frame) is None
+
+
+def test_get_static_faces_with_frame_number() -> None:
+	face = create_test_face()
+	state_manager.init_item('target_path', 'target-240p.mp4')
+	set_static_faces(create_vision_frame(1), [ face ], 10)
+
+	assert get_static_faces(create_vision_frame(2), 10) == [ face ]
+	assert get_static_faces(create_vision_frame(1), 11) is None
+	assert get_static_faces(create_vision_frame(1)) is None
+
+	state_manager.init_item('target_path', 'target-360p.mp4')
+
+	assert get_static_faces(create_vision_frame(2), 10) is None
+
+
+def test_set_static_faces_with_memory_limit(monkeypatch : pytest.MonkeyPatch) -> None:
+	monkeypatch.setattr(face_store, 'STATIC_FACES_MEMORY_LIMIT', calc_faces_memory([ create_test_face() ]) * 2)
+
+	set_static_faces(create_vision_frame(1), [ create_test_face() ])
+	set_static_faces(create_vision_frame(2), [ create_test_face() ])
+	get_static_faces(create_vision_frame(1))
+	set_static_faces(create_vision_frame(3), [ create_test_face() ])
+
+	assert get_static_faces(create_vision_frame(1))
+	assert get_static_faces(create_vision_frame(2)) is None
+	assert get_static_faces(create_vision_frame(3))
@@ -0,0 +1,108 @@
+from typing import List, Tuple
+
+import cv2
+import numpy
+import pytest
+
+from facefusion import face_analyser, process_manager, state_manager
+from facefusion.face_analyser import get_many_faces
+from facefusion.face_store import clear_static_faces
+from facefusion.face_tracker import FACE_TRACK_SET, clear_face_tracks, start_face_track, track_faces
+from facefusion.filesystem import create_directory
+from facefusion.processors.core import create_queue_payloads, manage_temp_frames
+from facefusion.types import BoundingBoxes, Face, FaceLandmark68, FaceLandmarks5, Scores, VisionFrame
+from facefusion.vision import write_image
+from .helper import create_test_face, get_test_example_file, get_test_examples_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('face_tracker_interval', 3)
+	state_manager.init_item('face_detector_angles', [ 0 ])
+	state_manager.init_item('face_detector_score', 0.5)
+	state_manager.init_item('execution_queue_count', 2)
+	state_manager.init_item('target_path', get_test_example_file('target-240p.mp4'))
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_face_tracks()
+	clear_static_faces()
+
+
+def create_vision_frame(offset_x : int, offset_y : int) -> VisionFrame:
+	vision_frame = cv2.GaussianBlur(numpy.random.default_rng(0).integers(0, 255, (260, 340, 3), dtype = numpy.uint8), (5, 5), 0)
+	return vision_frame[20 + offset_y:260 + offset_y - 20, 20 + offset_x:340 + offset_x - 20]
+
+
+def create_face_landmark_68() -> FaceLandmark68:
+	return numpy.stack(numpy.meshgrid(numpy.linspace(120, 200, 17), numpy.linspace(80, 160, 4)), axis = -1).reshape(-1, 2)[:68]
+
+
+def test_track_faces() -> None:
+	face = create_test_face(numpy.array([ 110, 70, 210, 170 ]), create_face_landmark_68())
+	start_face_track(0, create_vision_frame(0, 0), [ face ])
+	tracked_faces = track_faces(1, create_vision_frame(3, 2))
+
+	assert len(tracked_faces) == 1
+	assert numpy.allclose(tracked_faces[0].landmark_set.get('68'), face.landmark_set.get('68') - [ 3, 2 ], atol = 0.5)
+	assert numpy.allclose(tracked_faces[0].bounding_box, face.bounding_box - [ 3, 2, 3, 2 ], atol = 0.5)
+	assert tracked_faces[0].embedding is face.embedding
+	assert track_faces(2, create_vision_frame(4, 4))
+	assert track_faces(3, create_vision_frame(5, 5)) is None
+
+
+def test_track_faces_on_scene_cut() -> None:
+	start_face_track(0, create_vision_frame(0, 0), [ create_test_face(numpy.array([ 110, 70, 210, 170 ]), create_face_landmark_68()) ])
+
+	assert track_faces(1, numpy.zeros((220, 300, 3), dtype = numpy.uint8)) is None
+
+
+def test_track_faces_on_frame_gap() -> None:
+	start_face_track(0, create_vision_frame(0, 0), [ create_test_face(numpy.array([ 110, 70, 210, 170 ]), create_face_landmark_68()) ])
+
+	assert track_faces(2, create_vision_frame(1, 1)) is None
+	assert track_faces(1, create_vision_frame(1, 1))
+
+
+def test_track_faces_without_faces() -> None:
+	start_face_track(0, create_vision_frame(0, 0), [])
+
+	assert track_faces(1, create_vision_frame(1, 1)) is None
+
+
+def test_track_faces_on_frame_chunk(monkeypatch : pytest.MonkeyPatch) -> None:
+	detect_frame_total = 0
+
+	def detect_angled_faces(vision_frames : List[VisionFrame]) -> List[Tuple[BoundingBoxes, Scores, FaceLandmarks5]]:
+		nonlocal detect_frame_total
+
+		detect_frame_total += len(vision_frames)
+		return [ (numpy.array([ [ 110, 70, 210, 170 ] ]), numpy.array([ 0.9 ]), numpy.zeros((1, 5, 2))) for _ in vision_frames ]
+
+	def create_faces(vision_frame : VisionFrame, bounding_boxes : BoundingBoxes, face_scores : Scores, face_landmarks_5 : FaceLandmarks5) -> List[Face]:
+		return [ create_test_face(bounding_boxes[0], create_face_landmark_68()) ]
+
+	monkeypatch.setattr(face_analyser, 'detect_angled_faces', detect_angled_faces)
+	monkeypatch.setattr(face_analyser, 'create_faces', create_faces)
+	create_directory(get_test_examples_directory())
+	temp_frame_paths = []
+
+	for frame_number in range(6):
+		temp_frame_path = get_test_example_file('face-tracker-' + str(frame_number).zfill(4) + '.png')
+		write_image(temp_frame_path, create_vision_frame(frame_number, frame_number))
+		temp_frame_paths.append(temp_frame_path)
+
+	process_manager.start()
+	many_frame_faces = [ get_many_faces([ target_vision_frame ], [ queue_payload.get('frame_number') ]) for queue_payload, target_vision_frame in manage_temp_frames(create_queue_payloads(temp_frame_paths)) ]
+	process_manager.end()
+
+	assert [ len(faces) for faces in many_frame_faces ] == [ 1 ] * 6
+	assert detect_frame_total == 2
+
+	clear_face_tracks()
+	get_many_faces([ create_vision_frame(0, 0) ])
+	get_many_faces([ create_vision_frame(1, 1) ])
+
+	assert detect_frame_total == 4
+	assert not FACE_TRACK_SET
@@ -7,7 +7,7 @@ import pytest
 import facefusion.ffmpeg
 from facefusion import process_manager, state_manager
 from facefusion.download import conditional_download
-from facefusion.ffmpeg import concat_video, extract_frames, merge_video, read_audio_buffer, replace_audio, restore_audio
+from facefusion.ffmpeg import close_stream, concat_video, extract_frames, merge_video, open_extract_stream, open_merge_stream, read_audio_buffer, read_stream_frame, replace_audio, restore_audio, write_stream_frame
 from facefusion.filesystem import copy_file
 from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, resolve_temp_frame_paths
 from facefusion.types import EncoderSet
@@ -115,6 +115,26 @@ def test_merge_video() -> None:
 	state_manager.init_item('output_video_encoder', 'libx264')
 
 
+def test_stream_video() -> None:
+	target_path = get_test_example_file('target-240p-25fps.mp4')
+	create_temp_directory(target_path)
+	extract_process = open_extract_stream(target_path, '452x240', 25.0, 0, 10)
+	merge_process = open_merge_stream(target_path, 25.0, '452x240', 25.0)
+	frame_total = 0
+
+	while (vision_frame := read_stream_frame(extract_process, '452x240')) is not None:
+		assert vision_frame.shape == (240, 452, 3)
+		assert write_stream_frame(merge_process, vision_frame) is True
+		frame_total += 1
+
+	assert frame_total == 10
+	assert close_stream(extract_process) is True
+	assert close_stream(merge_process) is True
+	assert os.path.isfile(get_temp_file_path(target_path))
+
+	clear_temp_directory(target_path)
+
+
 def test_concat_video() -> None:
 	output_path = get_test_output_file('test-concat-video.mp4')
 	temp_output_paths =\
@@ -4,7 +4,7 @@ import pytest
 from onnxruntime import InferenceSession
 
 from facefusion import content_analyser, state_manager
-from facefusion.inference_manager import INFERENCE_POOL_SET, get_inference_pool
+from facefusion.inference_manager import INFERENCE_MEMORY_SET, INFERENCE_POOL_SET, clear_inference_pool, get_inference_pool, get_inference_session
 
 
 @pytest.fixture(scope = 'module', autouse = True)
@@ -12,6 +12,7 @@ def before_all() -> None:
 	state_manager.init_item('execution_device_id', '0')
 	state_manager.init_item('execution_providers', [ 'cpu' ])
 	state_manager.init_item('download_providers', [ 'github' ])
+	state_manager.init_item('video_memory_limit', 0)
 	content_analyser.pre_check()
 
 
@@ -30,3 +31,49 @@ def test_get_inference_pool() -> None:
 		assert isinstance(INFERENCE_POOL_SET.get('cli').get('facefusion.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').get('nsfw_1'), InferenceSession)
 
 	assert INFERENCE_POOL_SET.get('cli').get('facefusion.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').get('nsfw_1') == INFERENCE_POOL_SET.get('ui').get('facefusion.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').get('nsfw_1')
+
+
+def test_get_inference_session() -> None:
+	model_names = [ 'nsfw_1', 'nsfw_2', 'nsfw_3' ]
+	_, model_source_set = content_analyser.collect_model_downloads()
+
+	with patch('facefusion.inference_manager.detect_app_context', return_value = 'ui'):
+		clear_inference_pool('facefusion.content_analyser', model_names)
+
+	with patch('facefusion.inference_manager.detect_app_context', return_value = 'cli'):
+		clear_inference_pool('facefusion.content_analyser', model_names)
+		INFERENCE_POOL_SET['cli']['facefusion.face_masker.xseg_1.0.cpu'] =\
+		{
+			'xseg_1': get_inference_session('facefusion.content_analyser', model_names, model_source_set, 'nsfw_1')
+		}
+		INFERENCE_MEMORY_SET[('facefusion.face_masker.xseg_1.0.cpu', 'xseg_1')] = 1
+		INFERENCE_MEMORY_SET.move_to_end(('facefusion.face_masker.xseg_1.0.cpu', 'xseg_1'), last = False)
+
+		assert list(INFERENCE_POOL_SET.get('cli').get('facefusion.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').keys()) == [ 'nsfw_1' ]
+
+		state_manager.init_item('video_memory_limit', 1)
+		get_inference_session('facefusion.content_analyser', model_names, model_source_set, 'nsfw_2')
+
+		assert list(INFERENCE_POOL_SET.get('cli').get('facefusion.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu').keys()) == [ 'nsfw_1', 'nsfw_2' ]
+		assert INFERENCE_POOL_SET.get('cli').get('facefusion.face_masker.xseg_1.0.cpu') == {}
+		assert list(INFERENCE_MEMORY_SET.keys()) == [ ('facefusion.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu', 'nsfw_1'), ('facefusion.content_analyser.nsfw_1.nsfw_2.nsfw_3.0.cpu', 'nsfw_2') ]
+
+		state_manager.init_item('video_memory_limit', 0)
+
+
+def test_get_inference_pool_with_memory_limit() -> None:
+	model_names = [ 'nsfw_1', 'nsfw_2', 'nsfw_3' ]
+	_, model_source_set = content_analyser.collect_model_downloads()
+
+	with patch('facefusion.inference_manager.detect_app_context', return_value = 'ui'):
+		clear_inference_pool('facefusion.content_analyser', model_names)
+
+	with patch('facefusion.inference_manager.detect_app_context', return_value = 'cli'):
+		clear_inference_pool('facefusion.content_analyser', model_names)
+		state_manager.init_item('video_memory_limit', 1)
+		inference_pool = get_inference_pool('facefusion.content_analyser', model_names, model_source_set)
+
+		for model_name in model_names:
+			assert isinstance(inference_pool.get(model_name), InferenceSession)
+
+		state_manager.init_item('video_memory_limit', 0)
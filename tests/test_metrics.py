@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+from facefusion.metrics import clear_metrics, create_metric_profile, get_metrics, measure, merge_metrics, record_metric, render_metrics, write_metric_profile
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_metrics()
+
+
+def test_measure() -> None:
+	@measure
+	def forward_test(value : int) -> int:
+		return value * 2
+
+	assert forward_test(2) == 4
+	assert forward_test(3) == 6
+	assert get_metrics().get('test_metrics.forward_test').get('count') == 2
+
+
+def test_merge_metrics() -> None:
+	record_metric('vision.read_image', 0.002)
+	metric_set = get_metrics()
+	merge_metrics(metric_set)
+
+	assert get_metrics().get('vision.read_image').get('count') == 2
+	assert get_metrics().get('vision.read_image').get('buckets')[1] == 2
+
+
+def test_create_metric_profile() -> None:
+	for _ in range(99):
+		record_metric('face_helper.paste_back', 0.004)
+	record_metric('face_helper.paste_back', 2.0)
+	metric_profile = create_metric_profile().get('face_helper.paste_back')
+
+	assert metric_profile.get('count') == 100
+	assert metric_profile.get('p50') == 0.005
+	assert metric_profile.get('p99') == 0.005
+	assert metric_profile.get('mean') == pytest.approx(0.02396)
+
+
+def test_write_metric_profile() -> None:
+	record_metric('ffmpeg.merge_video', 1.5)
+	output_path = os.path.join(tempfile.mkdtemp(), 'output.mp4')
+
+	assert write_metric_profile(output_path) is True
+
+	with open(os.path.join(os.path.dirname(output_path), 'output.profile.json')) as metric_profile_file:
+		assert json.load(metric_profile_file).get('ffmpeg.merge_video').get('count') == 1
+
+
+def test_render_metrics() -> None:
+	record_metric('ffmpeg.extract_frames', 0.3)
+	metric_lines = render_metrics().splitlines()
+
+	assert 'facefusion_stage_duration_seconds_bucket{stage="ffmpeg.extract_frames",le="0.25"} 0' in metric_lines
+	assert 'facefusion_stage_duration_seconds_bucket{stage="ffmpeg.extract_frames",le="0.5"} 1' in metric_lines
+	assert 'facefusion_stage_duration_seconds_count{stage="ffmpeg.extract_frames"} 1' in metric_lines
@@ -0,0 +1,29 @@
+from facefusion import state_manager
+from facefusion.segment_runner import create_segments, resolve_segment_device_id, resolve_segment_frame_range
+
+
+def test_create_segments() -> None:
+	temp_frame_paths = [ str(index).zfill(8) + '.png' for index in range(1, 11) ]
+
+	assert create_segments(temp_frame_paths, 1) == [ temp_frame_paths ]
+	assert [ len(segment) for segment in create_segments(temp_frame_paths, 3) ] == [ 4, 3, 3 ]
+	assert sum(create_segments(temp_frame_paths, 4), []) == temp_frame_paths
+	assert len(create_segments(temp_frame_paths, 32)) == 10
+	assert create_segments([], 4) == [ [] ]
+
+
+def test_resolve_segment_device_id() -> None:
+	state_manager.init_item('execution_device_id', '0')
+	state_manager.init_item('execution_process_device_ids', None)
+
+	assert resolve_segment_device_id(3) == '0'
+
+	state_manager.init_item('execution_process_device_ids', [ '0', '1' ])
+
+	assert resolve_segment_device_id(0) == '0'
+	assert resolve_segment_device_id(1) == '1'
+	assert resolve_segment_device_id(2) == '0'
+
+
+def test_resolve_segment_frame_range() -> None:
+	assert resolve_segment_frame_range([ '/tmp/00000041.png', '/tmp/00000042.png' ]) == (41, 2)
@@ -3,7 +3,7 @@ import subprocess
 import pytest
 
 from facefusion.download import conditional_download
-from facefusion.vision import calc_histogram_difference, count_trim_frame_total, count_video_frame_total, create_image_resolutions, create_video_resolutions, detect_image_resolution, detect_video_duration, detect_video_fps, detect_video_resolution, match_frame_color, normalize_resolution, pack_resolution, predict_video_frame_total, read_image, read_video_frame, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution, write_image
+from facefusion.vision import calc_histogram_difference, count_trim_frame_total, count_video_frame_total, create_image_resolutions, create_tile_frames, create_video_resolutions, detect_image_resolution, detect_video_duration, detect_video_fps, detect_video_resolution, match_frame_color, merge_tile_frames, normalize_resolution, pack_resolution, predict_video_frame_total, read_image, read_video_frame, read_video_frames, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution, write_image
 from .helper import get_test_example_file, get_test_examples_directory, get_test_output_file, prepare_test_output_directory
 
 
@@ -73,6 +73,12 @@ def test_read_video_frame() -> None:
 	assert read_video_frame('invalid') is None
 
 
+def test_read_video_frames() -> None:
+	assert len(list(read_video_frames(get_test_example_file('target-240p-25fps.mp4'), [ 0, 25, 50 ]))) == 3
+	assert len(list(read_video_frames(get_test_example_file('target-240p-25fps.mp4'), [ 250, 275 ]))) == 1
+	assert list(read_video_frames('invalid', [ 0 ])) == []
+
+
 def test_count_video_frame_total() -> None:
 	assert count_video_frame_total(get_test_example_file('target-240p-25fps.mp4')) == 270
 	assert count_video_frame_total(get_test_example_file('target-240p-30fps.mp4')) == 324
@@ -177,3 +183,12 @@ def test_match_frame_color() -> None:
 	output_vision_frame = match_frame_color(source_vision_frame, target_vision_frame)
 
 	assert calc_histogram_difference(source_vision_frame, output_vision_frame) > 0.5
+
+
+def test_merge_tile_frames() -> None:
+	vision_frame = read_image(get_test_example_file('target-240p.jpg'))
+	tile_vision_frames, pad_width, pad_height = create_tile_frames(vision_frame, (128, 8, 4))
+	merge_vision_frame = merge_tile_frames(tile_vision_frames, vision_frame.shape[1], vision_frame.shape[0], pad_width, pad_height, (128, 8, 4))
+
+	assert len(tile_vision_frames) == 12
+	assert (merge_vision_frame == vision_frame).all()
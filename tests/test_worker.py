@@ -0,0 +1,64 @@
+import multiprocessing
+import threading
+from queue import Queue
+from typing import List, Optional
+
+import pytest
+
+from facefusion import core, process_manager, worker
+from facefusion.program import create_program
+from facefusion.types import Args, ErrorCode, WorkerRequest
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	process_manager.end()
+	worker.WORKER_JOB_SET.clear()
+	worker.WORKER_QUEUES.clear()
+	worker.WORKER_CANCELLED_JOB_IDS.clear()
+
+
+def test_cancel_job_while_queued() -> None:
+	worker.WORKER_QUEUES['0'] = Queue()
+
+	assert worker.submit_job('test-job', []) is True
+	assert worker.cancel_job('test-job') is True
+	assert worker.get_job('test-job').get('status') == 'cancelled'
+	assert worker.is_job_finished('test-job') is True
+	assert worker.cancel_job('test-job') is False
+
+
+def test_cancel_job_while_pending(monkeypatch : pytest.MonkeyPatch) -> None:
+	parent_connection, process_connection = multiprocessing.Pipe()
+	worker_queue : Queue[Optional[WorkerRequest]] = Queue()
+	job_args_set : List[Args] = []
+
+	def process_headless(args : Args) -> ErrorCode:
+		job_args_set.append(args)
+		return 0
+
+	monkeypatch.setattr(worker, 'WORKER_CONNECTION', process_connection)
+	monkeypatch.setattr(core, 'process_headless', process_headless)
+	listen_thread = threading.Thread(target = worker.listen_worker, args = (worker_queue,))
+	listen_thread.start()
+	parent_connection.send(
+	{
+		'command': 'run',
+		'job_id': 'test-job',
+		'job_args': []
+	})
+	parent_connection.send(
+	{
+		'command': 'stop',
+		'job_id': 'test-job',
+		'job_args': []
+	})
+	parent_connection.send(None)
+	listen_thread.join(timeout = 10)
+	worker_request = worker_queue.get()
+
+	assert worker.process_worker_job(create_program(), worker_request.get('job_id'), worker_request.get('job_args')) == 1
+	assert job_args_set == []
+	assert process_manager.is_pending()
+	assert worker_queue.get() is None
+	assert 'test-job' not in worker.WORKER_CANCELLED_JOB_IDS
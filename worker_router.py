@@ -1,10 +1,9 @@
 import os
-import sys
 import shutil
 import tempfile
+import threading
 import subprocess
 from typing import Any, Dict, List, Optional
-from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, Header
 from dotenv import load_dotenv
@@ -12,6 +11,8 @@ import requests
 import boto3
 from botocore.client import Config
 
+from facefusion.worker import cancel_job, clear_job, get_job, submit_job, wait_job
+
 # --- env ---
 load_dotenv()
 
@@ -50,13 +51,6 @@ def _content_type_for_ext(ext: str) -> str:
     if e == '.mov': return 'video/quicktime'
     return 'application/octet-stream'
 
-def _project_paths() -> tuple[Path, Path]:
-    project_root = Path(__file__).resolve().parent
-    run_py_path = project_root / 'facefusion.py'
-    if not run_py_path.is_file():
-        run_py_path = Path('facefusion.py')
-    return project_root, run_py_path
-
 def _diagnostics() -> Dict[str, Any]:
     info: Dict[str, Any] = {}
     try:
@@ -78,15 +72,11 @@ def _diagnostics() -> Dict[str, Any]:
     print('[DIAG]', info)
     return info
 
-def run_facefusion(
+def create_facefusion_command(
     source_paths, target_path, output_path,
     *, processors=None, face_swapper_model=None,
-    force_cuda=False, execution_device_id=None, extra_args=None,
-):
-    project_root, run_py_path = _project_paths()
-
-    device_id = str(execution_device_id or DEFAULT_DEVICE_ID or '0')
-
+    force_cuda=False, extra_args=None,
+) -> List[str]:
     # ✔ providers harus dipisah per token, bukan satu string pakai koma
     providers: list[str] = ['cpu']
     if force_cuda:
@@ -96,12 +86,12 @@ def run_facefusion(
         providers = ['cuda', 'cpu']
 
     cmd = [
-        sys.executable, str(run_py_path), 'headless-run',
+        'headless-run',
         '--source', *source_paths,
         '--target', target_path,
         '--output-path', output_path,
         '--execution-providers', *providers,        # <— ini kuncinya
-        '--execution-device-id', device_id,
+        '--video-memory-strategy', 'tolerant',      # model tetap hangat di worker
     ]
 
     proc_list = processors or ['face_swapper']
@@ -111,20 +101,7 @@ def run_facefusion(
 
     if extra_args:
         cmd += [str(x) for x in extra_args]
-
-    env = os.environ.copy()
-    env.setdefault('ORT_CUDA_UNAVAILABLE_LOGGING', '1')
-    env.setdefault('ORT_LOG_SEVERITY_LEVEL', '1')
-    if device_id.isdigit():
-        env.setdefault('CUDA_VISIBLE_DEVICES', device_id)
-
-    result = subprocess.run(
-        cmd, capture_output=True, text=True,
-        cwd=str(project_root), env=env, check=False
-    )
-    print("== STDOUT ==\n", result.stdout)
-    print("== STDERR ==\n", result.stderr)
-    result.check_returncode()
+    return cmd
 
 def _callback(url: str, body: Dict[str, Any]):
     """Send callback to NestJS"""
@@ -144,7 +121,7 @@ def _callback(url: str, body: Dict[str, Any]):
     except Exception as e:
         print(f"❌ Callback error: {url} -> {e}")
 
-@router.post("/worker/facefusion")
+@router.post("/worker/facefusion", status_code=202)
 def start_facefusion_job(
     payload: dict,
     x_worker_secret: Optional[str] = Header(None),
@@ -194,16 +171,45 @@ def start_facefusion_job(
         s3.download_file(INPUT_BUCKET, target_key, target_path)
         print(f"✅ Assets downloaded successfully")
 
-        # jalankan facefusion
-        print(f"🚀 Starting FaceFusion processing...")
-        run_facefusion(
+        # masukkan ke antrean worker (lihat facefusion/worker.py), request tidak menunggu proses selesai
+        print(f"🚀 Queueing FaceFusion processing...")
+        cmd = create_facefusion_command(
             [source_path], target_path, output_path,
             processors=processors,
             face_swapper_model=face_swapper_model,
             force_cuda=use_cuda,                         # true → CUDA only
-            execution_device_id=str(options.get('deviceId')) if options.get('deviceId') is not None else None,
             extra_args=extra_args,
         )
+        if not submit_job(job_id, cmd, str(device_id) if device_id is not None else None):
+            raise RuntimeError("facefusion worker is not running or job already exists")
+    except Exception as e:
+        _fail_job(job_id, e)
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    # thread terpisah menunggu job selesai, lalu upload hasil + callback ke Nest
+    threading.Thread(target=_finish_facefusion_job, args=(job_id, tmpdir, output_path, out_ext), daemon=True).start()
+    return {"ok": True, "job_id": job_id, "status": "queued"}
+
+def _fail_job(job_id: str, e: Exception):
+    print(f"❌ Job {job_id} failed: {str(e)}")
+
+    # ✅ CALLBACK ERROR dengan URL dan payload yang benar
+    callback_url = f"{NEST_BASE_URL}/jobs/{job_id}/callback"
+    callback_payload = {
+        "status": "FAILED",
+        "progressPct": 0,
+        "errorMessage": str(e)
+    }
+    _callback(callback_url, callback_payload)
+
+def _finish_facefusion_job(job_id: str, tmpdir: str, output_path: str, out_ext: str):
+    try:
+        job = wait_job(job_id)
+        if job and job['status'] == 'cancelled':
+            raise RuntimeError("facefusion job cancelled")
+        if not job or job['status'] != 'completed':
+            raise RuntimeError(f"facefusion failed with error code {job['error_code'] if job else None}")
 
         if not os.path.exists(output_path):
             raise RuntimeError("facefusion finished but output file not found")
@@ -225,28 +231,38 @@ def start_facefusion_job(
             "outputKey": output_key
         }
         _callback(callback_url, callback_payload)
-        
-        return {"ok": True, "output_key": output_key}
 
     except Exception as e:
-        print(f"❌ Job {job_id} failed: {str(e)}")
-        
-        # ✅ CALLBACK ERROR dengan URL dan payload yang benar
-        callback_url = f"{NEST_BASE_URL}/jobs/{job_id}/callback"
-        callback_payload = {
-            "status": "FAILED",
-            "progressPct": 0,
-            "errorMessage": str(e)
-        }
-        _callback(callback_url, callback_payload)
-        
-        raise HTTPException(status_code=500, detail=str(e)) from e
-        
+        _fail_job(job_id, e)
+
     finally:
         # cleanup
+        clear_job(job_id)
         shutil.rmtree(tmpdir, ignore_errors=True)
         print(f"🧹 Cleanup completed for job {job_id}")
 
+@router.get("/worker/facefusion/{job_id}")
+def get_facefusion_job(job_id: str, x_worker_secret: Optional[str] = Header(None)):
+    if x_worker_secret != WORKER_SHARED_SECRET:
+        raise HTTPException(status_code=401, detail="unauthorized")
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    return {
+        "jobId": job_id,
+        "status": job['status'],
+        "progressPct": round(job['progress'] * 100, 2),
+        "deviceId": job['execution_device_id']
+    }
+
+@router.delete("/worker/facefusion/{job_id}")
+def cancel_facefusion_job(job_id: str, x_worker_secret: Optional[str] = Header(None)):
+    if x_worker_secret != WORKER_SHARED_SECRET:
+        raise HTTPException(status_code=401, detail="unauthorized")
+    if not get_job(job_id):
+        raise HTTPException(status_code=404, detail="job not found")
+    return {"ok": cancel_job(job_id), "jobId": job_id}
+
 # Endpoint diagnostics (optional)
 @router.get("/worker/diagnostics")
 def get_diagnostics():